@@ -7,20 +7,64 @@ Bazi Calculator API Wrapper
 
 from flask import Flask, request, jsonify, render_template
 from flask_cors import CORS
-import subprocess
+import io
 import json
 import re
 import os
+import gc
 from datetime import datetime
 
+# ganzhi、datas等基础表由快照还原，快照无效时导入源文件
+import snapshot
+snapshot.install()
+
+from solar_time import DEFAULT_TIMEZONE, check_location, correct_many
+from calendar_index import load as load_calendar, gz_name
+from lunar_cache import get_chart, stats as lunar_cache_stats
+from pillar_index import load as load_pillars, PAGE_SIZE
+import zeri
+import shengxiao
+import text_store
+import text_search
+import yongshen
+import bazi
+
 app = Flask(__name__)
 CORS(app)  # 允许跨域请求
 
+
+def preload():
+    """加载全部查表数据并冻结，供gunicorn预加载时在主进程中调用（见gunicorn.conf.py）
+
+    日历、四柱、文本库、检索索引都是mmap映射的只读文件，数据不是Python对象，
+    没有引用计数，各worker经由页缓存共享同一份物理内存。
+    其余表（调候、格局等）加载后用gc.freeze()移入永久代：fork后的垃圾回收不再扫描这些对象。
+    排盘数据包不在这里生成：生成时要把《三命通会》《穷通宝鉴》的条文从文本库解码成str，
+    这些对象每次取用都会改写引用计数，所在的页在每个worker中仍会被复制，
+    留在文本库中按需解码才是共享的。
+
+    Returns:
+        dict: 各项数据的条数和冻结的对象数
+    """
+    calendar = load_calendar()
+    pillars = load_pillars()
+    store = text_store.load()
+    search = text_search.load()
+    counts = {
+        "calendar_days": calendar.count,
+        "pillar_records": len(pillars.entries),
+        "texts": len(store.offsets) - 1,
+        "search_docs": len(search.docs),
+        "yongshen": len(yongshen.TIAOHOUS) + len(yongshen.JINBUHUANS) + len(yongshen.GES),
+    }
+    gc.collect()
+    gc.freeze()
+    counts["frozen_objects"] = gc.get_freeze_count()
+    return counts
+
 class BaziCalculator:
-    def __init__(self, bazi_script_path="./bazi.py"):
-        self.bazi_script_path = bazi_script_path
-    
-    def calculate(self, year, month, day, hour, gender="male", calendar_type="gregorian"):
+    def calculate(self, year, month, day, hour, gender="male", calendar_type="gregorian",
+                  longitude=None, timezone=DEFAULT_TIMEZONE, minute=None, solar_time=None):
         """
         调用bazi.py进行计算
         
@@ -31,32 +75,126 @@ class BaziCalculator:
             hour: 出生时辰
             gender: 性别 ("male" or "female")
             calendar_type: 日历类型 ("gregorian" or "lunar")
+            longitude: 出生地经度，可选；提供时按真太阳时排盘
+            timezone: 出生时间所用时区，默认东八区
+            minute: 出生分钟，可选；不提供时按整点排盘，临界检查不判断子时交接
+            solar_time: 已校正的真太阳时，可选；批量排盘时预先整批算好，给出时不再用longitude校正
         
         Returns:
             dict: 解析后的八字结果
         """
         try:
+            exact = minute is not None
+            if solar_time is None and longitude is not None:
+                solar_time, = self.to_true_solar_time([{
+                    "year": year, "month": month, "day": day, "hour": hour, "minute": minute,
+                    "calendar_type": calendar_type, "longitude": longitude, "timezone": timezone,
+                }])
+            if solar_time is not None:
+                year, month, day = solar_time.year, solar_time.month, solar_time.day
+                hour, minute = solar_time.hour, solar_time.minute
+                calendar_type = "gregorian"
+
             # 构建命令参数
-            cmd = ["python3", self.bazi_script_path, str(year), str(month), str(day), str(hour)]
+            args = [str(year), str(month), str(day), str(hour)]
+            if minute is not None:
+                args.append(str(minute))
             
             # 添加选项参数
             if calendar_type == "gregorian":
-                cmd.append("-g")
+                args.append("-g")
             if gender == "female":
-                cmd.append("-n")
+                args.append("-n")
             
-            # 执行命令
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
-            
-            if result.returncode != 0:
-                return {"error": f"计算错误: {result.stderr}"}
+            # 在本进程中排盘：每次排盘有各自的上下文和输出，多线程同时排盘互不影响
+            out = io.StringIO()
+            try:
+                bazi.main(args, out)
+            except SystemExit:
+                return {"error": f"计算错误: 参数不合法 {' '.join(args)}"}
+            except Exception as e:
+                return {"error": f"计算错误: {str(e)}"}
             
             # 解析输出结果
-            return self.parse_bazi_output(result.stdout)
+            parsed = self.parse_bazi_output(out.getvalue())
+            if "basic_info" in parsed:
+                if solar_time is not None:
+                    parsed["basic_info"]["true_solar_time"] = solar_time.strftime("%Y-%m-%d %H:%M")
+                parsed["basic_info"]["boundary"] = self.check_boundary(parsed, hour, minute if exact else None)
+            return parsed
             
         except Exception as e:
             return {"error": f"系统错误: {str(e)}"}
     
+    def check_boundary(self, parsed, hour, minute):
+        """
+        检查出生时间是否靠近节或子时的交接时刻
+        
+        公历日期取自bazi.py输出，两侧的四柱由逐日历表推算。
+        
+        Returns:
+            dict: near为是否临界，candidates为各交接时刻及其前后的四柱
+        """
+        boundary = {"near": False, "candidates": []}
+        date_match = re.search(r'(\d+)年(\d+)月(\d+)日', parsed["basic_info"].get("gregorian_date", ""))
+        if not date_match:
+            return boundary
+        try:
+            items = load_calendar().boundaries(*(int(item) for item in date_match.groups()), int(hour),
+                                                 None if minute is None else int(minute))
+        except ValueError:
+            return boundary
+        for item in items:
+            boundary["candidates"].append({
+                "name": item.name,
+                "moment": item.moment.strftime("%Y-%m-%d %H:%M"),
+                "minutes": item.minutes,
+                "before": [gz_name(code) for code in item.before],
+                "after": [gz_name(code) for code in item.after],
+            })
+        boundary["near"] = bool(boundary["candidates"])
+        return boundary
+    
+    def to_true_solar_time(self, items, errors=None):
+        """
+        批量把出生时间校正为真太阳时
+        
+        Args:
+            items: 出生信息列表，每项含year/month/day/hour/calendar_type，以及可选的minute/longitude/timezone
+            errors: 可选的字典；给出时某项的经度、时区或日期不合法不影响其余各项，
+                    记为 errors[序号] = 异常，该项结果为None；不给出时直接抛出
+        
+        Returns:
+            list: 与items一一对应，没有经度的项为None，其余为校正后的公历datetime
+        """
+        times, longitudes, timezones, positions = [], [], [], []
+        for seq, item in enumerate(items):
+            if item.get("longitude") is None:
+                continue
+            try:
+                longitude, timezone = check_location(item["longitude"], item.get("timezone", DEFAULT_TIMEZONE))
+                year, month, day, hour = (int(item[key]) for key in ("year", "month", "day", "hour"))
+                minute = int(item.get("minute") or 0)
+                if item.get("calendar_type", "gregorian") == "lunar":
+                    solar = get_chart(year, month, day, hour, minute, gregorian=False).solar
+                    year, month, day = solar.getYear(), solar.getMonth(), solar.getDay()
+                moment = datetime(year, month, day, hour, minute)
+            except Exception as e:
+                # lunar_python对不存在的农历日期抛出的是Exception
+                if errors is None:
+                    raise
+                errors[seq] = e
+                continue
+            times.append(moment)
+            longitudes.append(longitude)
+            timezones.append(timezone)
+            positions.append(seq)
+        
+        results = [None] * len(items)
+        for seq, value in zip(positions, correct_many(times, longitudes, timezones)):
+            results[seq] = value
+        return results
+    
     def parse_bazi_output(self, output):
         """
         解析bazi.py的输出结果
@@ -206,40 +344,32 @@ class BaziCalculator:
                             result["analysis"]["spiritual_stars"] = set()
                         result["analysis"]["spiritual_stars"].update(spiritual_stars)
                 
-                # 解析格局信息
+                # 解析格局信息：已解析出四柱时直接取结构化表
                 if "格局选用：" in line:
-                    pattern_text = line.split("格局选用：")[1].strip()
-                    patterns = self.parse_pattern_analysis(pattern_text)
-                    result["analysis"]["patterns"] = patterns
-                
-                # 解析调候用神信息
-                if "调候：" in line:
-                    # 先解析普通调候信息（在##之前）
-                    if "金不换大运" not in line:
-                        # 没有金不换大运的行，直接解析
-                        seasonal_match = re.search(r'调候：\s*([^#]+)', line)
-                        if seasonal_match:
-                            seasonal_text = seasonal_match.group(1).strip()
-                            seasonal_info = self.parse_seasonal_adjustment(seasonal_text)
-                            result["analysis"]["seasonal_adjustment"] = seasonal_info
+                    key = self.chart_key(result)
+                    if key:
+                        result["analysis"]["patterns"] = yongshen.as_dict(yongshen.pattern(*key))
                     else:
-                        # 有金不换大运的行，先解析##之前的调候信息
-                        before_jinbuhuan = line.split('##')[0]
-                        if "调候：" in before_jinbuhuan:
-                            seasonal_match = re.search(r'调候：\s*([^#]+)', before_jinbuhuan)
-                            if seasonal_match:
-                                seasonal_text = seasonal_match.group(1).strip()
-                                seasonal_info = self.parse_seasonal_adjustment(seasonal_text)
-                                result["analysis"]["seasonal_adjustment"] = seasonal_info
+                        pattern_text = line.split("格局选用：")[1].strip()
+                        result["analysis"]["patterns"] = self.parse_pattern_analysis(pattern_text)
                 
-                # 解析金不换大运中的调候信息
-                if "金不换大运：" in line and "调候：" in line:
-                    # 提取金不换大运中的调候信息
+                # 解析调候用神和金不换大运中的调候信息：已解析出四柱时直接取结构化表
+                if "调候：" in line and "##金不换大运：" in line and self.chart_key(result):
+                    key = self.chart_key(result)
+                    result["analysis"]["seasonal_adjustment"] = yongshen.as_dict(yongshen.tiaohou(*key))
+                    result["analysis"]["jinbuhuan_seasonal"] = yongshen.as_dict(yongshen.jinbuhuan_tiaohou(*key))
+                elif "调候：" in line:
+                    # 先解析普通调候信息（在##之前）
+                    before_jinbuhuan = line.split('##')[0]
+                    seasonal_match = re.search(r'调候：\s*([^#]+)', before_jinbuhuan)
+                    if seasonal_match:
+                        seasonal_text = seasonal_match.group(1).strip()
+                        result["analysis"]["seasonal_adjustment"] = self.parse_seasonal_adjustment(seasonal_text)
+                    
+                    # 金不换大运中的调候信息
                     jinbuhuan_match = re.search(r'金不换大运：[^调]*调候：([^金]*)', line)
                     if jinbuhuan_match:
                         jinbuhuan_text = jinbuhuan_match.group(1).strip()
-                        if "jinbuhuan_seasonal" not in result["analysis"]:
-                            result["analysis"]["jinbuhuan_seasonal"] = {}
                         result["analysis"]["jinbuhuan_seasonal"] = self.parse_seasonal_adjustment(jinbuhuan_text)
                 
                 # 解析大运信息 - 寻找大运起始行
@@ -318,109 +448,21 @@ class BaziCalculator:
         
         return list(set(spiritual_stars))  # 去重
     
+    def chart_key(self, result):
+        """已解析出四柱时返回 (日干, 月支)，否则返回None"""
+        pillars = result.get("four_pillars", {})
+        day, month = pillars.get("day", ""), pillars.get("month", "")
+        if len(day) == 2 and len(month) == 2 and day[0] in yongshen.Gan and month[1] in yongshen.Zhi:
+            return day[0], month[1]
+        return None
+    
     def parse_pattern_analysis(self, pattern_text):
         """解析格局分析文本"""
-        patterns = {
-            "primary_pattern": "",
-            "secondary_patterns": [],
-            "favorable_elements": [],
-            "unfavorable_elements": [],
-            "pattern_quality": ""
-        }
-        
-        try:
-            # 分割不同的格局描述
-            # 示例: "食伤生财：孤贫劳 财格：     印格；最佳       杀印相生：佳   官杀：体弱多病"
-            parts = re.split(r'[：；]', pattern_text)
-            
-            for i, part in enumerate(parts):
-                part = part.strip()
-                if not part:
-                    continue
-                    
-                if i == 0:  # 第一个通常是主格局
-                    patterns["primary_pattern"] = part
-                elif "最佳" in part:
-                    patterns["pattern_quality"] = "最佳"
-                    patterns["secondary_patterns"].append(part.replace("最佳", "").strip())
-                elif "佳" in part:
-                    patterns["pattern_quality"] = "佳" if not patterns["pattern_quality"] else patterns["pattern_quality"]
-                    patterns["secondary_patterns"].append(part.replace("佳", "").strip())
-                else:
-                    patterns["secondary_patterns"].append(part)
-            
-            # 提取喜忌信息（如果存在）
-            if "喜" in pattern_text:
-                favorable_match = re.search(r'喜([^忌]+)', pattern_text)
-                if favorable_match:
-                    favorable_text = favorable_match.group(1).strip()
-                    patterns["favorable_elements"] = [elem.strip() for elem in favorable_text if elem.strip()]
-            
-            if "忌" in pattern_text:
-                unfavorable_match = re.search(r'忌(.+)', pattern_text)
-                if unfavorable_match:
-                    unfavorable_text = unfavorable_match.group(1).strip()
-                    patterns["unfavorable_elements"] = [elem.strip() for elem in unfavorable_text if elem.strip()]
-                    
-        except Exception as e:
-            print(f"格局解析错误: {e}")
-        
-        return patterns
+        return yongshen.as_dict(yongshen.parse_pattern(pattern_text))
     
     def parse_seasonal_adjustment(self, seasonal_text):
         """解析调候用神信息"""
-        seasonal_info = {
-            "adjustment_gods": [],
-            "priority_order": [],
-            "favorable_gods": [],
-            "unfavorable_gods": [],
-            "description": seasonal_text
-        }
-        
-        try:
-            # 解析优先级调候用神 - 格式如 "1庚2癸壬"
-            priority_match = re.findall(r'(\d+)([甲乙丙丁戊己庚辛壬癸]+)', seasonal_text)
-            for priority, gods in priority_match:
-                for god in gods:
-                    seasonal_info["priority_order"].append({
-                        "priority": int(priority),
-                        "god": god
-                    })
-                    if god not in seasonal_info["adjustment_gods"]:
-                        seasonal_info["adjustment_gods"].append(god)
-            
-            # 解析喜忌用神 - 格式如 "喜庚壬辛 忌丁"
-            if "喜" in seasonal_text:
-                # 提取喜用神
-                favorable_match = re.search(r'喜([甲乙丙丁戊己庚辛壬癸\s]+?)(?:\s+忌|$)', seasonal_text)
-                if favorable_match:
-                    favorable_text = favorable_match.group(1).strip()
-                    # 提取所有天干
-                    favorable_gods = re.findall(r'[甲乙丙丁戊己庚辛壬癸]', favorable_text)
-                    seasonal_info["favorable_gods"] = favorable_gods
-            
-            if "忌" in seasonal_text:
-                # 提取忌用神
-                unfavorable_match = re.search(r'忌([甲乙丙丁戊己庚辛壬癸\s]+?)(?:\s+|$)', seasonal_text)
-                if unfavorable_match:
-                    unfavorable_text = unfavorable_match.group(1).strip()
-                    # 提取所有天干
-                    unfavorable_gods = re.findall(r'[甲乙丙丁戊己庚辛壬癸]', unfavorable_text)
-                    seasonal_info["unfavorable_gods"] = unfavorable_gods
-            
-            # 如果没有找到优先级信息，但有喜用神，将喜用神作为调候用神
-            if not seasonal_info["adjustment_gods"] and seasonal_info["favorable_gods"]:
-                seasonal_info["adjustment_gods"] = seasonal_info["favorable_gods"].copy()
-            
-            # 如果都没有，尝试直接提取天干
-            if not seasonal_info["adjustment_gods"]:
-                all_gods = re.findall(r'[甲乙丙丁戊己庚辛壬癸]', seasonal_text)
-                seasonal_info["adjustment_gods"] = list(set(all_gods))
-                    
-        except Exception as e:
-            print(f"调候解析错误: {e}")
-        
-        return seasonal_info
+        return yongshen.as_dict(yongshen.parse_tiaohou(seasonal_text))
     
     def parse_luck_cycle_line(self, line):
         """解析单行大运信息"""
@@ -492,6 +534,15 @@ class BaziCalculator:
 # 初始化计算器
 calculator = BaziCalculator()
 
+# 批量接口单次最多条数
+BATCH_LIMIT = 100
+
+# 反查、择日、检索接口每页最多条数
+REVERSE_PAGE_LIMIT = 200
+
+# 生肖配对接口单次最多人数
+SHENGXIAO_LIMIT = 200
+
 @app.route('/')
 def index():
     """API文档页面"""
@@ -505,8 +556,56 @@ def index():
         "month": 5,
         "day": 15,
         "hour": 14,
+        "minute": 30,
         "gender": "male",
-        "calendar_type": "gregorian"
+        "calendar_type": "gregorian",
+        "longitude": 116.4,
+        "timezone": 8
+    }
+    </pre>
+    <p>minute、longitude、timezone可选，提供经度时按真太阳时排盘。</p>
+    <p>出生时间靠近节或子时交接时，basic_info.boundary.near为true，并列出交接前后两种四柱。</p>
+    <p>POST /api/batch</p>
+    <pre>
+    {
+        "items": [{"year": 1990, "month": 5, "day": 15, "hour": 14, "longitude": 121.5}, ...]
+    }
+    </pre>
+    <p>POST /api/reverse</p>
+    <pre>
+    {
+        "pillars": ["庚午", "辛巳", "庚辰", "癸未"],
+        "start_year": 1850,
+        "end_year": 2030,
+        "page": 1,
+        "size": 50
+    }
+    </pre>
+    <p>POST /api/zeri</p>
+    <pre>
+    {
+        "start": "2025-01-01",
+        "end": "2030-01-01",
+        "zhi": "午",
+        "star": 7,
+        "palace": "东南",
+        "page": 1,
+        "size": 50
+    }
+    </pre>
+    <p>POST /api/shengxiao</p>
+    <pre>
+    {
+        "people": ["鼠", "牛", "亥"]
+    }
+    </pre>
+    <p>POST /api/search</p>
+    <pre>
+    {
+        "query": "从才",
+        "tables": ["summarys", "months"],
+        "page": 1,
+        "size": 20
     }
     </pre>
     """
@@ -526,11 +625,23 @@ def calculate_bazi():
         # 设置默认值
         gender = data.get('gender', 'male')
         calendar_type = data.get('calendar_type', 'gregorian')
+        longitude = data.get('longitude')
+        timezone = data.get('timezone', DEFAULT_TIMEZONE)
+        minute = data.get('minute')
+        
+        if minute is not None and (isinstance(minute, bool) or not isinstance(minute, int) or not 0 <= minute <= 59):
+            return jsonify({"error": "分钟必须为0-59的整数"}), 400
+        
+        if longitude is not None:
+            try:
+                check_location(longitude, timezone)
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": f"经度或时区错误: {str(e)}"}), 400
         
         # 执行计算
         result = calculator.calculate(
             data['year'], data['month'], data['day'], data['hour'],
-            gender, calendar_type
+            gender, calendar_type, longitude, timezone, minute
         )
         
         if "error" in result:
@@ -545,11 +656,221 @@ def calculate_bazi():
     except Exception as e:
         return jsonify({"error": f"请求处理错误: {str(e)}"}), 500
 
+@app.route('/api/batch', methods=['POST'])
+def calculate_batch():
+    """批量八字计算API端点，真太阳时校正对整批一次完成"""
+    try:
+        data = request.get_json()
+        items = data.get('items') if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "缺少必需参数: items"}), 400
+        if len(items) > BATCH_LIMIT:
+            return jsonify({"error": f"单次最多{BATCH_LIMIT}条"}), 400
+        
+        required_fields = ['year', 'month', 'day', 'hour']
+        for seq, item in enumerate(items):
+            if not isinstance(item, dict):
+                return jsonify({"error": f"第{seq + 1}条必须为对象"}), 400
+            for field in required_fields:
+                if field not in item:
+                    return jsonify({"error": f"第{seq + 1}条缺少必需参数: {field}"}), 400
+            minute = item.get('minute')
+            if minute is not None and (isinstance(minute, bool) or not isinstance(minute, int) or
+                                       not 0 <= minute <= 59):
+                return jsonify({"error": f"第{seq + 1}条分钟必须为0-59的整数"}), 400
+        
+        # 逐条核对经度、时区和日期，出错的一条只在该条返回错误，其余照常排盘
+        errors = {}
+        solar_times = calculator.to_true_solar_time(items, errors)
+        
+        results = []
+        for seq, (item, solar_time) in enumerate(zip(items, solar_times)):
+            gender = item.get('gender', 'male')
+            if seq in errors:
+                result = {"error": f"经度、时区或出生日期错误: {str(errors[seq])}"}
+            else:
+                # 校正后的时刻已经算好；仍传入原来的minute，没给分钟时不判断子时交接
+                result = calculator.calculate(
+                    item['year'], item['month'], item['day'], item['hour'],
+                    gender, item.get('calendar_type', 'gregorian'), minute=item.get('minute'),
+                    solar_time=solar_time)
+            results.append(result)
+        
+        return jsonify({
+            "success": True,
+            "data": results,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"请求处理错误: {str(e)}"}), 500
+
+@app.route('/api/reverse', methods=['POST'])
+def reverse_lookup():
+    """四柱反查出生时间API端点"""
+    try:
+        data = request.get_json()
+        pillars = data.get('pillars') if isinstance(data, dict) else None
+        if not isinstance(pillars, list) or len(pillars) != 4:
+            return jsonify({"error": "缺少必需参数: pillars（年月日时四柱）"}), 400
+        
+        start_year = data.get('start_year', 1850)
+        end_year = data.get('end_year', 2030)
+        page = data.get('page', 1)
+        size = data.get('size', PAGE_SIZE)
+        for name, value in (('start_year', start_year), ('end_year', end_year), ('page', page), ('size', size)):
+            if not isinstance(value, int):
+                return jsonify({"error": f"{name}必须为整数"}), 400
+        if page < 1 or not 1 <= size <= REVERSE_PAGE_LIMIT:
+            return jsonify({"error": f"page从1开始，size为1-{REVERSE_PAGE_LIMIT}"}), 400
+        
+        try:
+            total, matches = load_pillars().lookup(*pillars, start_year=start_year, end_year=end_year,
+                                                   page=page, size=size)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"四柱错误: {str(e)}"}), 400
+        
+        return jsonify({
+            "success": True,
+            "total": total,
+            "page": page,
+            "size": size,
+            "data": [{"start": match.start.strftime("%Y-%m-%d %H:%M"),
+                      "end": match.end.strftime("%Y-%m-%d %H:%M")} for match in matches],
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"请求处理错误: {str(e)}"}), 500
+
+@app.route('/api/zeri', methods=['POST'])
+def zeri_search():
+    """择日API端点"""
+    try:
+        data = request.get_json()
+        if not isinstance(data, dict):
+            return jsonify({"error": "缺少必需参数: start, end"}), 400
+        for field in ('start', 'end'):
+            if field not in data:
+                return jsonify({"error": f"缺少必需参数: {field}"}), 400
+        try:
+            start = datetime.strptime(data['start'], "%Y-%m-%d").date()
+            end = datetime.strptime(data['end'], "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return jsonify({"error": "日期格式应为YYYY-MM-DD"}), 400
+        
+        page = data.get('page', 1)
+        size = data.get('size', zeri.PAGE_SIZE)
+        star = data.get('star')
+        for name, value in (('page', page), ('size', size), ('star', star)):
+            if value is not None and not isinstance(value, int):
+                return jsonify({"error": f"{name}必须为整数"}), 400
+        if page < 1 or not 1 <= size <= REVERSE_PAGE_LIMIT:
+            return jsonify({"error": f"page从1开始，size为1-{REVERSE_PAGE_LIMIT}"}), 400
+        
+        try:
+            total, days = zeri.search(
+                start, end,
+                avoid_po=bool(data.get('avoid_po', True)),
+                avoid_touxiu=bool(data.get('avoid_touxiu', True)),
+                avoid_hou=bool(data.get('avoid_hou', True)),
+                zhi=data.get('zhi'), star=star, palace=data.get('palace'),
+                page=page, size=size)
+        except ValueError as e:
+            return jsonify({"error": f"查询条件错误: {str(e)}"}), 400
+        
+        return jsonify({
+            "success": True,
+            "total": total,
+            "page": page,
+            "size": size,
+            "data": [{
+                "date": item.date.isoformat(),
+                "lunar_date": "{}年{}{}月{}日".format(item.lunar_year, "闰" if item.leap else "",
+                                                    item.lunar_month, item.lunar_day),
+                "ganzhi": ''.join(''.join(pair) for pair in zip(item.gans, item.zhis)),
+                "nine_star": item.nine_star,
+                "sha": list(item.sha),
+            } for item in days],
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"请求处理错误: {str(e)}"}), 500
+
+@app.route('/api/shengxiao', methods=['POST'])
+def shengxiao_match():
+    """生肖配对API端点，返回两两之间的关系和净分"""
+    try:
+        data = request.get_json()
+        people = data.get('people') if isinstance(data, dict) else None
+        if not isinstance(people, list) or len(people) < 2:
+            return jsonify({"error": "缺少必需参数: people（至少两个生肖或地支）"}), 400
+        if len(people) > SHENGXIAO_LIMIT:
+            return jsonify({"error": f"单次最多{SHENGXIAO_LIMIT}人"}), 400
+        
+        try:
+            masks, scores = shengxiao.table(people)
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": str(e)}), 400
+        
+        names = {int(mask): shengxiao.relation_names(mask) for mask in set(masks.flat)}
+        return jsonify({
+            "success": True,
+            "zhis": [shengxiao.Zhi[shengxiao.zhi_index(item)] for item in people],
+            "scores": scores.tolist(),
+            "relations": [[names[int(mask)] for mask in row] for row in masks],
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"请求处理错误: {str(e)}"}), 500
+
+@app.route('/api/search', methods=['POST'])
+def search_texts():
+    """古籍全文检索API端点"""
+    try:
+        data = request.get_json()
+        query = data.get('query') if isinstance(data, dict) else None
+        if not isinstance(query, str) or not query.strip():
+            return jsonify({"error": "缺少必需参数: query"}), 400
+        
+        tables = data.get('tables')
+        if tables is not None and (not isinstance(tables, list) or
+                                   not all(isinstance(item, str) for item in tables)):
+            return jsonify({"error": "tables必须为表名列表"}), 400
+        page = data.get('page', 1)
+        size = data.get('size', text_search.PAGE_SIZE)
+        for name, value in (('page', page), ('size', size)):
+            if not isinstance(value, int):
+                return jsonify({"error": f"{name}必须为整数"}), 400
+        if page < 1 or not 1 <= size <= REVERSE_PAGE_LIMIT:
+            return jsonify({"error": f"page从1开始，size为1-{REVERSE_PAGE_LIMIT}"}), 400
+        
+        try:
+            total, hits = text_search.search(query, tables, page, size)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify({
+            "success": True,
+            "total": total,
+            "page": page,
+            "size": size,
+            "data": [hit._asdict() for hit in hits],
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"请求处理错误: {str(e)}"}), 500
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """健康检查端点"""
     return jsonify({
         "status": "healthy",
+        "lunar_cache": lunar_cache_stats(),
+        "frozen_objects": gc.get_freeze_count(),
         "timestamp": datetime.now().isoformat()
     })
 
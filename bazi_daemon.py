@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bazi.py常驻服务
+服务进程预先导入bazi及其用到的datas、lunar_python等模块，在本地Unix套接字上等待请求；
+每个请求在一个线程中调用bazi.main(argv, out)排盘，各次排盘的状态都在各自的上下文中，互不影响。
+客户端只转发命令行参数并打印结果，一次排盘的耗时从解释器启动加导入变为一次往返。
+套接字创建时即为0600（只有启动服务的用户可以连接）。
+
+# 启动服务
+$ python bazi.py --serve
+
+# 通过服务排盘，参数与直接运行相同；服务未启动时在本进程内直接排盘
+$ python bazi_daemon.py -g 1990 5 15 14
+$ python bazi.py --client -g 1990 5 15 14
+
+bazi.py作为主程序运行时每次都要重新编译，脚本中调用时用前一种写法更快。
+
+协议：客户端发送一行JSON {"argv": [...]}，服务端返回一个JSON {"code": 退出码, "out": 标准输出, "err": 标准错误}。
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import traceback
+
+BAZI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bazi.py')
+
+# 默认套接字路径，可用环境变量BAZI_SOCKET或--socket指定
+SOCKET_PATH = os.environ.get('BAZI_SOCKET') or '/tmp/bazi-{}.sock'.format(os.getuid())
+
+# 客户端等待结果的超时秒数
+TIMEOUT = 60
+
+DAEMON_FLAGS = ('--serve', '--client', '--socket')
+
+
+def _parse(argv):
+    """从命令行中取出常驻服务相关的参数，其余原样返回"""
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--serve', action="store_true", default=False)
+    parser.add_argument('--client', action="store_true", default=False)
+    parser.add_argument('--socket', default=SOCKET_PATH)
+    return parser.parse_known_args(argv)
+
+
+class ThreadStream:
+    """按线程转发的输出流：当前线程设置了target时写到target，否则写到原来的流
+
+    contextlib.redirect_stdout等替换的是整个进程的sys.stdout，多个线程同时排盘时会互相覆盖；
+    服务端把sys.stdout、sys.stderr换成ThreadStream，各线程只改自己的target。
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, 'target', None) or self.default
+
+    def write(self, text):
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self._target(), name)
+
+    @contextlib.contextmanager
+    def redirect(self, target):
+        self.local.target = target
+        try:
+            yield target
+        finally:
+            self.local.target = None
+
+
+def _thread_streams():
+    """把sys.stdout、sys.stderr换成ThreadStream，已经换过时直接返回"""
+    if not isinstance(sys.stdout, ThreadStream):
+        sys.stdout = ThreadStream(sys.stdout)
+    if not isinstance(sys.stderr, ThreadStream):
+        sys.stderr = ThreadStream(sys.stderr)
+    return sys.stdout, sys.stderr
+
+
+def run(argv):
+    """在当前线程中排一次盘，返回 (退出码, 标准输出, 标准错误)"""
+    import bazi
+
+    stdout, stderr = _thread_streams()
+    out, err = io.StringIO(), io.StringIO()
+    status = 0
+    with stdout.redirect(out), stderr.redirect(err):
+        try:
+            bazi.main(argv, out)
+        except SystemExit as e:
+            if isinstance(e.code, int) or e.code is None:
+                status = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                status = 1
+        except Exception as e:
+            # 略去本函数所在的一层，与直接运行时的输出一致
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            status = 1
+    return status, out.getvalue(), err.getvalue()
+
+
+class Handler(socketserver.StreamRequestHandler):
+    """处理一个请求，运行在单独的线程中"""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+            argv = [str(item) for item in request['argv']]
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(2, '', '请求格式错误：{}\n'.format(e))
+            return
+        if any(item.split('=')[0] in DAEMON_FLAGS for item in argv):
+            self._reply(2, '', '请求中不能包含{}\n'.format('、'.join(DAEMON_FLAGS)))
+            return
+        self._reply(*run(argv))
+
+    def _reply(self, code, out, err):
+        self.wfile.write(json.dumps({'code': code, 'out': out, 'err': err}, ensure_ascii=False).encode('utf-8'))
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path):
+        # 套接字文件在bind时按umask创建，先收紧umask，创建后不存在其他用户可连接的窗口
+        umask = os.umask(0o077)
+        try:
+            super().__init__(path, Handler)
+        finally:
+            os.umask(umask)
+
+
+def _remove_stale(path):
+    """删除没有服务在监听的套接字文件；已有服务在运行时抛出RuntimeError"""
+    if not os.path.exists(path):
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        os.unlink(path)
+    else:
+        raise RuntimeError("已有服务在运行：{}".format(path))
+    finally:
+        sock.close()
+
+
+def serve(path=SOCKET_PATH):
+    """预热后在path上提供服务，直到收到SIGTERM或Ctrl-C"""
+    sys.path.insert(0, os.path.dirname(BAZI))
+    __import__('bazi')
+    # 历表、四柱索引、文本库在启动时打开，第一个请求不必等待
+    for name in ('calendar_index', 'pillar_index', 'text_store'):
+        __import__(name).load()
+
+    _remove_stale(path)
+    server = Server(path)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print("bazi服务已启动：{}".format(path), file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def request(argv, path=SOCKET_PATH, timeout=TIMEOUT):
+    """把参数发给服务，返回 (退出码, 标准输出, 标准错误)；服务不可用时抛出OSError"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+        sock.sendall(json.dumps({'argv': list(argv)}).encode('utf-8') + b'\n')
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        sock.close()
+    reply = json.loads(b''.join(chunks).decode('utf-8'))
+    return reply['code'], reply['out'], reply['err']
+
+
+def dispatch(argv):
+    """bazi.py启动时调用：--serve启动服务，--client转发给服务后退出；
+    其他情况以及服务不可用时直接返回，由bazi.py在本进程内排盘"""
+    if not any(item.split('=')[0] in DAEMON_FLAGS for item in argv[1:]):
+        return
+    flags, rest = _parse(argv[1:])
+    if flags.serve:
+        try:
+            serve(flags.socket)
+        except RuntimeError as e:
+            sys.exit(str(e))
+        sys.exit(0)
+    if flags.client:
+        try:
+            code, out, err = request(rest, flags.socket)
+        except (OSError, ValueError):
+            sys.argv = argv[:1] + rest
+            return
+        sys.stdout.write(out)
+        sys.stderr.write(err)
+        sys.stdout.flush()
+        sys.exit(code)
+    sys.argv = argv[:1] + rest
+
+
+if __name__ == '__main__':
+    flags, rest = _parse(sys.argv[1:])
+    if flags.serve:
+        dispatch(sys.argv)
+    try:
+        code, out, err = request(rest, flags.socket)
+    except (OSError, ValueError):
+        import bazi
+        bazi.main(rest)
+    else:
+        sys.stdout.write(out)
+        sys.stderr.write(err)
+        sys.exit(code)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+排盘查表数据包
+bazi.py输出中大量内容只取决于很小的键，按键预先汇总成四组数据包：
+
+- 日主（10项）：天干描述、金不换说明、禄分析、六亲对照
+- 日干+月支（120项）：调候、金不换大运、格局选用、司令、旺相休囚、建禄、《穷通宝鉴》
+- 日柱（60项）：日柱坐、六十日用法、空亡
+- 日干+时柱（600项）：《三命通会》
+
+每项在第一次取用时生成并留在表中，build_all()可一次生成全部。
+其中的条文是从文本库解码出的str，预先生成后也无法在fork出的进程间共享，
+gunicorn预加载和常驻服务都不调用build_all()。
+一张命盘只需取四个数据包：
+
+>>> bundle = get_bundles(gans, zhis)
+>>> bundle.month.tiaohou
+"""
+
+import collections
+
+from ganzhi import Gan, Zhi, ten_deities, gan_desc, zhi5
+from datas import tiaohous, jinbuhuan, jins, ges, siling, xiuqius, lu_types, rizhus, days60, empties
+from calendar_index import gz_code
+from corpus import summarys, months
+import yongshen
+
+# 六亲：十神对应的亲属，男命、女命
+LIUQINS = {
+    '男': {'才': '父亲', "财": '妻', "印": '母亲', "枭": '祖父', "官": '女儿', "杀": '儿子',
+          "劫": '姐妹', "比": '兄弟', "食": '下属', "伤": '孙女'},
+    '女': {'才': '父亲', "财": '财', "印": '母亲', "枭": '偏印', "官": '丈夫', "杀": '情夫',
+          "劫": '兄弟', "比": '姐妹', "食": '女儿', "伤": '儿子'},
+}
+
+# 日主：relatives为十天干依次的 (天干, 十神, 男命六亲, 女命六亲)
+Master = collections.namedtuple("Master", "gan desc jin lu_types relatives")
+
+# 日干+月支：xiuqiu为旺相休囚的输出文字，jianlu为月令主气是否为比肩，qiongtong没有条文时为None
+Month = collections.namedtuple("Month", "gan zhi tiaohou jinbuhuan ge siling xiuqiu jianlu "
+                                        "tiaohou_record jinbuhuan_record pattern qiongtong")
+
+# 日柱
+Day = collections.namedtuple("Day", "pillar rizhu days60 empties")
+
+# 日干+时柱：summary没有条文时为None
+Hour = collections.namedtuple("Hour", "gan pillar summary")
+
+Bundles = collections.namedtuple("Bundles", "master month day hour")
+
+_masters = [None] * 10
+_months = [None] * 120
+_days = [None] * 60
+_hours = [None] * 600
+
+
+def _code(pillar):
+    return gz_code(Gan.index(pillar[0]), Zhi.index(pillar[1]))
+
+
+def master(gan):
+    """日主数据包"""
+    i = Gan.index(gan)
+    if _masters[i] is None:
+        relatives = tuple((item, ten_deities[gan][item], LIUQINS['男'][ten_deities[gan][item]],
+                           LIUQINS['女'][ten_deities[gan][item]]) for item in Gan)
+        _masters[i] = Master(gan, gan_desc[gan], jins[gan], lu_types[gan], relatives)
+    return _masters[i]
+
+
+def month(gan, zhi):
+    """日干+月支数据包"""
+    i = yongshen.index(gan, zhi)
+    if _months[i] is None:
+        key = gan + zhi
+        d = zhi5[zhi]
+        _months[i] = Month(
+            gan, zhi,
+            tiaohou=tiaohous[key],
+            jinbuhuan=jinbuhuan[key],
+            ge=ges[ten_deities[gan]['本']][zhi],
+            siling=siling[zhi],
+            xiuqiu=''.join("{}:{} ".format(*item) for item in xiuqius[zhi].items()),
+            jianlu=ten_deities[gan][max(d, key=d.get)] == '比',
+            tiaohou_record=yongshen.tiaohou(gan, zhi),
+            jinbuhuan_record=yongshen.jinbuhuan_tiaohou(gan, zhi),
+            pattern=yongshen.pattern(gan, zhi),
+            qiongtong=months[key] if key in months else None,
+        )
+    return _months[i]
+
+
+def day(pillar):
+    """日柱数据包，pillar如 '甲子' 或 ('甲', '子')"""
+    i = _code(pillar)
+    if _days[i] is None:
+        gan, zhi = pillar
+        _days[i] = Day(gan + zhi, rizhus[gan + zhi], days60[gan + zhi], empties[(gan, zhi)])
+    return _days[i]
+
+
+def hour(gan, pillar):
+    """日干+时柱数据包"""
+    i = Gan.index(gan) * 60 + _code(pillar)
+    if _hours[i] is None:
+        key = ''.join([gan, '日', *pillar])
+        _hours[i] = Hour(gan, ''.join(pillar), summarys[key] if key in summarys else None)
+    return _hours[i]
+
+
+def get_bundles(gans, zhis):
+    """一张命盘的四个数据包，gans、zhis为年月日时的天干、地支"""
+    me = gans[2]
+    return Bundles(master(me), month(me, zhis[1]), day((gans[2], zhis[2])), hour(me, (gans[3], zhis[3])))
+
+
+def build_all():
+    """生成全部数据包，返回各组的项数"""
+    for gan in Gan:
+        master(gan)
+        for zhi in Zhi:
+            month(gan, zhi)
+    for code in range(60):
+        day((Gan[code % 10], Zhi[code % 12]))
+        for gan in Gan:
+            hour(gan, (Gan[code % 10], Zhi[code % 12]))
+    return len(_masters), len(_months), len(_days), len(_hours)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+日历导出
+把罗猴每日提示（年猴、月罗、季猴、杀时、岁破月破、偷休）和个人流年、流月提示
+导出为iCalendar（RFC 5545）或CSV，供日历应用订阅。
+
+事件由生成器逐条产生、逐行写出，不在内存中保留整段日期，适合批量生成多年的订阅文件。
+流年、流月的交节时刻为北京时间（东八区，不含夏令时），iCalendar中换算为UTC（带Z后缀），
+各时区的日历应用都显示在正确的时刻；CSV中仍为北京时间。
+
+$ python calendar_export.py --start 2025-01-01 --end 2026-01-01 -o 2025.ics
+$ python calendar_export.py --start 2025-01-01 --end 2030-01-01 --birth "1990 5 15 14 30" --format csv -o me.csv
+"""
+
+import argparse
+import collections
+import csv
+import datetime
+import heapq
+import sys
+
+from ganzhi import Gan, Zhi, ten_deities, zhi_atts, zhi_time
+from calendar_index import gz_name, load as load_calendar
+from luohou import almanac, ji_hous
+
+# 一条日历事件；all_day为True时start、end为date，否则为datetime，end不含
+Event = collections.namedtuple("Event", "uid start end all_day summary description")
+
+PRODID = "-//bazi//luohou calendar//CN"
+
+# 交节时刻所用的时区：北京时间，固定UTC+8
+BEIJING = datetime.timezone(datetime.timedelta(hours=8))
+UID_DOMAIN = "bazi"
+
+# 四柱名称，用于流年流月与原局地支关系
+ZHU_NAMES = ("年", "月", "日", "时")
+
+
+def day_events(start, end):
+    """[start, end)逐日的罗猴提示，每天一条全天事件"""
+    for item in almanac(start, end):
+        warnings = []
+        if item.year_hou:
+            warnings.append("年猴")
+        if item.month_luo:
+            warnings.append("月罗")
+        if item.ji_hou:
+            warnings.append("{}季猴".format(item.ji_hou))
+        if item.po:
+            warnings.append(item.po)
+        if item.touxiu:
+            warnings.append(item.touxiu)
+
+        ganzhi = ''.join(''.join(pair) for pair in zip(item.gans, item.zhis))
+        sha = ' '.join(zhi + zhi_time[zhi] for zhi in item.sha)
+        summary = ' '.join(warnings + ["杀:" + ''.join(item.sha)])
+        description = "{} 农历{}年{}{}月{}日\n杀时：{}\n日飞星：{}".format(
+            ganzhi, item.lunar_year, "闰" if item.leap else "", item.lunar_month, item.lunar_day,
+            sha, item.nine_star)
+        if item.po:
+            description += "\n{}，大事不宜".format(item.po)
+        if item.ji_hou:
+            description += "\n季猴：{}季{}日".format(item.ji_hou, ji_hous[item.ji_hou])
+        yield Event("{}-luohou@{}".format(item.date.strftime("%Y%m%d"), UID_DOMAIN), item.date,
+                    item.date + datetime.timedelta(days=1), True, summary, description)
+
+
+def _relations(zhi, zhis):
+    """流年、流月地支与原局地支的刑冲合会害"""
+    result = []
+    for name, item in zip(ZHU_NAMES, zhis):
+        for type_ in zhi_atts[zhi]:
+            if type_ == '破':
+                continue
+            if item in zhi_atts[zhi][type_]:
+                result.append("{}:{}支{}".format(type_, name, item))
+    return result
+
+
+def _note(kind, code, gans, zhis):
+    """流年或流月的提示文字：干支、对日主的十神和长生，以及与原局的地支关系"""
+    me = gans[2]
+    gan, zhi = Gan[code % 10], Zhi[code % 12]
+    summary = "{}{} {}:{}".format(kind, gz_name(code), ten_deities[me][gan], ten_deities[me][zhi])
+    relations = _relations(zhi, zhis)
+    if relations:
+        summary += " " + ' '.join(relations)
+    description = "原局：{}\n{}：{} 天干{}为{}，地支{}为{}".format(
+        ' '.join(g + z for g, z in zip(gans, zhis)), kind, gz_name(code),
+        gan, ten_deities[me][gan], zhi, ten_deities[me][zhi])
+    if relations:
+        description += "\n" + '、'.join(relations)
+    return summary, description
+
+
+def chart_events(year, month, day, hour, minute, start, end):
+    """出生于公历year-month-day hour:minute者在[start, end)内的流年、流月提示
+
+    流年自立春交节时刻起，流月自每个节的交节时刻起，到下一个节为止。
+    """
+    calendar = load_calendar()
+    codes = calendar.pillars(year, month, day, hour, minute)
+    gans = [Gan[code % 10] for code in codes]
+    zhis = [Zhi[code % 12] for code in codes]
+
+    first = datetime.datetime.combine(calendar.start, datetime.time())
+    begin = datetime.datetime(start.year, start.month, start.day)
+    stop = datetime.datetime(end.year, end.month, end.day)
+
+    def moment(seq):
+        return first + datetime.timedelta(minutes=calendar.jieqi(seq)[1])
+
+    # 节气表中的节（奇数序号）：先找到start之前最近的一个节，再退到当年立春，
+    # 这样start时已经开始的流年、流月也会导出
+    seq = (calendar.jieqi_first + 1) % 2
+    while seq + 2 < calendar.jieqi_count and moment(seq + 2) <= begin:
+        seq += 2
+    while seq >= 2 and calendar.jieqi(seq)[0] != '立春':
+        seq -= 2
+
+    while seq + 24 < calendar.jieqi_count:
+        name = calendar.jieqi(seq)[0]
+        current = moment(seq)
+        if current >= stop:
+            break
+        year_code, month_code, _, _ = calendar.pillars(current.year, current.month, current.day,
+                                                       current.hour, current.minute)
+        uid = current.strftime("%Y%m%d%H%M")
+        if name == '立春' and moment(seq + 24) > begin:
+            summary, description = _note("流年", year_code, gans, zhis)
+            yield Event("{}-liunian@{}".format(uid, UID_DOMAIN), current, moment(seq + 24),
+                        False, summary, description)
+        if moment(seq + 2) > begin:
+            summary, description = _note("流月", month_code, gans, zhis)
+            yield Event("{}-liuyue@{}".format(uid, UID_DOMAIN), current, moment(seq + 2),
+                        False, "{}({})".format(summary, name), description)
+        seq += 2
+
+
+def _sort_key(event):
+    start = event.start
+    if not isinstance(start, datetime.datetime):
+        start = datetime.datetime.combine(start, datetime.time())
+    return start
+
+
+def merge(*streams):
+    """按开始时间合并多个已排序的事件流"""
+    return heapq.merge(*streams, key=_sort_key)
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def _fold(line):
+    """按RFC 5545每行不超过75个字节折行，不拆开UTF-8多字节字符"""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line + '\r\n'
+    parts = []
+    current = ''
+    size = 0
+    limit = 75
+    for char in line:
+        width = len(char.encode('utf-8'))
+        if size + width > limit:
+            parts.append(current)
+            current = ''
+            size = 0
+            limit = 74
+        current += char
+        size += width
+    parts.append(current)
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _ics_time(value, all_day):
+    """全天事件为日期；其余为北京时间的datetime，换算为UTC时刻"""
+    if all_day:
+        return ";VALUE=DATE:" + value.strftime("%Y%m%d")
+    utc = value.replace(tzinfo=BEIJING).astimezone(datetime.timezone.utc)
+    return ":" + utc.strftime("%Y%m%dT%H%M%SZ")
+
+
+def write_ics(events, out, name="八字日历"):
+    """逐条写出iCalendar，out为文本文件对象（newline=''）"""
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    out.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:{}\r\nCALSCALE:GREGORIAN\r\n".format(PRODID))
+    out.write(_fold("X-WR-CALNAME:" + _escape(name)))
+    count = 0
+    for event in events:
+        out.write("BEGIN:VEVENT\r\n")
+        out.write(_fold("UID:" + event.uid))
+        out.write("DTSTAMP:{}\r\n".format(stamp))
+        out.write("DTSTART{}\r\n".format(_ics_time(event.start, event.all_day)))
+        out.write("DTEND{}\r\n".format(_ics_time(event.end, event.all_day)))
+        out.write(_fold("SUMMARY:" + _escape(event.summary)))
+        out.write(_fold("DESCRIPTION:" + _escape(event.description)))
+        out.write("TRANSP:TRANSPARENT\r\nEND:VEVENT\r\n")
+        count += 1
+    out.write("END:VCALENDAR\r\n")
+    return count
+
+
+def write_csv(events, out):
+    """逐条写出CSV，out为文本文件对象（newline=''）"""
+    writer = csv.writer(out)
+    writer.writerow(["start", "end", "all_day", "summary", "description"])
+    count = 0
+    for event in events:
+        fmt = "%Y-%m-%d" if event.all_day else "%Y-%m-%d %H:%M"
+        writer.writerow([event.start.strftime(fmt), event.end.strftime(fmt), int(event.all_day),
+                         event.summary, event.description])
+        count += 1
+    return count
+
+
+if __name__ == '__main__':
+    description = '''
+# 导出2025年罗猴日历
+$ python calendar_export.py --start 2025-01-01 --end 2026-01-01 -o 2025.ics
+
+# 同时导出个人流年流月，CSV格式
+$ python calendar_export.py --start 2025-01-01 --end 2030-01-01 --birth "1990 5 15 14 30" --format csv -o me.csv
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--start', help='起始日期 YYYY-MM-DD', required=True)
+    parser.add_argument('--end', help='结束日期 YYYY-MM-DD（不含）', required=True)
+    parser.add_argument('--birth', help='公历出生时间 "年 月 日 时 [分]"，导出流年流月')
+    parser.add_argument('--no-days', action="store_true", default=False, help='不导出罗猴每日提示')
+    parser.add_argument('--format', choices=['ics', 'csv'], default='ics')
+    parser.add_argument('-o', action="store", help='输出文件，默认标准输出')
+    options = parser.parse_args()
+
+    start = datetime.datetime.strptime(options.start, "%Y-%m-%d").date()
+    end = datetime.datetime.strptime(options.end, "%Y-%m-%d").date()
+    streams = []
+    if not options.no_days:
+        streams.append(day_events(start, end))
+    if options.birth:
+        birth = [int(item) for item in options.birth.split()]
+        streams.append(chart_events(*(birth + [0] * (5 - len(birth))), start, end))
+
+    out = open(options.o, 'w', encoding='utf-8', newline='') if options.o else sys.stdout
+    try:
+        if options.format == 'ics':
+            write_ics(merge(*streams), out)
+        else:
+            write_csv(merge(*streams), out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
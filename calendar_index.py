@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+逐日历表索引
+1800-2200年每天一条定长记录：年柱、月柱、日柱编码，当前所在的节，
+距上一节、下一节的分钟数，农历年月日及闰月标记。文件末尾附带全部节气的
+分钟级时刻表。
+
+文件通过mmap映射，多个API进程经由页缓存共享同一份数据，按日期定位
+记录只需一次乘法和一次读取。
+
+生成索引文件：
+$ python calendar_index.py --start 1800 --end 2200 -o calendar.idx
+"""
+
+import argparse
+import collections
+import datetime
+import mmap
+import os
+import struct
+
+from ganzhi import Gan, Zhi, jqmc
+
+# 干支编码：0为甲子，59为癸亥
+# 节序号：0为立春，1为惊蛰 ... 11为小寒，对应月支为 (序号 + 2) % 12
+HEADER = struct.Struct('<4sHHiiii')
+RECORD = struct.Struct('<BBBBIIHBBB')
+JIEQI = struct.Struct('<i')
+MAGIC = b'BZCI'
+VERSION = 1
+
+# 出生时间距换柱时刻在此分钟数以内时视为临界，同时给出两侧的四柱
+BOUNDARY_MINUTES = 60
+
+START_YEAR = 1800
+END_YEAR = 2200
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calendar.idx')
+
+# 儒略日 = 公历序数 + JD_OFFSET （正午）
+JD_OFFSET = 1721425
+MINUTES_PER_DAY = 1440
+
+Day = collections.namedtuple(
+    "Day", "year month day jie prev_jie next_jie lunar_year lunar_month lunar_day leap")
+Boundary = collections.namedtuple("Boundary", "name moment minutes before after")
+
+# 节序号对应的节名，0为立春
+JIE_NAMES = [jqmc[(2 * n + 3) % 24] for n in range(12)]
+
+
+def gz_code(gan, zhi):
+    """天干、地支序号转换为六十甲子编码"""
+    return (6 * gan - 5 * zhi) % 60
+
+
+def gz_name(code):
+    """六十甲子编码转换为干支字符串，如 0 -> 甲子"""
+    return Gan[code % 10] + Zhi[code % 12]
+
+
+def hour_zhi(hour):
+    """钟点对应的时辰地支序号，23点和0点都为子时"""
+    return (hour + 1) // 2 % 12
+
+
+def _jieqi_minutes(start_year, end_year, origin):
+    """计算节气时刻表
+
+    Returns:
+        (first, minutes): first为第一个节气在jqmc中的序号（冬至为0），
+        minutes为自origin当天0点起的分钟数，向上取整到分钟。
+    """
+    from lunar_python import LunarYear
+
+    base = origin + JD_OFFSET - 0.5
+    minutes = []
+    for year in range(start_year - 1, end_year + 2):
+        # JIE_QI_IN_USE第1到24项为上一年冬至到本年大雪
+        julian_days = LunarYear.fromYear(year).getJieQiJulianDays()
+        for jd in julian_days[1:25]:
+            seconds = int(round((jd - base) * 86400))
+            minutes.append(-(-seconds // 60))
+    return 0, minutes
+
+
+def _lunar_days(start_year, end_year):
+    """按公历序数返回农历(年, 月, 日, 闰)"""
+    from lunar_python import LunarYear
+
+    days = {}
+    for year in range(start_year - 1, end_year + 2):
+        for month in LunarYear.fromYear(year).getMonths():
+            first = month.getFirstJulianDay() - JD_OFFSET
+            leap = 1 if month.getMonth() < 0 else 0
+            for i in range(month.getDayCount()):
+                days[first + i] = (month.getYear(), abs(month.getMonth()), i + 1, leap)
+    return days
+
+
+def build(start_year=START_YEAR, end_year=END_YEAR):
+    """生成索引文件内容"""
+    origin = datetime.date(start_year, 1, 1).toordinal()
+    count = datetime.date(end_year, 12, 31).toordinal() - origin + 1
+    first, jieqis = _jieqi_minutes(start_year, end_year, origin)
+    lunars = _lunar_days(start_year, end_year)
+
+    # 只保留节（奇数序号：小寒、立春、惊蛰……），记录其所属的节序号和干支年
+    jies = []
+    for seq, minute in enumerate(jieqis):
+        term = (first + seq) % 24
+        if term % 2 == 0:
+            continue
+        date = datetime.date.fromordinal(origin + minute // MINUTES_PER_DAY)
+        n = (term - 3) % 24 // 2
+        year = date.year if term >= 3 else date.year - 1
+        jies.append((minute, n, year))
+
+    out = bytearray(HEADER.size + RECORD.size * count + JIEQI.size * len(jieqis))
+    HEADER.pack_into(out, 0, MAGIC, VERSION, RECORD.size, origin, count, len(jieqis), first)
+
+    k = 0
+    for i in range(count):
+        start = i * MINUTES_PER_DAY
+        while jies[k + 1][0] <= start:
+            k += 1
+        minute, n, year = jies[k]
+        year_gan = (year - 4) % 10
+        year_code = (year - 4) % 60
+        month_code = gz_code((year_gan % 5 * 2 + 2 + n) % 10, (n + 2) % 12)
+        day_code = (origin + i + JD_OFFSET - 11) % 60
+        lunar_year, lunar_month, lunar_day, leap = lunars[origin + i]
+        RECORD.pack_into(out, HEADER.size + i * RECORD.size,
+                         year_code, month_code, day_code, n,
+                         start - minute, jies[k + 1][0] - start,
+                         lunar_year, lunar_month, lunar_day, leap)
+
+    offset = HEADER.size + RECORD.size * count
+    for i, minute in enumerate(jieqis):
+        JIEQI.pack_into(out, offset + i * JIEQI.size, minute)
+    return bytes(out)
+
+
+def write(path=DEFAULT_PATH, start_year=START_YEAR, end_year=END_YEAR):
+    data = build(start_year, end_year)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+class CalendarIndex:
+    """只读的逐日历表，数据来自mmap映射的文件或内存中的bytes"""
+
+    def __init__(self, buf):
+        self.buf = memoryview(buf)
+        magic, version, size, origin, count, jq_count, jq_first = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError("历表索引格式不匹配，请重新生成")
+        self.origin = origin
+        self.count = count
+        self.jieqi_count = jq_count
+        self.jieqi_first = jq_first
+        self.jieqi_offset = HEADER.size + RECORD.size * count
+        self.start = datetime.date.fromordinal(origin)
+        self.end = datetime.date.fromordinal(origin + count - 1)
+
+    @classmethod
+    def open(cls, path=DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm)
+
+    def offset(self, year, month, day):
+        """日期在表中的序号，超出范围抛出ValueError"""
+        i = datetime.date(year, month, day).toordinal() - self.origin
+        if not 0 <= i < self.count:
+            raise ValueError("日期超出历表范围：{}-{}".format(self.start, self.end))
+        return i
+
+    def record(self, i):
+        return Day(*RECORD.unpack_from(self.buf, HEADER.size + i * RECORD.size))
+
+    def day(self, year, month, day):
+        return self.record(self.offset(year, month, day))
+
+    def date(self, i):
+        return datetime.date.fromordinal(self.origin + i)
+
+    def jie_of_day(self, year, month, day):
+        """当天结束时所在的节序号（0为立春），当天交节时取新节"""
+        rec = self.day(year, month, day)
+        return (rec.jie + 1) % 12 if rec.next_jie < MINUTES_PER_DAY else rec.jie
+
+    def jieqi(self, seq):
+        """第seq个节气：(名称, 距起始日0点的分钟数)"""
+        minute, = JIEQI.unpack_from(self.buf, self.jieqi_offset + seq * JIEQI.size)
+        return jqmc[(self.jieqi_first + seq) % 24], minute
+
+    def jieqi_datetime(self, seq):
+        name, minute = self.jieqi(seq)
+        start = datetime.datetime.combine(self.start, datetime.time())
+        return name, start + datetime.timedelta(minutes=minute)
+
+    def pillars(self, year, month, day, hour, minute=0):
+        """四柱编码 (年, 月, 日, 时)
+
+        与lunar_python的EightChar默认流派一致：以节交接时刻换月、立春交接时刻换年，
+        晚子时日柱算当天、时干按次日起。
+        """
+        return self.pillars_at(self.offset(year, month, day), hour * 60 + minute)
+
+    def pillars_at(self, i, minute):
+        """第i天0点起第minute分钟的四柱编码，minute可以为负或超过一天"""
+        i += minute // MINUTES_PER_DAY
+        minute %= MINUTES_PER_DAY
+        if not 0 <= i < self.count:
+            raise ValueError("日期超出历表范围：{}-{}".format(self.start, self.end))
+        rec = self.record(i)
+        year_code, month_code = rec.year, rec.month
+        if minute >= rec.next_jie:
+            month_code = (month_code + 1) % 60
+            if rec.jie == 11:
+                year_code = (year_code + 1) % 60
+        hour = minute // 60
+        day_gan = (rec.day + (1 if hour == 23 else 0)) % 10
+        zhi = hour_zhi(hour)
+        time_code = gz_code((day_gan % 5 * 2 + zhi) % 10, zhi)
+        return year_code, month_code, rec.day, time_code
+
+    def boundaries(self, year, month, day, hour, minute=None, window=BOUNDARY_MINUTES):
+        """出生时刻前后window分钟内的换柱时刻
+
+        包括节的交接时刻、子初(23点，时柱换子时)和子正(0点，日柱交接)。
+        每个边界给出边界前、后两种四柱编码，全部由历表推算，不调用历法库。
+        minute为None（出生时间只到小时）时按整点计算，且不判断子初、子正：
+        23点、0点出生总在其60分钟以内，这种临界只是缺少分钟造成的。
+
+        Returns:
+            list: Boundary(名称, 时刻datetime, 出生时间距边界的分钟数, 边界前四柱, 边界后四柱)
+        """
+        i = self.offset(year, month, day)
+        rec = self.record(i)
+        t = hour * 60 + (minute or 0)
+        edges = [(JIE_NAMES[rec.jie], -rec.prev_jie), (JIE_NAMES[(rec.jie + 1) % 12], rec.next_jie)]
+        if minute is not None:
+            edges += [('子初', -60), ('子正', 0), ('子初', 23 * 60), ('子正', MINUTES_PER_DAY)]
+        start = datetime.datetime.combine(self.date(i), datetime.time())
+        result = []
+        for name, edge in sorted(edges, key=lambda item: item[1]):
+            if abs(t - edge) >= window:
+                continue
+            try:
+                before = self.pillars_at(i, edge - 1)
+                after = self.pillars_at(i, edge)
+            except ValueError:
+                continue
+            if before != after:
+                result.append(Boundary(name, start + datetime.timedelta(minutes=edge), t - edge, before, after))
+        return result
+
+
+_index = None
+
+
+def load(path=DEFAULT_PATH):
+    """打开历表索引，文件不存在时先生成；目录不可写时在内存中生成"""
+    global _index
+    if path != DEFAULT_PATH:
+        return CalendarIndex.open(path)
+    if _index is None:
+        if not os.path.exists(path):
+            try:
+                write(path)
+            except OSError:
+                _index = CalendarIndex(build())
+                return _index
+        _index = CalendarIndex.open(path)
+    return _index
+
+
+if __name__ == '__main__':
+    description = '''
+# 生成1800-2200年逐日历表索引
+$ python calendar_index.py -o calendar.idx
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--start', help='start year', type=int, default=START_YEAR)
+    parser.add_argument('--end', help='end year', type=int, default=END_YEAR)
+    parser.add_argument('-o', action="store", help='输出文件', default=DEFAULT_PATH)
+    options = parser.parse_args()
+
+    size = write(options.o, options.start, options.end)
+    index = CalendarIndex.open(options.o)
+    print("{} {}~{} 共{}天 {}字节".format(options.o, index.start, index.end, index.count, size))
@@ -8,11 +8,8 @@ import collections
 import pprint
 import datetime
 
-from bidict import bidict
-
 from datas import *
 from ganzhi import *
-from sizi import summarys
 
 def check_gan(gan, gans):
     result = ''
@@ -28,14 +25,14 @@ def yinyang(item):
     else:
         return '＋' if Zhi.index(item)%2 == 0 else '－'
     
-def yinyangs(zhis):
+def yinyangs(zhis, file=None):
     result = []
     for item in zhis:
         result.append(yinyang(item))
     if set(result) == set('＋'):
-        print("四柱全阳")
+        print("四柱全阳", file=file)
     if set(result) == set('－'):
-        print("四柱全阴")
+        print("四柱全阴", file=file)
     
     
     
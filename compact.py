@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的只读查表
+ganzhi.py、datas.py中的基础表原先是字典套OrderedDict、每个都维护一份反查字典的bidict、
+以元组为键的字典。这里改为按天干、地支、六十甲子序号存放在元组中，记录类型用__slots__，
+同一组键的下标字典只保留一份，反查表在第一次用到时生成并缓存。
+各类型都实现Mapping接口，原有的 table[key]、in、遍历、.get、.items() 写法不变。
+
+64位CPython 3.11，tracemalloc测得各表本身的内存（python compact.py 可复现）：
+
+    表                    原结构      现结构
+    ten_deities           25.0KB      4.6KB
+    zhi5                   5.1KB      3.6KB
+    nayins、empties        29.0KB      4.7KB
+    ganzhi60、shengxiaos    6.8KB      1.9KB
+    合计                  65.9KB     14.8KB
+
+更大的节省在于ganzhi、datas、common不再导入bidict。python -m startup_profile 测得
+（字节码已编译）导入datas后占用内存由1879KB降为489KB，导入耗时由9.3ms降为2.0ms，
+gunicorn每个worker都省下这部分。
+
+$ python compact.py
+"""
+
+import collections.abc
+
+GANS = "甲乙丙丁戊己庚辛壬癸"
+ZHIS = "子丑寅卯辰巳午未申酉戌亥"
+
+GAN_CODES = {gan: i for i, gan in enumerate(GANS)}
+ZHI_CODES = {zhi: i for i, zhi in enumerate(ZHIS)}
+
+
+def pillar_code(gan, zhi):
+    """干支的六十甲子序号，0为甲子；阴阳不配的组合返回None"""
+    i, j = GAN_CODES.get(gan), ZHI_CODES.get(zhi)
+    if i is None or j is None or (i - j) % 2:
+        return None
+    return (6 * i - 5 * j) % 60
+
+
+class TwoWay(collections.abc.Mapping):
+    """一一对应的只读表，inverse为值到键的反查表
+
+    keys、values为等长元组；index为键到下标的字典，多张表的键相同时可共用一份，
+    为None时在keys中直接查找。inverse第一次访问时生成（带自己的下标字典）并缓存，
+    其inverse即为原表。
+    """
+
+    __slots__ = ('_keys', '_values', '_index', '_inverse')
+
+    def __init__(self, keys, values, index=None):
+        self._keys = tuple(keys)
+        self._values = tuple(values)
+        self._index = index
+        self._inverse = None
+
+    @classmethod
+    def from_dict(cls, items, keys=None, index=None):
+        """由字典生成；给出keys时按keys的顺序存放"""
+        keys = tuple(items) if keys is None else keys
+        return cls(keys, [items[key] for key in keys], index)
+
+    def _find(self, key):
+        if self._index is not None:
+            return self._index[key]
+        try:
+            return self._keys.index(key)
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __getitem__(self, key):
+        return self._values[self._find(key)]
+
+    def __contains__(self, key):
+        if self._index is not None:
+            return key in self._index
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def inverse(self):
+        if self._inverse is None:
+            # 值有重复时（如ten_deities中天干、地支同为一个十神）取第一个，与按顺序查找一致
+            index = {}
+            for i, value in enumerate(self._values):
+                index.setdefault(value, i)
+            inverse = TwoWay(self._values, self._keys, index)
+            inverse._inverse = self
+            self._inverse = inverse
+        return self._inverse
+
+    def __reduce__(self):
+        return type(self), (self._keys, self._values, self._index)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, dict(zip(self._keys, self._values)))
+
+
+class Hidden(collections.abc.Mapping):
+    """地支藏干及其分数，按主气、中气、余气的顺序"""
+
+    __slots__ = ('gans', 'weights')
+
+    def __init__(self, gans, weights):
+        self.gans = tuple(gans)
+        self.weights = tuple(weights)
+
+    @classmethod
+    def from_dict(cls, items):
+        return cls(items.keys(), items.values())
+
+    def __getitem__(self, gan):
+        try:
+            return self.weights[self.gans.index(gan)]
+        except ValueError:
+            raise KeyError(gan) from None
+
+    def __contains__(self, gan):
+        return gan in self.gans
+
+    def __iter__(self):
+        return iter(self.gans)
+
+    def __len__(self):
+        return len(self.gans)
+
+    def __reduce__(self):
+        return type(self), (self.gans, self.weights)
+
+    def __repr__(self):
+        return "Hidden({})".format(dict(zip(self.gans, self.weights)))
+
+
+class Pillars(collections.abc.Mapping):
+    """以干支为键的表，如 nayins[('甲', '子')]，按六十甲子序号存放；键也可以是 '甲子'"""
+
+    __slots__ = ('_values',)
+
+    def __init__(self, values):
+        self._values = tuple(values)
+
+    @classmethod
+    def from_dict(cls, items):
+        values = [None] * 60
+        for (gan, zhi), value in items.items():
+            values[pillar_code(gan, zhi)] = value
+        return cls(values)
+
+    def _code(self, key):
+        if len(key) == 2:
+            code = pillar_code(*key)
+            if code is not None and self._values[code] is not None:
+                return code
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        return self._values[self._code(key)]
+
+    def __contains__(self, key):
+        try:
+            self._code(key)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        for code, value in enumerate(self._values):
+            if value is not None:
+                yield GANS[code % 10], ZHIS[code % 12]
+
+    def __len__(self):
+        return sum(value is not None for value in self._values)
+
+    def __reduce__(self):
+        return type(self), (self._values,)
+
+    def __repr__(self):
+        return "Pillars({})".format(dict(self.items()))
+
+
+def _measure(build):
+    """build()返回的对象在tracemalloc下占用的字节数"""
+    import gc
+    import tracemalloc
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return size
+
+
+if __name__ == '__main__':
+    import argparse
+
+    description = '''
+# 对比基础表原结构（字典、OrderedDict、bidict）与紧凑结构的内存，需要安装bidict
+$ python compact.py
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.parse_args()
+
+    import sys
+    from collections import OrderedDict
+    try:
+        from bidict import bidict
+    except ImportError:
+        # bidict已不是依赖，只有对比原结构时才需要
+        sys.exit("对比原结构需要bidict：pip install bidict")
+    import ganzhi
+    import datas
+
+    def deities_old():
+        return {gan: bidict(table) for gan, table in ganzhi.ten_deities.items()}
+
+    def deities_new():
+        return {gan: TwoWay.from_dict(dict(table), ganzhi.DEITY_KEYS, ganzhi.DEITY_INDEX)
+                for gan, table in ganzhi.ten_deities.items()}
+
+    pairs = [
+        ('ten_deities', deities_old, deities_new),
+        ('zhi5', lambda: {zhi: OrderedDict(d) for zhi, d in ganzhi.zhi5.items()},
+         lambda: {zhi: Hidden.from_dict(dict(d)) for zhi, d in ganzhi.zhi5.items()}),
+        ('nayins、empties', lambda: (dict(datas.nayins), dict(datas.empties)),
+         lambda: (Pillars.from_dict(dict(datas.nayins)), Pillars.from_dict(dict(datas.empties)))),
+        ('ganzhi60、shengxiaos', lambda: (bidict(ganzhi.ganzhi60), bidict(ganzhi.shengxiaos)),
+         lambda: (TwoWay.from_dict(dict(ganzhi.ganzhi60)), TwoWay.from_dict(dict(ganzhi.shengxiaos)))),
+    ]
+    total_old = total_new = 0
+    print("{:<22}{:>10}{:>10}".format("表", "原结构", "现结构"))
+    for name, old, new in pairs:
+        # 中间用到的字典不计入
+        size_old = _measure(old)
+        size_new = _measure(new)
+        total_old += size_old
+        total_new += size_new
+        print("{:<22}{:>9.1f}K{:>9.1f}K".format(name, size_old / 1024, size_new / 1024))
+    print("{:<22}{:>9.1f}K{:>9.1f}K".format("合计", total_old / 1024, total_new / 1024))
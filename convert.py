@@ -1,25 +1,80 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-# Author: 钉钉或微信pythontesting 钉钉群21734177 
+# Author: 钉钉或微信pythontesting 钉钉群21734177
 # CreateDate: 2019-2-21
 
 import argparse
-import subprocess
+import sys
 
-description = '''
+from pillar_index import load as load_pillars
+
+
+def to_pillars(gans, zhis):
+    """天干、地支字符串合成四柱，如 ('庚辛庚癸', '午巳辰未') -> ['庚午', '辛巳', '庚辰', '癸未']"""
+    return ["".join(item) for item in zip(gans, zhis)]
+
+
+def parse_line(line):
+    """批量输入的一行：'庚辛庚癸 午巳辰未' 或 '庚午 辛巳 庚辰 癸未'"""
+    items = line.split()
+    if len(items) == 2 and len(items[0]) == len(items[1]) == 4:
+        return to_pillars(*items)
+    if len(items) == 4 and all(len(item) == 2 for item in items):
+        return items
+    raise ValueError("无法识别的四柱：{}".format(line.strip()))
+
+
+def run_bazi(pillars, *args, out=None):
+    """在当前进程中排盘（bazi.py -b），输出写到out，默认为当时的sys.stdout"""
+    import bazi
+    bazi.main(['-b'] + list(pillars) + list(args), out)
+
+
+def convert_batch(lines, out, start=1850, end=2030):
+    """逐行反查可能的出生时间，每行输出：四柱<TAB>出生时间列表"""
+    index = load_pillars()
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            pillars = parse_line(line)
+            total, matches = index.lookup(*pillars, start_year=start, end_year=end, size=None)
+            result = ' '.join(match.start.strftime("%Y-%m-%d %H:%M") for match in matches)
+        except ValueError as e:
+            pillars = line.split()
+            result = "错误：{}".format(e)
+        out.write("{}\t{}\n".format(' '.join(pillars), result))
+
+
+if __name__ == '__main__':
+    description = '''
+# 天干、地支转换为四柱并排盘
+$ python convert.py 庚辛庚癸 午巳辰未
+
+# 批量反查出生时间，每行一个四柱，从文件或标准输入读取
+$ python convert.py --batch pillars.txt
+$ cat pillars.txt | python convert.py --batch -
 '''
-parser = argparse.ArgumentParser(description=description,
-                                 formatter_class=argparse.RawTextHelpFormatter)
-parser.add_argument('gans', action="store", help=u'天干')
-parser.add_argument('zhis', action="store", help=u'地支')
-parser.add_argument('--version', action='version',
-                    version='%(prog)s 0.1 Rongzhong xu 2019 4 12 钉钉或微信pythontesting')
-options = parser.parse_args()
-
-result = ''
-for item in zip(options.gans, options.zhis):
-    result = result + "".join(item) + " "
-
-#subprocess.call("cls", shell=True)
-print(result)
-print(subprocess.check_output("python bazi.py -b " + result, shell=True).decode('gbk'))
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('gans', action="store", nargs='?', help=u'天干')
+    parser.add_argument('zhis', action="store", nargs='?', help=u'地支')
+    parser.add_argument('--batch', help=u'批量模式，输入文件，-为标准输入')
+    parser.add_argument("--start", help="start year", type=int, default=1850)
+    parser.add_argument("--end", help="end year", type=int, default=2030)
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s 0.1 Rongzhong xu 2019 4 12 钉钉或微信pythontesting')
+    options = parser.parse_args()
+
+    if options.batch:
+        if options.batch == '-':
+            convert_batch(sys.stdin, sys.stdout, options.start, options.end)
+        else:
+            with open(options.batch, encoding='utf-8') as f:
+                convert_batch(f, sys.stdout, options.start, options.end)
+    elif options.gans and options.zhis:
+        pillars = to_pillars(options.gans, options.zhis)
+        print(' '.join(pillars) + ' ')
+        run_bazi(pillars, '--start', str(options.start), '--end', str(options.end))
+    else:
+        parser.error(u'请输入天干和地支，或使用--batch')
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+古籍条文
+《三命通会》（sizi.py）和《穷通宝鉴》（yue.py）的条文按需加载：导入本模块不导入这两个文件，
+第一次查询、遍历时才打开text_store的文本库，每条在取用时才从mmap中解码；
+文本库不可用时退回导入源文件。
+
+>>> from corpus import summarys, months
+>>> '甲日甲子' in summarys
+"""
+
+import collections.abc
+import importlib
+
+import text_store
+
+
+class LazyTexts(collections.abc.Mapping):
+    """首次访问时才打开文本库中的name表，失败时导入module并取其中的name字典"""
+
+    def __init__(self, module, name):
+        self.module = module
+        self.name = name
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            try:
+                self._data = text_store.load().table(self.name)
+            except (OSError, ValueError, KeyError):
+                self._data = getattr(importlib.import_module(self.module), self.name)
+        return self._data
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+
+# 《三命通会》：日干+'日'+时柱，如'甲日甲子'
+summarys = LazyTexts('sizi', 'summarys')
+
+# 《穷通宝鉴》：日干+月支，如'甲寅'
+months = LazyTexts('yue', 'months')
@@ -4,7 +4,7 @@
 # CreateDate: 2019-2-21
 
 import collections
-from bidict import bidict
+from compact import Pillars
 
 from ganzhi import *
 
@@ -55,7 +55,7 @@ jianchus = {
 }
 
 
-nayins = {
+nayins = Pillars.from_dict({
     ('甲', '子'): '海中金', ('乙', '丑'): '海中金', ('壬', '寅'): '金泊金', ('癸', '卯'): '金泊金',
     ('庚', '辰'): '白蜡金', ('辛', '巳'): '白蜡金', ('甲', '午'): '砂中金', ('乙', '未'): '砂中金',
     ('壬', '申'): '剑锋金', ('癸', '酉'): '剑锋金', ('庚', '戌'): '钗钏金', ('辛', '亥'): '钗钏金',
@@ -71,9 +71,9 @@ nayins = {
     ('丙', '子'): '涧下水', ('丁', '丑'): '涧下水', ('甲', '寅'): '大溪水', ('乙', '卯'): '大溪水',
     ('壬', '辰'): '长流水', ('癸', '巳'): '长流水', ('丙', '午'): '天河水', ('丁', '未'): '天河水',
     ('甲', '申'): '井泉水', ('乙', '酉'): '井泉水', ('壬', '戌'): '大海水', ('癸', '亥'): '大海水',    
-}
+})
 
-empties = {
+empties = Pillars.from_dict({
     ('甲', '子'): ('戌','亥'), ('乙', '丑'):('戌','亥'), 
     ('丙', '寅'): ('戌','亥'), ('丁', '卯'): ('戌','亥'), 
     ('戊', '辰'): ('戌','亥'), ('己', '巳'): ('戌','亥'),
@@ -110,10 +110,10 @@ empties = {
     ('戊', '午'): ('子','丑'), ('己', '未'): ('子','丑'),
     ('庚', '申'): ('子','丑'), ('辛', '酉'): ('子','丑'), 
     ('壬', '戌'): ('子','丑'), ('癸', '亥'): ('子','丑'),    
-}
+})
 
 
-emptie4s = {
+emptie4s = Pillars.from_dict({
     ('甲', '子'): '水', ('乙', '丑'):'水', 
     ('丙', '寅'): '水', ('丁', '卯'): '水', 
     ('戊', '辰'):  '水', ('己', '巳'):  '水',
@@ -138,7 +138,7 @@ emptie4s = {
     ('戊', '午'):  '金', ('己', '未'):  '金',
     ('庚', '申'):  '金', ('辛', '酉'):  '金', 
     ('壬', '戌'):  '金', ('癸', '亥'):  '金',    
-}
+})
 
 minggongs = {
     "子": "天贵星、志气不凡、富裕清吉。",
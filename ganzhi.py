@@ -3,8 +3,8 @@
 # Author: 钉钉或微信pythontesting 钉钉群21734177 技术支持qq群：630011153 144081101
 # CreateDate: 2019-2-21
 import datetime
-from collections import OrderedDict
-from bidict import bidict
+
+from compact import TwoWay, Hidden
 
 Gan = ["甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸"]
 
@@ -32,7 +32,7 @@ wuhangs = {
     '土':"戊己丑辰未戌",         
 }
 
-ganzhi60 = bidict({
+ganzhi60 = TwoWay.from_dict({
     1:"甲子", 13:"丙子", 25:"戊子", 37:"庚子", 49:"壬子", 2:"乙丑", 14:"丁丑", 26:"己丑", 38:"辛丑", 50:"癸丑", 
     3:"丙寅", 15:"戊寅", 27:"庚寅", 39:"壬寅", 51:"甲寅", 4:"丁卯", 16:"己卯", 28:"辛卯", 40:"癸卯", 52:"乙卯", 
     5:"戊辰", 17:"庚辰", 29:"壬辰", 41:"甲辰", 53:"丙辰", 6:"己巳", 18:"辛巳", 30:"癸巳", 42:"乙巳", 54:"丁巳", 
@@ -42,18 +42,18 @@ ganzhi60 = bidict({
 
 
 zhi5 = {
-    "子":OrderedDict({"癸":8}), 
-    "丑":OrderedDict({"己":5, "癸":2, "辛":1,}), 
-    "寅":OrderedDict({"甲":5, "丙":2, "戊":1, }),
-    "卯":OrderedDict({"乙":8}),
-    "辰":OrderedDict({"戊":5, "乙":2, "癸":1, }),
-    "巳":OrderedDict({"丙":5, "戊":2, "庚":1,}),
-    "午":OrderedDict({"丁":5, "己":3, }),
-    "未":OrderedDict({"己":5, "丁":2, "乙":1,}),
-    "申":OrderedDict({"庚":5, "壬":2, "戊":1, }),
-    "酉":OrderedDict({"辛":8}),
-    "戌":OrderedDict({"戊":5, "辛":2, "丁":1 }),
-    "亥":OrderedDict({"壬":5, "甲":3, })}
+    "子":Hidden.from_dict({"癸":8}), 
+    "丑":Hidden.from_dict({"己":5, "癸":2, "辛":1,}), 
+    "寅":Hidden.from_dict({"甲":5, "丙":2, "戊":1, }),
+    "卯":Hidden.from_dict({"乙":8}),
+    "辰":Hidden.from_dict({"戊":5, "乙":2, "癸":1, }),
+    "巳":Hidden.from_dict({"丙":5, "戊":2, "庚":1,}),
+    "午":Hidden.from_dict({"丁":5, "己":3, }),
+    "未":Hidden.from_dict({"己":5, "丁":2, "乙":1,}),
+    "申":Hidden.from_dict({"庚":5, "壬":2, "戊":1, }),
+    "酉":Hidden.from_dict({"辛":8}),
+    "戌":Hidden.from_dict({"戊":5, "辛":2, "丁":1 }),
+    "亥":Hidden.from_dict({"壬":5, "甲":3, })}
 
 zhi5_list = {
     "子":["癸"], 
@@ -78,53 +78,62 @@ ymc = ["十一", "十二", "正", "二", "三", "四", "五", "六", "七", "八
 rmc = ["初一", "初二", "初三", "初四", "初五", "初六", "初七", "初八", "初九", "初十", "十一", "十二", "十三", "十四", "十五", "十六", "十七", "十八", "十九", "二十", "廿一", "廿二", "廿三", "廿四", "廿五", "廿六", "廿七", "廿八", "廿九", "三十", "卅一"]
 
 
+# 十神、十二长生等：各天干的键相同，共用一份下标
+DEITY_KEYS = tuple(Gan + Zhi + ['库', '本', '克', '被克', '生我', '生', '合', '冲'])
+DEITY_INDEX = {key: i for i, key in enumerate(DEITY_KEYS)}
+
+
+def deities(items):
+    return TwoWay.from_dict(items, DEITY_KEYS, DEITY_INDEX)
+
+
 ten_deities = {
-    '甲':bidict({'甲':'比', "乙":'劫', "丙":'食', "丁":'伤', "戊":'才',
+    '甲':deities({'甲':'比', "乙":'劫', "丙":'食', "丁":'伤', "戊":'才',
                   "己":'财', "庚":'杀', "辛":'官', "壬":'枭', "癸":'印', "子":'沐', 
                   "丑":'冠', "寅":'建', "卯":'帝', "辰":'衰', "巳":'病', "午":'死', 
                   "未":'墓', "申":'绝', "酉":'胎', "戌":'养', "亥":'长', '库':'未_', 
                   '本':'木', '克':'土', '被克':'金', '生我':'水', '生':'火','合':'己','冲':'庚'}),
-    '乙':bidict({'甲':'劫', "乙":'比', "丙":'伤', "丁":'食', "戊":'财',
+    '乙':deities({'甲':'劫', "乙":'比', "丙":'伤', "丁":'食', "戊":'财',
                   "己":'才', "庚":'官', "辛":'杀', "壬":'印',"癸":'枭', "子":'病', 
                   "丑":'衰', "寅":'帝', "卯":'建', "辰":'冠', "巳":'沐', "午":'长',
                   "未":'养', "申":'胎', "酉":'绝', "戌":'墓', "亥":'死', '库':'未_',
                   '本':'木', '克':'土', '被克':'金', '生我':'水', '生':'火','合':'庚','冲':'辛'}),
-    '丙':bidict({'丙':'比', "丁":'劫', "戊":'食', "己":'伤', "庚":'才',
+    '丙':deities({'丙':'比', "丁":'劫', "戊":'食', "己":'伤', "庚":'才',
                   "辛":'财', "壬":'杀', "癸":'官', "甲":'枭', "乙":'印',"子":'胎', 
                   "丑":'养', "寅":'长', "卯":'沐', "辰":'冠', "巳":'建', "午":'帝',
                   "未":'衰', "申":'病', "酉":'死', "戌":'墓', "亥":'绝', '库':'戌_',
                   '本':'火', '克':'金', '被克':'水', '生我':'木', '生':'土','合':'辛','冲':'壬'}),
-    '丁':bidict({'丙':'劫', "丁":'比', "戊":'伤', "己":'食', "庚":'财',
+    '丁':deities({'丙':'劫', "丁":'比', "戊":'伤', "己":'食', "庚":'财',
                   "辛":'才', "壬":'官', "癸":'杀', "甲":'印',"乙":'枭', "子":'绝', 
                   "丑":'墓', "寅":'死', "卯":'病', "辰":'衰', "巳":'帝', "午":'建',
                   "未":'冠', "申":'沐', "酉":'长', "戌":'养', "亥":'胎', '库':'戌_',
                   '本':'火', '克':'金', '被克':'水', '生我':'木', '生':'土','合':'壬','冲':'癸'}),
-    '戊':bidict({'戊':'比', "己":'劫', "庚":'食', "辛":'伤', "壬":'才',
+    '戊':deities({'戊':'比', "己":'劫', "庚":'食', "辛":'伤', "壬":'才',
                   "癸":'财', "甲":'杀', "乙":'官', "丙":'枭', "丁":'印',"子":'胎', 
                   "丑":'养', "寅":'长', "卯":'沐', "辰":'冠', "巳":'建', "午":'帝',
                   "未":'衰', "申":'病', "酉":'死', "戌":'墓', "亥":'绝', '库':'辰_',
                   '本':'土', '克':'水', '被克':'木', '生我':'火', '生':'金','合':'癸','冲':''}),
-    '己':bidict({'戊':'劫', "己":'比', "庚":'伤', "辛":'食', "壬":'财',
+    '己':deities({'戊':'劫', "己":'比', "庚":'伤', "辛":'食', "壬":'财',
                   "癸":'才', "甲":'官', "乙":'杀', "丙":'印',"丁":'枭',"子":'绝', 
                   "丑":'墓', "寅":'死', "卯":'病', "辰":'衰', "巳":'帝', "午":'建',
                   "未":'冠', "申":'沐', "酉":'长', "戌":'养', "亥":'胎', '库':'辰_',
                   '本':'土', '克':'水', '被克':'木', '生我':'火', '生':'金','合':'甲','冲':''}),
-    '庚':bidict({'庚':'比', "辛":'劫', "壬":'食', "癸":'伤', "甲":'才',
+    '庚':deities({'庚':'比', "辛":'劫', "壬":'食', "癸":'伤', "甲":'才',
                   "乙":'财', "丙":'杀', "丁":'官', "戊":'枭', "己":'印',"子":'死', 
                   "丑":'墓', "寅":'绝', "卯":'胎', "辰":'养', "巳":'长', "午":'沐',
                   "未":'冠', "申":'建', "酉":'帝', "戌":'衰', "亥":'病', '库':'丑_',
                   '本':'金', '克':'木', '被克':'火', '生我':'土', '生':'水','合':'乙','冲':'甲'}), 
-    '辛':bidict({'庚':'劫', "辛":'比', "壬":'伤', "癸":'食', "甲":'财',
+    '辛':deities({'庚':'劫', "辛":'比', "壬":'伤', "癸":'食', "甲":'财',
                   "乙":'才', "丙":'官', "丁":'杀', "戊":'印', "己":'枭', "子":'长', 
                   "丑":'养', "寅":'胎', "卯":'绝', "辰":'墓', "巳":'死', "午":'病',
                   "未":'衰', "申":'帝', "酉":'建', "戌":'冠', "亥":'沐', '库':'丑_',
                   '本':'金', '克':'木', '被克':'火', '生我':'土', '生':'水','合':'丙','冲':'乙'}),
-    '壬':bidict({'壬':'比', "癸":'劫', "甲":'食', "乙":'伤', "丙":'才',
+    '壬':deities({'壬':'比', "癸":'劫', "甲":'食', "乙":'伤', "丙":'才',
                   "丁":'财', "戊":'杀', "己":'官', "庚":'枭', "辛":'印',"子":'帝', 
                   "丑":'衰', "寅":'病', "卯":'死', "辰":'墓', "巳":'绝', "午":'胎',
                   "未":'养', "申":'长', "酉":'沐', "戌":'冠', "亥":'建', '库':'辰_',
                   '本':'水', '克':'火', '被克':'土', '生我':'金', '生':'木','合':'丁','冲':'丙'}),
-    '癸':bidict({'壬':'劫', "癸":'比', "甲":'伤', "乙":'食', "丙":'财',
+    '癸':deities({'壬':'劫', "癸":'比', "甲":'伤', "乙":'食', "丙":'财',
                   "丁":'才', "戊":'官', "己":'杀', "庚":'印',"辛":'枭', "子":'建', 
                   "丑":'冠', "寅":'沐', "卯":'长', "辰":'养', "巳":'胎', "午":'绝',
                   "未":'墓', "申":'死', "酉":'病', "戌":'衰', "亥":'帝', '库':'辰_',
@@ -136,7 +145,7 @@ ju = {
     '本':'刃', '被克':'杀',  '克':'才', '生':'伤', '生我':'枭',
 }
 
-shengxiaos = bidict({
+shengxiaos = TwoWay.from_dict({
     "子":"鼠", "丑":"牛", "寅":"虎", "卯":"兔", "辰":"龙", "巳":"蛇", 
     "午":"马", "未":"羊", "申":"猴", "酉":"鸡", "戌":"狗", "亥":"猪"})
 
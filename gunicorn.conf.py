@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+gunicorn配置，在本目录运行 gunicorn bazi_api:app 时自动读取
+
+preload_app使bazi_api在主进程中导入，bazi_api.preload()在主进程中加载全部查表数据并冻结，
+worker由主进程fork而来，与主进程共享这些内存页，增加worker基本不增加查表数据占用的内存。
+
+$ gunicorn bazi_api:app
+$ gunicorn -w 8 -b 0.0.0.0:5000 bazi_api:app
+"""
+
+import gc
+import os
+
+bind = os.environ.get('BAZI_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('BAZI_WORKERS', 4))
+preload_app = True
+
+
+def when_ready(server):
+    import bazi_api
+    server.log.info("查表数据已预加载：%s", bazi_api.preload())
+
+
+def pre_fork(server, worker):
+    # 主进程运行中新建的对象（如重启worker之间的日志对象）也在fork前冻结
+    gc.freeze()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合婚
+两张八字按天干五合、地支关系、五行互补、日柱相合和神煞打分。
+四柱以六十甲子编码（0为甲子）存放，各项规则预先算成按干、支序号索引的小表，
+一张八字对任意多张八字的打分只做数组运算，可在十万级的命盘库中取前k名。
+
+$ python hehun.py 庚午 辛巳 庚辰 癸未 -- 己巳 丙子 甲午 乙亥
+"""
+
+import argparse
+import collections
+
+import numpy as np
+
+from ganzhi import Gan, Zhi, gan_hes, gan5, wuhangs
+from datas import gan_chongs, g_shens, day_shens, year_shens
+from calendar_index import load as load_calendar
+from pillar_index import parse_gz
+import shengxiao
+
+ELEMENTS = "木火土金水"
+
+# 各项权重
+WEIGHTS = collections.OrderedDict([
+    ('gan', 1.0),       # 四干两两五合、相冲
+    ('zhi', 1.0),       # 四支两两合会冲刑害破净分
+    ('wuxing', 1.0),    # 五行互补
+    ('day', 2.0),       # 日柱：日干合冲、日支关系、天合地合
+    ('shensha', 1.0),   # 天乙、桃花、孤辰寡宿
+])
+
+Score = collections.namedtuple("Score", ['total'] + list(WEIGHTS))
+
+
+def _gan_table():
+    """天干五合+1，相冲-1"""
+    table = np.zeros((10, 10), dtype=np.int8)
+    for pairs, value in ((gan_hes, 1), (gan_chongs, -1)):
+        for a, b in pairs:
+            table[Gan.index(a), Gan.index(b)] = table[Gan.index(b), Gan.index(a)] = value
+    return table
+
+
+def _gan_zhi_table(shens):
+    """天干查地支的神煞表：[干][支]为1表示该支是此干的神煞"""
+    table = np.zeros((10, 12), dtype=np.int8)
+    for gan, zhis in shens.items():
+        for zhi in zhis:
+            table[Gan.index(gan), Zhi.index(zhi)] = 1
+    return table
+
+
+def _zhi_zhi_table(*shens):
+    """地支查地支的神煞表"""
+    table = np.zeros((12, 12), dtype=np.int8)
+    for items in shens:
+        for zhi, targets in items.items():
+            for target in targets:
+                table[Zhi.index(zhi), Zhi.index(target)] = 1
+    return table
+
+
+GAN_TABLE = _gan_table()
+ZHI_TABLE = shengxiao.SCORES.astype(np.int8)
+# 六合
+LIUHE_TABLE = ((shengxiao.MASKS >> shengxiao.RELATIONS.index('六')) & 1).astype(np.int8)
+TIANYI_TABLE = _gan_zhi_table(g_shens['天乙'])
+TAOHUA_TABLE = _zhi_zhi_table(day_shens['桃花'])
+GUGUA_TABLE = _zhi_zhi_table(year_shens['孤辰'], year_shens['寡宿'])
+
+# 每个干支编码的五行计数：[编码][木火土金水]
+_ZHI5 = {zhi: element for element, chars in wuhangs.items() for zhi in chars if zhi in Zhi}
+ELEMENT_TABLE = np.zeros((60, 5), dtype=np.int8)
+for _code in range(60):
+    ELEMENT_TABLE[_code, ELEMENTS.index(gan5[Gan[_code % 10]])] += 1
+    ELEMENT_TABLE[_code, ELEMENTS.index(_ZHI5[Zhi[_code % 12]])] += 1
+
+for _table in (GAN_TABLE, ZHI_TABLE, LIUHE_TABLE, TIANYI_TABLE, TAOHUA_TABLE, GUGUA_TABLE, ELEMENT_TABLE):
+    _table.flags.writeable = False
+
+
+def encode(pillars):
+    """四柱干支字符串转换为编码数组，如 ['庚午', '辛巳', '庚辰', '癸未']"""
+    if len(pillars) != 4:
+        raise ValueError("需要年月日时四柱：{}".format(pillars))
+    return np.array([parse_gz(item) for item in pillars], dtype=np.uint8)
+
+
+def chart(year, month, day, hour, minute=0):
+    """公历出生时间的四柱编码"""
+    return np.array(load_calendar().pillars(year, month, day, hour, minute), dtype=np.uint8)
+
+
+def _imbalance(counts):
+    """五行计数偏离均值的总量，越小越均衡"""
+    counts = counts.astype(np.float32)
+    return np.abs(counts - counts.mean(axis=-1, keepdims=True)).sum(axis=-1)
+
+
+def score_many(a, pool):
+    """一张八字a对命盘库pool中每一张的分数
+
+    Args:
+        a: 四柱编码，长度4
+        pool: n×4的四柱编码数组
+
+    Returns:
+        Score: 各项均为长度n的数组，total为加权总分
+    """
+    a = np.asarray(a, dtype=np.intp)
+    pool = np.asarray(pool, dtype=np.intp).reshape(-1, 4)
+    a_gans, a_zhis = a % 10, a % 12
+    gans, zhis = pool % 10, pool % 12
+    n = len(pool)
+
+    # 天干、地支：a的每一柱对pool的四柱，共16对
+    gan = np.zeros(n, dtype=np.float32)
+    zhi = np.zeros(n, dtype=np.float32)
+    for i in range(4):
+        gan += GAN_TABLE[a_gans[i], gans].sum(axis=1)
+        zhi += ZHI_TABLE[a_zhis[i], zhis].sum(axis=1)
+
+    # 五行互补：两盘合并后比各自更均衡则加分
+    a_counts = ELEMENT_TABLE[a].sum(axis=0)
+    counts = ELEMENT_TABLE[pool].sum(axis=1)
+    wuxing = (_imbalance(a_counts) + _imbalance(counts)) / 2 - _imbalance(a_counts + counts) / 2
+
+    # 日柱
+    day_gan = GAN_TABLE[a_gans[2], gans[:, 2]]
+    day_zhi = ZHI_TABLE[a_zhis[2], zhis[:, 2]]
+    tianhe_dihe = (day_gan > 0) & (LIUHE_TABLE[a_zhis[2], zhis[:, 2]] > 0)
+    day = day_gan + day_zhi + 2 * tianhe_dihe
+
+    # 神煞：对方年、日支为己方天乙+1，对方日支为己方桃花+1，为己方孤辰寡宿-1，双向计算
+    shensha = np.zeros(n, dtype=np.float32)
+    for col in (0, 2):
+        shensha += TIANYI_TABLE[a_gans[2], zhis[:, col]]
+        shensha += TIANYI_TABLE[gans[:, 2], a_zhis[col]]
+    shensha += TAOHUA_TABLE[a_zhis[0], zhis[:, 2]] + TAOHUA_TABLE[zhis[:, 0], a_zhis[2]]
+    shensha -= GUGUA_TABLE[a_zhis[0], zhis[:, 2]] + GUGUA_TABLE[zhis[:, 0], a_zhis[2]]
+
+    parts = collections.OrderedDict([('gan', gan), ('zhi', zhi), ('wuxing', wuxing),
+                                     ('day', day.astype(np.float32)), ('shensha', shensha)])
+    total = sum(WEIGHTS[name] * value for name, value in parts.items())
+    return Score(total=total, **parts)
+
+
+def score(a, b):
+    """两张八字的分数，返回各项为浮点数的Score"""
+    result = score_many(a, np.asarray(b).reshape(1, 4))
+    return Score(*(round(float(value[0]), 2) for value in result))
+
+
+def top_k(a, pool, k=10):
+    """命盘库中与a最相配的k张
+
+    Returns:
+        (index, scores): pool中的下标和对应总分，按总分从高到低
+    """
+    total = score_many(a, pool).total
+    k = min(k, len(total))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+    index = np.argpartition(-total, k - 1)[:k]
+    index = index[np.argsort(-total[index], kind='stable')]
+    return index, total[index]
+
+
+if __name__ == '__main__':
+    description = '''
+# 两张八字合婚
+$ python hehun.py 庚午 辛巳 庚辰 癸未 -- 己巳 丙子 甲午 乙亥
+
+# 在随机生成的十万张命盘中取前10名
+$ python hehun.py 庚午 辛巳 庚辰 癸未 --bench 100000
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('pillars', nargs='+', help='四柱，两张八字之间用 -- 分隔')
+    parser.add_argument('--bench', type=int, help='随机命盘数量')
+    parser.add_argument('-k', type=int, default=10)
+    options = parser.parse_args()
+
+    a = encode(options.pillars[:4])
+    if options.bench:
+        import time
+        from calendar_index import gz_name
+        calendar = load_calendar()
+        rng = np.random.default_rng(0)
+        days = rng.integers(0, calendar.count, options.bench)
+        minutes = rng.integers(0, 1440, options.bench)
+        pool = np.array([calendar.pillars_at(int(i), int(m)) for i, m in zip(days, minutes)], dtype=np.uint8)
+        start = time.time()
+        index, totals = top_k(a, pool, options.k)
+        print("{}张命盘，用时{:.1f}毫秒".format(len(pool), (time.time() - start) * 1000))
+        for i, total in zip(index, totals):
+            print(' '.join(gz_name(code) for code in pool[i]), round(float(total), 2))
+    else:
+        b = encode(options.pillars[4:])
+        result = score(a, b)
+        for name, value in zip(Score._fields, result):
+            print(name, value)
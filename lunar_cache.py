@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+lunar_python对象缓存
+Solar.fromYmdHms、getLunar、getEightChar、getYun和getJieQiTable的结果
+按(历法, 年月日时分, 起运性别)放入有界LRU缓存，同一时刻重复排盘时直接复用。
+
+functools.lru_cache在多线程下是安全的，可直接用于多线程的Flask/gunicorn；
+两个线程同时算同一个键时可能各算一次，结果相同，只是少命中一次。
+"""
+
+import collections
+import functools
+
+from lunar_python import Lunar, Solar
+
+CACHE_SIZE = 4096
+
+Chart = collections.namedtuple("Chart", "solar lunar ba yun jieqis")
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _chart(gregorian, year, month, day, hour, minute, male):
+    if gregorian:
+        solar = Solar.fromYmdHms(year, month, day, hour, minute, 0)
+        lunar = solar.getLunar()
+    else:
+        lunar = Lunar.fromYmdHms(year, month, day, hour, minute, 0)
+        solar = lunar.getSolar()
+    ba = lunar.getEightChar()
+    return Chart(solar, lunar, ba, ba.getYun(male), lunar.getJieQiTable())
+
+
+def get_chart(year, month, day, hour=0, minute=0, gregorian=True, male=True):
+    """
+    取得排盘所需的lunar_python对象
+
+    Args:
+        year, month, day: 公历或农历日期，农历闰月用负数月份
+        hour, minute: 时、分
+        gregorian: 是否为公历
+        male: 起运性别，True为男
+
+    Returns:
+        Chart: (solar, lunar, ba, yun, jieqis)，调用方不应修改其中的对象
+    """
+    return _chart(bool(gregorian), int(year), int(month), int(day),
+                  int(hour), int(minute), 1 if male else 0)
+
+
+def stats():
+    """缓存命中统计"""
+    info = _chart.cache_info()
+    total = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+        "hit_rate": round(info.hits / total, 4) if total else 0.0,
+    }
+
+
+def clear():
+    _chart.cache_clear()
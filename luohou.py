@@ -10,89 +10,17 @@ import sxtwl
 import time
 import datetime
 import collections
+import functools
+import os
+import struct
+import sys
+import types
 
-from lunar_python import Lunar
 from colorama import init
 
 from ganzhi import Gan, Zhi, ymc, rmc, zhi_time, jis, zhi_atts, get_jizhu, datouxiu, xiaotouxiu
-
-def get_hou(d, xiazhi, dongzhi):
-    cal_day = sxtwl.fromSolar(d.year, d.month, d.day)
-    lunar = Lunar.fromYmd(cal_day.getLunarYear(), cal_day.getLunarMonth(), cal_day.getLunarDay())
-    ba = lunar.getEightChar()
-    yun = ba.getYun(1)
-    
-    #　计算甲干相合    
-    gz = cal_day.getHourGZ(10)
-    yTG = cal_day.getYearGZ()
-    mTG = cal_day.getMonthGZ()
-    dTG  = cal_day.getDayGZ()
-    
-    
-    gans = Gans(year=Gan[yTG.tg], month=Gan[mTG.tg], 
-                day=Gan[dTG.tg])
-    zhis = Zhis(year=Zhi[yTG.dz], month=Zhi[mTG.dz], 
-                day=Zhi[dTG.dz])
-    
-    
-    print("公历:", end='')
-    print("{}年{}月{}日".format(d.year, d.month, d.day), end='')
-    
-    Lleap = "闰" if cal_day.isLunarLeap() else ""
-    print("\t农:", end='')
-    print("{}年{}{}月{}日  ".format(cal_day.getLunarYear(), Lleap,cal_day.getLunarMonth(), cal_day.getLunarDay()), end='')
-    print(' ',end='')
-    print(''.join([''.join(item) for item in zip(gans, zhis)]), end='')
-    
-    print("\t杀:", end='')   
-    for item in shi_hous[zhis[2]]:
-        print(item + zhi_time[item], end='')
-    
-    
-    day_ganzhi = gans[2] + zhis[2]
-    
-    if day_ganzhi == year_hous[zhis[0]]:
-        print(" 年猴:{}年{}日".format(zhis[0], day_ganzhi), end=' ')
-    
-    if zhis[2] == yue_hous[cal_day.getLunarMonth()]:
-        print(" 月罗:{}日".format(zhis[2]), end=' ')
-    
-    if day_ganzhi in tuple(ji_hous.values()):       
-        birthday = d  
-        for i in range(30):    
-            day_ = sxtwl.fromSolar(birthday.year, birthday.month, birthday.day)
-            if day_.hasJieQi():
-                ji = jis[(day_.getJieQi() + 3)//6]
-                break        
-            birthday += datetime.timedelta(days=-1)
-           
-        if day_ganzhi == ji_hous[ji]:
-            print(" \t季猴:{}季{}日".format(ji, ji_hous[ji]), end=' ')    
-            
-    if d >= xiazhi and d < dongzhi:
-        items = shi_feixings2[Zhi[dTG.dz]]
-    else:
-        items = shi_feixings1[Zhi[dTG.dz]]
-    print()   
-    print(" "*90, lunar.getDayNineStar(), end='')
-    for item in Zhi:
-        print(" {}{}".format(item, items[item]), end='') 
-    print()
-    zeri = ""
-    if zhis.day == zhi_atts[zhis.year]["冲"]:
-        zeri += "\t岁破，大事不宜"
-    elif zhis.day == zhi_atts[zhis.month]["冲"]:
-        zeri += "\t月破，大事不宜" 
-    #print(gans.day + zhis.day)
-    if gans.day + zhis.day in datouxiu:
-        zeri += "\t大偷休" 
-    elif gans.day + zhis.day in xiaotouxiu:
-            zeri += "\t小偷休"    
-    print(zeri)
-
-
-
-init(autoreset=True)
+from lunar_cache import get_chart
+from calendar_index import load as load_calendar
 
 jiuxings_dsp = '''
     一白水星 —— + 贪狼：事业、人缘与桃花
@@ -157,106 +85,366 @@ shi_feixings2 = {"子":zheng_jiuxings_shi2, "丑":ku_jiuxings_shi2, "寅":sheng_
 Gans = collections.namedtuple("Gans", "year month day")
 Zhis = collections.namedtuple("Zhis", "year month day")
 JiuFeiXing = collections.namedtuple("JiuFeiXing", "中 西北 西 东北 南 北 西南 东 东南")
+Day = collections.namedtuple(
+    "Day", "date lunar_year lunar_month lunar_day leap gans zhis sha year_hou month_luo ji_hou "
+           "nine_star shi_feixing po touxiu")
 
 
+# 日飞星，下标为lunar_python的NineStar序号
+nine_stars = ['一白水天枢', '二黑土天璇', '三碧木天玑', '四绿木天权', '五黄土玉衡', 
+              '六白金开阳', '七赤金摇光', '八白土洞明', '九紫火隐元']
+seasons = ["", '春', '夏', '秋', '冬']
 
+YearAlmanac = collections.namedtuple("YearAlmanac", "year ganzhi stars months mountains jizhu days")
 
-description = '''
-# 年罗猴日
-$ python luohou.py -d "2019 6 16"
+# 年历文件：每年一个，文件头后每天一条记录
+# 农历年月日、闰月、年月日干支序号、季猴季节、日飞星序号、时飞星是否逆排
+ALMANAC_HEADER = struct.Struct('<4sHHH')
+ALMANAC_RECORD = struct.Struct('<HBBBBBBBBBBBB')
+ALMANAC_MAGIC = b'BZAL'
+ALMANAC_VERSION = 1
+ALMANAC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'almanac')
 
-'''
+# 随代码提交的年历范围，python luohou.py --build 1950 2100 生成
+PREBUILT_START = 1950
+PREBUILT_END = 2100
 
-parser = argparse.ArgumentParser(description=description,
-                                 formatter_class=argparse.RawTextHelpFormatter)
-parser.add_argument('-d', action="store", help=u'year',default="")
-parser.add_argument('-n', action="store", help=u'days',default=32, type=int)
-parser.add_argument('--version', action='version',
-                    version='%(prog)s 0.1 Rongzhong xu 2019 05 05')
-options = parser.parse_args()
+# 进程内缓存的年数
+YEAR_CACHE_SIZE = 16
 
-Gans = collections.namedtuple("Gans", "year month day")
-Zhis = collections.namedtuple("Zhis", "year month day")
 
-if options.d:
-    year, month, day = options.d.split()
-    d = datetime.datetime(int(year), int(month), int(day))
-else:
-    d = datetime.datetime.today()
+def solstices(year):
+    """year年的夏至、冬至时刻"""
+    jieqis = get_chart(year, 5, 1, gregorian=False).jieqis
+    xiazhi = datetime.datetime.strptime(' '.join(jieqis['夏至'].toFullString().split(' ')[:2]), "%Y-%m-%d %H:%M:%S")
+    dongzhi = datetime.datetime.strptime(' '.join(jieqis['DONG_ZHI'].toFullString().split(' ')[:2]), "%Y-%m-%d %H:%M:%S")
+    return xiazhi, dongzhi
+
+
+def get_season(d):
+    """d所在的季节，以四立所在日为界，由历表索引直接取得"""
+    try:
+        jie = load_calendar().jie_of_day(d.year, d.month, d.day)
+    except ValueError:
+        # 超出历表范围时向前逐日查找最近的节气
+        for i in range(30):    
+            day_ = sxtwl.fromSolar(d.year, d.month, d.day)
+            if day_.hasJieQi():
+                return jis[(day_.getJieQi() + 3)//6]
+            d += datetime.timedelta(days=-1)
+    return jis[jie // 3 + 1]
+
+
+def make_day(d, lunar_year, lunar_month, lunar_day, leap, gans, zhis, ji, nine_star, yin):
+    """由农历、干支、季猴、日飞星和阴遁标记推出当天的Day
+
+    Args:
+        ji: 季猴所在季节，不是季猴日为""
+        nine_star: 日飞星序号，0为一白
+        yin: 是否在夏至到冬至之间，时飞星逆排
+    """
+    day_ganzhi = gans.day + zhis.day
+    items = shi_feixings2[zhis.day] if yin else shi_feixings1[zhis.day]
     
-cal_day = sxtwl.fromSolar(d.year, d.month, d.day)
-yTG = cal_day.getYearGZ()
-mTG = cal_day.getMonthGZ()
-dTG  = cal_day.getDayGZ()
-
-
-gans = Gans(year=Gan[yTG.tg], month=Gan[mTG.tg], 
-            day=Gan[dTG.tg])
-zhis = Zhis(year=Zhi[yTG.dz], month=Zhi[mTG.dz], 
-            day=Zhi[dTG.dz])
-mountains[zhis.year] += " 太岁"
-mountains[zhi_atts[zhis.year]['冲']] += " 岁破"
+    po = ""
+    if zhis.day == zhi_atts[zhis.year]["冲"]:
+        po = "岁破"
+    elif zhis.day == zhi_atts[zhis.month]["冲"]:
+        po = "月破"
+    
+    touxiu = ""
+    if day_ganzhi in datouxiu:
+        touxiu = "大偷休"
+    elif day_ganzhi in xiaotouxiu:
+        touxiu = "小偷休"
+    
+    return Day(date=datetime.date(d.year, d.month, d.day), lunar_year=lunar_year, lunar_month=lunar_month, 
+               lunar_day=lunar_day, leap=bool(leap), gans=gans, zhis=zhis, 
+               sha=tuple(shi_hous[zhis.day]), year_hou=day_ganzhi == year_hous[zhis.year],
+               month_luo=zhis.day == yue_hous[lunar_month], ji_hou=ji,
+               nine_star=nine_stars[nine_star], shi_feixing=tuple(items[item] for item in Zhi),
+               po=po, touxiu=touxiu)
+
+
+def get_day(d, xiazhi, dongzhi):
+    """d当天的罗猴、杀时、飞星、破日和偷休，返回Day"""
+    d = datetime.datetime(d.year, d.month, d.day)
+    cal_day = sxtwl.fromSolar(d.year, d.month, d.day)
+    # 日飞星按公历日期取：sxtwl与lunar_python个别年份的农历月大小不同（如1952年五月），
+    # 闰月的日期也不能按农历年月日转换
+    lunar = get_chart(d.year, d.month, d.day).lunar
+
+    yTG = cal_day.getYearGZ()
+    mTG = cal_day.getMonthGZ()
+    dTG  = cal_day.getDayGZ()
+    
+    gans = Gans(year=Gan[yTG.tg], month=Gan[mTG.tg], 
+                day=Gan[dTG.tg])
+    zhis = Zhis(year=Zhi[yTG.dz], month=Zhi[mTG.dz], 
+                day=Zhi[dTG.dz])
+    
+    day_ganzhi = gans[2] + zhis[2]
+    
+    ji = ""
+    if day_ganzhi in tuple(ji_hous.values()):       
+        season = get_season(d)
+        if day_ganzhi == ji_hous[season]:
+            ji = season
+    
+    return make_day(d, cal_day.getLunarYear(), cal_day.getLunarMonth(), cal_day.getLunarDay(), 
+                    cal_day.isLunarLeap(), gans, zhis, ji, lunar.getDayNineStar().getIndex(),
+                    xiazhi <= d < dongzhi)
+
+
+def year_stars(year):
+    """year年九宫飞星，中宫星数为 (11 - year % 9) % 9，0为九紫"""
+    index = (11 - year % 9) % 9
+    return JiuFeiXing(*fangweis[index:], *fangweis[0:index])
+
+
+def year_mountains(zhi):
+    """二十四山的太岁、岁破"""
+    result = dict(mountains)
+    result[zhi] += " 太岁"
+    result[zhi_atts[zhi]['冲']] += " 岁破"
+    return result
+
+
+def month_stars(zhi):
+    """年支对应的正月到十二月飞星"""
+    items = month_feixings[zhi]
+    return tuple(items[i] for i in range(1, 13))
+
+
+def _encode_year(year, days):
+    out = bytearray(ALMANAC_HEADER.size + ALMANAC_RECORD.size * len(days))
+    ALMANAC_HEADER.pack_into(out, 0, ALMANAC_MAGIC, ALMANAC_VERSION, year, len(days))
+    for i, item in enumerate(days):
+        ALMANAC_RECORD.pack_into(
+            out, ALMANAC_HEADER.size + i * ALMANAC_RECORD.size,
+            item.lunar_year, item.lunar_month, item.lunar_day, item.leap,
+            Gan.index(item.gans.year), Zhi.index(item.zhis.year), Gan.index(item.gans.month), 
+            Zhi.index(item.zhis.month), Gan.index(item.gans.day), Zhi.index(item.zhis.day),
+            seasons.index(item.ji_hou), nine_stars.index(item.nine_star), 
+            item.shi_feixing == tuple(shi_feixings2[item.zhis.day][zhi] for zhi in Zhi))
+    return bytes(out)
+
+
+def _decode_year(year, data):
+    magic, version, year_, count = ALMANAC_HEADER.unpack_from(data, 0)
+    if magic != ALMANAC_MAGIC or version != ALMANAC_VERSION or year_ != year:
+        raise ValueError("罗猴年历文件格式不匹配")
+    d = datetime.date(year, 1, 1)
+    days = []
+    for i, rec in enumerate(ALMANAC_RECORD.iter_unpack(data[ALMANAC_HEADER.size:])):
+        (lunar_year, lunar_month, lunar_day, leap, year_gan, year_zhi, month_gan, month_zhi, 
+         day_gan, day_zhi, ji, nine_star, yin) = rec
+        gans = Gans(year=Gan[year_gan], month=Gan[month_gan], day=Gan[day_gan])
+        zhis = Zhis(year=Zhi[year_zhi], month=Zhi[month_zhi], day=Zhi[day_zhi])
+        days.append(make_day(d + datetime.timedelta(days=i), lunar_year, lunar_month, lunar_day, leap, 
+                             gans, zhis, seasons[ji], nine_star, yin))
+    if len(days) != count:
+        raise ValueError("罗猴年历文件不完整")
+    return days
+
+
+def build_year(year):
+    """逐日计算year年全年的Day记录"""
+    return list(almanac_days(datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)))
+
+
+def write_year(year, days, directory=ALMANAC_DIR):
+    """写入year年的年历文件；临时文件名带进程号，多个进程同时写入互不覆盖"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "{}.bin".format(year))
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(_encode_year(year, days))
+    os.replace(tmp, path)
+
+
+def build_years(start, end, directory=ALMANAC_DIR):
+    """生成[start, end]各年的年历文件"""
+    for year in range(start, end + 1):
+        write_year(year, build_year(year), directory)
+        yield year
+
+
+@functools.lru_cache(maxsize=YEAR_CACHE_SIZE)
+def _year(year):
+    path = os.path.join(ALMANAC_DIR, "{}.bin".format(year))
+    days = None
+    try:
+        with open(path, 'rb') as f:
+            days = _decode_year(year, f.read())
+    except (OSError, ValueError, struct.error):
+        pass
+    if days is None:
+        days = build_year(year)
+        try:
+            write_year(year, days)
+        except OSError:
+            pass
+
+    gan, zhi = Gan[(year - 4) % 10], Zhi[(year - 4) % 12]
+    return YearAlmanac(year=year, ganzhi=gan + zhi, stars=year_stars(year), months=month_stars(zhi),
+                       mountains=types.MappingProxyType(year_mountains(zhi)), jizhu=None, days=tuple(days))
+
+
+def get_year(year):
+    """year年的年历：九宫飞星、月飞星、太岁岁破、压祭主和全年逐日记录
+
+    逐日记录保存在ALMANAC_DIR下的年历文件中，PREBUILT_START到PREBUILT_END年的文件随代码提交，
+    其余年份首次用到时计算（约2秒）并尽量写入；同一进程内再经由LRU缓存复用。年柱按立春后的干支取。
+    缓存的部分都是只读的；压祭主含有可修改的列表，且随当前年份变化，每次调用另行生成。
+    """
+    almanac = _year(year)
+    return almanac._replace(jizhu=get_jizhu(Gan[(year - 4) % 10], Zhi[(year - 4) % 12]))
+
+
+def almanac_days(start, end):
+    """逐日计算[start, end)的Day记录，不经过年历缓存"""
+    d = datetime.datetime(start.year, start.month, start.day)
+    end = datetime.datetime(end.year, end.month, end.day)
+    year = None
+    while d < end:
+        if d.year != year:
+            year = d.year
+            xiazhi, dongzhi = solstices(year)
+        yield get_day(d, xiazhi, dongzhi)
+        d += datetime.timedelta(days=1)
+
+
+def almanac(start, end):
+    """逐日生成[start, end)的Day记录，按年取自年历缓存，不打印"""
+    d = datetime.date(start.year, start.month, start.day)
+    end = datetime.date(end.year, end.month, end.day)
+    while d < end:
+        days = get_year(d.year).days
+        first = d.toordinal() - datetime.date(d.year, 1, 1).toordinal()
+        last = min(end, datetime.date(d.year + 1, 1, 1)).toordinal() - datetime.date(d.year, 1, 1).toordinal()
+        for i in range(first, last):
+            yield days[i]
+        d = datetime.date(d.year + 1, 1, 1)
+
+
+def get_hou(d, xiazhi, dongzhi):
+    print_day(get_day(d, xiazhi, dongzhi))
+
+
+def print_day(item):
+    gans, zhis = item.gans, item.zhis
     
+    print("公历:", end='')
+    print("{}年{}月{}日".format(item.date.year, item.date.month, item.date.day), end='')
+    
+    Lleap = "闰" if item.leap else ""
+    print("\t农:", end='')
+    print("{}年{}{}月{}日  ".format(item.lunar_year, Lleap, item.lunar_month, item.lunar_day), end='')
+    print(' ',end='')
+    print(''.join([''.join(pair) for pair in zip(gans, zhis)]), end='')
+    
+    print("\t杀:", end='')   
+    for zhi in item.sha:
+        print(zhi + zhi_time[zhi], end='')
+    
+    day_ganzhi = gans.day + zhis.day
+    
+    if item.year_hou:
+        print(" 年猴:{}年{}日".format(zhis.year, day_ganzhi), end=' ')
+    
+    if item.month_luo:
+        print(" 月罗:{}日".format(zhis.day), end=' ')
+    
+    if item.ji_hou:
+        print(" \t季猴:{}季{}日".format(item.ji_hou, ji_hous[item.ji_hou]), end=' ')    
+            
+    print()   
+    print(" "*90, item.nine_star, end='')
+    for zhi, star in zip(Zhi, item.shi_feixing):
+        print(" {}{}".format(zhi, star), end='') 
+    print()
+    zeri = ""
+    if item.po:
+        zeri += "\t{}，大事不宜".format(item.po)
+    if item.touxiu:
+        zeri += "\t" + item.touxiu
+    print(zeri)
+
+
+if __name__ == '__main__':
+    init(autoreset=True)
+
+    description = '''
+# 年罗猴日
+$ python luohou.py -d "2019 6 16"
 
-# 计算中央位
-year = d.year
-index = year % 10 + year // 10 % 10
-index = index - 9 if index > 9 else index
-index = 9 - index
-#print(index)
-jius = JiuFeiXing(*fangweis[index:], *fangweis[0:index])
-#print(jius)
-
-print(jiuxings_dsp)
-print('-'*120)
-print("{}年九宫飞星".format(year))
-print('-'*120)
-print("\033[1;36;40m{1:{0}<25s}{2:{0}<25s}{3:{0}<25s}\033[0m".format(
-    chr(12288), 
-    "巽 东南：{}".format(jius.东南), 
-    '离   南：{}'.format(jius.南), 
-    '坤 西南：{}'.format(jius.西南),))
-print("\033[1;36;40m{1:{0}<25s}{2:{0}<25s}{3:{0}<25s}\033[0m".format(
-    chr(12288), 
-    "震   东：{}".format(jius.东), 
-    '  中   央：{}'.format(jius.中), 
-    '    兑   西：{}'.format(jius.西),))
-print("\033[1;36;40m{1:{0}<25s}{2:{0}<25s}{3:{0}<25s}\033[0m".format(
-    chr(12288), 
-    "艮 东北：{}".format(jius.东北), 
-    '坎   北：{}'.format(jius.北), 
-    '乾 西北：{}'.format(jius.西北),))
-print('-'*120)
-
-print("月份九宫飞星", end=' ')
-items = month_feixings[Zhi[yTG.dz]]
-for i in range(1,13):
-    print(i, items[i], end=' ')
-print()
-year_yas = get_jizhu(Gan[yTG.tg], Zhi[yTG.dz])
-print("太岁压祭主", year_yas)
-day_yas = get_jizhu(Gan[dTG.tg], Zhi[dTG.dz])
-print("日压祭主", day_yas)
-print('-'*120)
-
-#计算夏至日、冬至日
-lunar = Lunar.fromYmd(d.year, d.month, d.day)
-jieqis = lunar.getJieQiTable()
-#start = datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S")
-#print("去年冬至", jieqis['冬至'].toFullString())
-#print("雨水", jieqis['雨水'].toFullString())
-#print("谷雨", jieqis['谷雨'].toFullString())
-#print("夏至", jieqis['夏至'].toFullString())
-#print("处暑", jieqis['处暑'].toFullString())
-#print("霜降", jieqis['霜降'].toFullString())
-#print("今年冬至", jieqis['DONG_ZHI'].toFullString())
-xiazhi = datetime.datetime.strptime(' '.join(jieqis['夏至'].toFullString().split(' ')[:2]), "%Y-%m-%d %H:%M:%S")
-dongzhi = datetime.datetime.strptime(' '.join(jieqis['DONG_ZHI'].toFullString().split(' ')[:2]), "%Y-%m-%d %H:%M:%S")
-
-
-
-get_hou(d, xiazhi, dongzhi)      
-
-for i in range(1,options.n):
-    d_ = d + datetime.timedelta(days=i)
-    get_hou(d_,  xiazhi, dongzhi)  
\ No newline at end of file
+# 生成1950-2100年的年历文件
+$ python luohou.py --build 1950 2100
+
+'''
+
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-d', action="store", help=u'year',default="")
+    parser.add_argument('-n', action="store", help=u'days',default=32, type=int)
+    parser.add_argument('--build', nargs=2, type=int, metavar=('START', 'END'), help=u'生成START到END年的年历文件')
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s 0.1 Rongzhong xu 2019 05 05')
+    options = parser.parse_args()
+
+    if options.build:
+        for year in build_years(*options.build):
+            print("{}/{}.bin".format(ALMANAC_DIR, year))
+        sys.exit()
+
+    if options.d:
+        year, month, day = options.d.split()
+        d = datetime.datetime(int(year), int(month), int(day))
+    else:
+        d = datetime.datetime.today()
+
+    # 年飞星、月飞星和压祭主取自年历缓存；年初立春前按上一年干支
+    year = d.year
+    year_almanac = get_year(year)
+    first = year_almanac.days[d.timetuple().tm_yday - 1]
+    gans, zhis = first.gans, first.zhis
+    if gans.year + zhis.year == year_almanac.ganzhi:
+        months, year_yas = year_almanac.months, year_almanac.jizhu
+    else:
+        months, year_yas = month_stars(zhis.year), get_jizhu(gans.year, zhis.year)
+    jius = year_almanac.stars
+
+    print(jiuxings_dsp)
+    print('-'*120)
+    print("{}年九宫飞星".format(year))
+    print('-'*120)
+    print("\033[1;36;40m{1:{0}<25s}{2:{0}<25s}{3:{0}<25s}\033[0m".format(
+        chr(12288), 
+        "巽 东南：{}".format(jius.东南), 
+        '离   南：{}'.format(jius.南), 
+        '坤 西南：{}'.format(jius.西南),))
+    print("\033[1;36;40m{1:{0}<25s}{2:{0}<25s}{3:{0}<25s}\033[0m".format(
+        chr(12288), 
+        "震   东：{}".format(jius.东), 
+        '  中   央：{}'.format(jius.中), 
+        '    兑   西：{}'.format(jius.西),))
+    print("\033[1;36;40m{1:{0}<25s}{2:{0}<25s}{3:{0}<25s}\033[0m".format(
+        chr(12288), 
+        "艮 东北：{}".format(jius.东北), 
+        '坎   北：{}'.format(jius.北), 
+        '乾 西北：{}'.format(jius.西北),))
+    print('-'*120)
+
+    print("月份九宫飞星", end=' ')
+    for i, item in enumerate(months, 1):
+        print(i, item, end=' ')
+    print()
+    print("太岁压祭主", year_yas)
+    day_yas = get_jizhu(gans.day, zhis.day)
+    print("日压祭主", day_yas)
+    print('-'*120)
+
+    # 逐日罗猴
+    for item in almanac(d, d + datetime.timedelta(days=max(options.n, 1))):
+        print_day(item)  
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+九宫飞星批量计算
+按时间数组一次算出年、月、日、时的中宫飞星，星的编码0为一白，8为九紫。
+
+- 年星：按立春换年，(10 - 年 % 9) % 9
+- 月星：年支与节令月查luohou的月飞星表
+- 日星：冬至、夏至前后最近的甲子日分别起一白顺排、九紫逆排，与lunar_python的getDayNineStar一致
+  （lunar_python只取当年节气表，年初在去年冬至起点之前的日子按其倒推规则计算）
+- 时星：日支与时支查luohou的时飞星表，夏至到冬至之间用逆排表
+
+节气、干支都取自逐日历表索引，不调用历法库。
+
+$ python nine_star.py 2024-06-21T10:30 2025-01-01T23:10
+"""
+
+import argparse
+import collections
+import datetime
+
+import numpy as np
+
+from ganzhi import Zhi
+from calendar_index import HEADER, JD_OFFSET, MINUTES_PER_DAY, RECORD, load as load_calendar
+from luohou import month_feixings, shi_feixings1, shi_feixings2, nine_stars
+
+# 与calendar_index.RECORD相同的布局
+RECORD_DTYPE = np.dtype([
+    ('year', 'u1'), ('month', 'u1'), ('day', 'u1'), ('jie', 'u1'), ('prev_jie', '<u4'), ('next_jie', '<u4'),
+    ('lunar_year', '<u2'), ('lunar_month', 'u1'), ('lunar_day', 'u1'), ('leap', 'u1')])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+NUMBERS = "一二三四五六七八九"
+
+# datetime64的起点1970-01-01的公历序数
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+Stars = collections.namedtuple("Stars", "year month day hour")
+
+
+def _code(name):
+    """'八白土'之类的星名转换为编码"""
+    return NUMBERS.index(name[0])
+
+
+# 月星表：[年支][节令月，0为寅月]
+MONTH_TABLE = np.array([[_code(month_feixings[zhi][n + 1]) for n in range(12)] for zhi in Zhi], dtype=np.int8)
+
+# 时星表：[逆排][日支][时支]
+HOUR_TABLE = np.array([[[shi_feixings[day][hour] - 1 for hour in Zhi] for day in Zhi]
+                       for shi_feixings in (shi_feixings1, shi_feixings2)], dtype=np.int8)
+
+
+class NineStars:
+    """以逐日历表为数据源的飞星计算器"""
+
+    def __init__(self, calendar=None):
+        calendar = calendar or load_calendar()
+        self.calendar = calendar
+        self.origin = calendar.origin
+        self.records = np.frombuffer(calendar.buf, dtype=RECORD_DTYPE, count=calendar.count,
+                                     offset=HEADER.size)
+        terms = np.frombuffer(calendar.buf, dtype='<i4', count=calendar.jieqi_count,
+                              offset=calendar.jieqi_offset).astype(np.int64)
+        names = (calendar.jieqi_first + np.arange(len(terms))) % 24
+        # 冬至、夏至时刻（距起始日0点的分钟数），按时间排序
+        solstice = (names == 0) | (names == 12)
+        self.solstices = terms[solstice]
+        self.solstice_yin = names[solstice] == 12
+        # 日星起点：冬至、夏至所在日前后最近的甲子日（日序号），按公历年排列
+        days = self.solstices // MINUTES_PER_DAY
+        index = (self.origin + days + JD_OFFSET - 11) % 60
+        anchors = np.where(index > 29, days + 60 - index, days - index)
+        years = self._years(days)
+        self.first_year = years[0]
+        self.dongzhi = np.zeros(years[-1] - self.first_year + 1, dtype=np.int64)
+        self.xiazhi = np.zeros_like(self.dongzhi)
+        self.dongzhi[years[~self.solstice_yin] - self.first_year] = anchors[~self.solstice_yin]
+        self.xiazhi[years[self.solstice_yin] - self.first_year] = anchors[self.solstice_yin]
+
+    def _years(self, days):
+        """日序号所在的公历年"""
+        return (self.origin - EPOCH + days).astype('datetime64[D]').astype('datetime64[Y]').astype(np.int64) + 1970
+
+    def _split(self, timestamps):
+        """时间数组拆为 (日序号, 当日分钟数)，超出历表范围抛出ValueError"""
+        minutes = np.asarray(timestamps, dtype='datetime64[m]').astype(np.int64)
+        minutes = minutes - (self.origin - EPOCH) * MINUTES_PER_DAY
+        days = minutes // MINUTES_PER_DAY
+        if days.size and (days.min() < 0 or days.max() >= len(self.records)):
+            raise ValueError("日期超出历表范围：{}-{}".format(self.calendar.start, self.calendar.end))
+        return days, minutes - days * MINUTES_PER_DAY
+
+    def year(self, timestamps):
+        """年星，立春换年"""
+        days, minutes = self._split(timestamps)
+        return self._year(days, minutes)
+
+    def _year(self, days, minutes):
+        rec = self.records[days]
+        year_code = rec['year'].astype(np.int64) + ((minutes >= rec['next_jie']) & (rec['jie'] == 11))
+        # 六十甲子年编码还原为公历年数，再求余9
+        gregorian = self._years(days)
+        year = gregorian - (gregorian - 4 - year_code) % 60
+        return ((10 - year % 9) % 9).astype(np.int8)
+
+    def month(self, timestamps):
+        """月星，交节换月"""
+        days, minutes = self._split(timestamps)
+        return self._month(days, minutes)
+
+    def _month(self, days, minutes):
+        rec = self.records[days]
+        passed = minutes >= rec['next_jie']
+        year_code = rec['year'].astype(np.int64) + (passed & (rec['jie'] == 11))
+        jie = (rec['jie'].astype(np.int64) + passed) % 12
+        return MONTH_TABLE[year_code % 12, jie]
+
+    def day(self, timestamps):
+        """日星，子正换日"""
+        days, minutes = self._split(timestamps)
+        return self._day(days)
+
+    def _day(self, days):
+        # 与lunar_python一致，只看当年节气表：去年冬至、今年夏至、今年冬至三个起点
+        years = self._years(days) - self.first_year
+        start, ni, end = self.dongzhi[years - 1], self.xiazhi[years], self.dongzhi[years]
+        star = np.select([days < start, days < ni, days < end],
+                         [(8 + start - days) % 9, (days - start) % 9, 8 - (days - ni) % 9],
+                         (days - end) % 9)
+        return star.astype(np.int8)
+
+    def hour(self, timestamps):
+        """时星，夏至到冬至之间逆排"""
+        days, minutes = self._split(timestamps)
+        return self._hour(days, minutes)
+
+    def _hour(self, days, minutes):
+        k = np.searchsorted(self.solstices, days * MINUTES_PER_DAY, side='right') - 1
+        yin = self.solstice_yin[k].astype(np.int64)
+        day_zhi = self.records[days]['day'].astype(np.int64) % 12
+        hour_zhi = (minutes // 60 + 1) // 2 % 12
+        return HOUR_TABLE[yin, day_zhi, hour_zhi]
+
+    def stars(self, timestamps):
+        """年、月、日、时四种飞星"""
+        days, minutes = self._split(timestamps)
+        return Stars(self._year(days, minutes), self._month(days, minutes), self._day(days),
+                     self._hour(days, minutes))
+
+
+_stars = None
+
+
+def load():
+    global _stars
+    if _stars is None:
+        _stars = NineStars()
+    return _stars
+
+
+def stars(timestamps):
+    """时间数组的年、月、日、时飞星编码"""
+    return load().stars(timestamps)
+
+
+def name(code):
+    """飞星编码转换为星名，如 0 -> 一白水天枢"""
+    return nine_stars[code]
+
+
+if __name__ == '__main__':
+    description = '''
+# 计算若干时刻的年、月、日、时飞星
+$ python nine_star.py 2024-06-21T10:30 2025-01-01T23:10
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('times', nargs='+', help='时间，如 2024-06-21T10:30')
+    options = parser.parse_args()
+
+    result = stars(options.times)
+    for i, item in enumerate(options.times):
+        print(item, *(name(getattr(result, field)[i]) for field in Stars._fields))
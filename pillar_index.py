@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+四柱反查索引
+由逐日历表生成倒排表：键为 (年柱, 月序, 日柱)，值为按日期排序的日序号列表，
+交节当天在交节前后的两个键下各登记一次。时柱由日干和时支直接推算，不进索引。
+
+反查时取出键对应的日序号列表，二分定位到起止年份，再逐日核对时辰，
+整个过程只读索引和历表，不再遍历日历。
+
+生成索引文件：
+$ python pillar_index.py -o pillar.idx
+"""
+
+import argparse
+import bisect
+import collections
+import datetime
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from ganzhi import Gan, Zhi
+from calendar_index import MINUTES_PER_DAY, RECORD, HEADER as CALENDAR_HEADER, gz_code, \
+    load as load_calendar
+
+# 小端序，索引文件随代码提交，在大端机器上读取时转换字节序
+HEADER = struct.Struct('<4sHiii')
+MAGIC = b'BZPI'
+VERSION = 1
+
+# 年柱60 × 月序12 × 日柱60
+KEYS = 60 * 12 * 60
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pillar.idx')
+
+# 反查结果每页默认条数
+PAGE_SIZE = 50
+
+# 出生时间区间 [start, end)
+Match = collections.namedtuple("Match", "start end")
+
+
+def parse_gz(name):
+    """干支字符串转换为六十甲子编码，如 甲子 -> 0，不合法时抛出ValueError"""
+    if len(name) != 2 or name[0] not in Gan or name[1] not in Zhi:
+        raise ValueError("干支不合法：{}".format(name))
+    gan, zhi = Gan.index(name[0]), Zhi.index(name[1])
+    if gan % 2 != zhi % 2:
+        raise ValueError("干支阴阳不一致：{}".format(name))
+    return gz_code(gan, zhi)
+
+
+def _array_bytes(items):
+    """数组按小端序转换为字节串"""
+    if sys.byteorder == 'big':
+        items = array(items.typecode, items)
+        items.byteswap()
+    return items.tobytes()
+
+
+def _array_view(buf, typecode):
+    """文件中的小端序数组；小端机器上直接映射，大端机器上复制一份并转换字节序"""
+    if sys.byteorder == 'little':
+        return buf.cast(typecode)
+    items = array(typecode, bytes(buf))
+    items.byteswap()
+    return items
+
+
+def key(year_code, month_code, day_code):
+    """索引键，月柱按月支换算为月序（寅月为0）"""
+    return (year_code * 12 + (month_code % 12 - 2) % 12) * 60 + day_code
+
+
+def build(calendar=None):
+    """由历表生成索引文件内容"""
+    calendar = calendar or load_calendar()
+    buckets = [[] for _ in range(KEYS)]
+    records = calendar.buf[CALENDAR_HEADER.size:CALENDAR_HEADER.size + RECORD.size * calendar.count]
+    for i, rec in enumerate(RECORD.iter_unpack(records)):
+        year_code, month_code, day_code, jie = rec[:4]
+        buckets[key(year_code, month_code, day_code)].append(i)
+        if rec[5] < MINUTES_PER_DAY:
+            # 当天交节，交节后的月柱（立春还换年柱）也登记当天
+            if jie == 11:
+                year_code = (year_code + 1) % 60
+            buckets[key(year_code, (month_code + 1) % 60, day_code)].append(i)
+
+    offsets = array('I', [0])
+    entries = array('I')
+    for bucket in buckets:
+        entries.extend(bucket)
+        offsets.append(len(entries))
+
+    head = HEADER.pack(MAGIC, VERSION, calendar.origin, calendar.count, len(entries))
+    return head + _array_bytes(offsets) + _array_bytes(entries)
+
+
+def write(path=DEFAULT_PATH, calendar=None):
+    data = build(calendar)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+class PillarIndex:
+    """只读的四柱反查索引"""
+
+    def __init__(self, buf, calendar=None):
+        self.calendar = calendar or load_calendar()
+        self.buf = memoryview(buf)
+        magic, version, origin, count, size = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("反查索引格式不匹配，请重新生成")
+        if origin != self.calendar.origin or count != self.calendar.count:
+            raise ValueError("反查索引与历表范围不一致，请重新生成")
+        start = HEADER.size
+        self.offsets = _array_view(self.buf[start:start + 4 * (KEYS + 1)], 'I')
+        start += 4 * (KEYS + 1)
+        self.entries = _array_view(self.buf[start:start + 4 * size], 'I')
+
+    @classmethod
+    def open(cls, path=DEFAULT_PATH, calendar=None):
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, calendar)
+
+    def days(self, year_code, month_code, day_code):
+        """前三柱对应的全部日序号，已按日期排序"""
+        k = key(year_code, month_code, day_code)
+        return self.entries[self.offsets[k]:self.offsets[k + 1]]
+
+    def _windows(self, i, time_code):
+        """第i天内时支与time_code相同的分钟区间，交节时刻处切开"""
+        zhi = time_code % 12
+        if zhi == 0:
+            windows = [(0, 60), (23 * 60, MINUTES_PER_DAY)]
+        else:
+            windows = [(zhi * 120 - 60, zhi * 120 + 60)]
+        jie = self.calendar.record(i).next_jie
+        for start, end in windows:
+            if start < jie < end:
+                yield start, jie
+                yield jie, end
+            else:
+                yield start, end
+
+    def search(self, year_code, month_code, day_code, time_code, start_year=None, end_year=None):
+        """按四柱编码反查出生时间
+
+        Returns:
+            list: Match(起始datetime, 结束datetime)，按时间排序，结束时刻不含
+        """
+        # 月干由年干决定，不匹配时不可能有结果
+        if month_code % 10 != (year_code % 5 * 2 + 2 + (month_code % 12 - 2) % 12) % 10:
+            return []
+        calendar = self.calendar
+        days = self.days(year_code, month_code, day_code)
+        lo = 0
+        hi = len(days)
+        if start_year is not None:
+            first = datetime.date(max(start_year, calendar.start.year), 1, 1).toordinal() - calendar.origin
+            lo = bisect.bisect_left(days, first)
+        if end_year is not None:
+            last = datetime.date(min(end_year, calendar.end.year), 12, 31).toordinal() - calendar.origin
+            hi = bisect.bisect_right(days, last)
+
+        target = (year_code, month_code, day_code, time_code)
+        result = []
+        for i in days[lo:hi]:
+            base = datetime.datetime.combine(calendar.date(i), datetime.time())
+            for start, end in self._windows(i, time_code):
+                if calendar.pillars_at(i, start) == target:
+                    result.append(Match(base + datetime.timedelta(minutes=start),
+                                        base + datetime.timedelta(minutes=end)))
+        return result
+
+    def lookup(self, year, month, day, time, start_year=None, end_year=None, page=1, size=PAGE_SIZE):
+        """按干支字符串反查并分页
+
+        Returns:
+            (total, matches): 总条数和第page页（从1开始）的结果，size为None时返回全部
+        """
+        if size is not None and (page < 1 or size < 1):
+            raise ValueError("page、size须为正整数")
+        matches = self.search(parse_gz(year), parse_gz(month), parse_gz(day), parse_gz(time),
+                              start_year, end_year)
+        if size is None:
+            return len(matches), matches
+        begin = (page - 1) * size
+        return len(matches), matches[begin:begin + size]
+
+
+_index = None
+
+
+def load(path=DEFAULT_PATH):
+    """打开反查索引，文件不存在或与历表不一致时重新生成；目录不可写时在内存中生成"""
+    global _index
+    if path != DEFAULT_PATH:
+        return PillarIndex.open(path)
+    if _index is None:
+        try:
+            _index = PillarIndex.open(path)
+        except (OSError, ValueError):
+            try:
+                write(path)
+                _index = PillarIndex.open(path)
+            except OSError:
+                _index = PillarIndex(build())
+    return _index
+
+
+if __name__ == '__main__':
+    description = '''
+# 生成四柱反查索引
+$ python pillar_index.py -o pillar.idx
+
+# 反查
+$ python pillar_index.py -q 庚午 辛巳 庚辰 癸未
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-o', action="store", help='输出文件', default=DEFAULT_PATH)
+    parser.add_argument('-q', nargs=4, help='四柱')
+    parser.add_argument("--start", help="start year", type=int)
+    parser.add_argument("--end", help="end year", type=int)
+    parser.add_argument("--page", help="page", type=int, default=1)
+    parser.add_argument("--size", help="page size", type=int, default=PAGE_SIZE)
+    options = parser.parse_args()
+
+    if options.q:
+        if options.page < 1 or options.size < 1:
+            parser.error(u'--page、--size须为正整数')
+        total, matches = load().lookup(*options.q, start_year=options.start, end_year=options.end,
+                                       page=options.page, size=options.size)
+        for match in matches:
+            print(match.start.strftime("%Y-%m-%d %H:%M"), '-', match.end.strftime("%Y-%m-%d %H:%M"))
+        print("共{}条".format(total))
+    else:
+        size = write(options.o)
+        print("{} {}字节".format(options.o, size))
@@ -2,50 +2,117 @@
 # -*- coding: utf-8 -*-
 # Author: 钉钉或微信pythontesting 钉钉群21734177 
 # CreateDate: 2019-2-21
+"""
+生肖配对
+十二地支两两之间的合、六合、会、冲、刑、被刑、害、破预先算成12×12的关系位掩码矩阵，
+合类关系记+1，冲刑害破记-1，相加得到净分。单对查询直接取矩阵元素，
+多人的配对表用一次numpy花式索引取出。
+"""
 
 import argparse
+
+import numpy as np
+
 from datas import shengxiaos, zhi_atts
+from ganzhi import Zhi
+
+# 关系及其分值，下标即位掩码中的位
+RELATIONS = ('合', '六', '会', '冲', '刑', '被刑', '害', '破')
+RELATION_SCORES = (1, 1, 1, -1, -1, -1, -1, -1)
+
+# MASKS[a][b]：a对b的关系位掩码；SCORES[a][b]：净分
+MASKS = np.zeros((12, 12), dtype=np.uint8)
+for _a, _zhi in enumerate(Zhi):
+    for _bit, _relation in enumerate(RELATIONS):
+        for _item in zhi_atts[_zhi][_relation]:
+            MASKS[_a, Zhi.index(_item)] |= 1 << _bit
+SCORES = sum(((MASKS >> bit) & 1).astype(np.int8) * score for bit, score in enumerate(RELATION_SCORES))
+MASKS.flags.writeable = False
+SCORES.flags.writeable = False
+
+
+def zhi_index(item):
+    """生肖（如'鼠'）、地支（如'子'）或地支序号转换为地支序号，不合法时抛出ValueError"""
+    if isinstance(item, (int, np.integer)) and 0 <= item < 12:
+        return int(item)
+    if isinstance(item, str):
+        if item in shengxiaos.inverse:
+            return Zhi.index(shengxiaos.inverse[item])
+        if item in Zhi:
+            return Zhi.index(item)
+    raise ValueError("请输入正确的生肖或地支：{}".format(item))
+
+
+def relation_names(mask):
+    """位掩码转换为关系名称列表"""
+    return [name for bit, name in enumerate(RELATIONS) if mask >> bit & 1]
+
+
+def match(a, b):
+    """a对b的关系
 
-def output(des, key):
+    Returns:
+        (relations, score): 关系名称列表和净分
+    """
+    i, j = zhi_index(a), zhi_index(b)
+    return relation_names(MASKS[i, j]), int(SCORES[i, j])
+
+
+def table(people):
+    """多人两两配对
+
+    Args:
+        people: 生肖、地支或地支序号的序列
+
+    Returns:
+        (masks, scores): n×n的关系位掩码矩阵和净分矩阵，第i行第j列为第i人对第j人
+    """
+    index = np.fromiter((zhi_index(item) for item in people), dtype=np.intp)
+    return MASKS[index[:, None], index[None, :]], SCORES[index[:, None], index[None, :]]
+
+
+def output(zhi, des, key):
     print()
     print(des, end='')
     for item in zhi_atts[zhi][key]:
         print(shengxiaos[item], end='')       
 
-description = '''
+
+if __name__ == '__main__':
+    description = '''
 '''
-parser = argparse.ArgumentParser(description=description,
-                                 formatter_class=argparse.RawTextHelpFormatter)
-parser.add_argument('shengxiao', action="store", help=u'生肖')
-parser.add_argument('--version', action='version',
-                    version='%(prog)s 0.1 Rongzhong xu 2019 03 06 钉钉或微信pythontesting')
-options = parser.parse_args()
-
-if options.shengxiao not in shengxiaos.inverse:
-    print("请输入正确的生肖：")
-    print(shengxiaos.inverse.keys())
-else:
-    print("你的生肖是：", options.shengxiao)
-    zhi = shengxiaos.inverse[options.shengxiao]
-    print("你的年支是：", zhi)
-    print("="*80) 
-    print("合生肖是合八字的一小部分，有一定参考意义，但是不是全部。") 
-    print("合婚请以八字为准，技术支持：钉钉或微信pythontesting") 
-    print("以下为相合的生肖：") 
-    print("="*80) 
-    output("与你三合的生肖：", '合')  
-    output("与你六合的生肖：", '六')      
-    output("与你三会的生肖：", '会')
-    print()
-    print("="*80) 
-    print("以下为不合的生肖：") 
-    print("="*80)     
-    output("与你相冲的生肖：", '冲')  
-    output("你刑的生肖：", '刑')
-    output("被你刑的生肖：", '被刑') 
-    output("与你相害的生肖：", '害')     
-    output("与你相破的生肖：", '破') 
-    print()
-    print("="*80) 
-    print("如果生肖同时在你的合与不合中，则做加减即可。") 
-    print("比如猪对于虎，有一个相破，有一六合，抵消就为平性。") 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('shengxiao', action="store", help=u'生肖')
+    parser.add_argument('--version', action='version',
+                        version='%(prog)s 0.1 Rongzhong xu 2019 03 06 钉钉或微信pythontesting')
+    options = parser.parse_args()
+
+    if options.shengxiao not in shengxiaos.inverse:
+        print("请输入正确的生肖：")
+        print(' '.join(shengxiaos.inverse))
+    else:
+        print("你的生肖是：", options.shengxiao)
+        zhi = shengxiaos.inverse[options.shengxiao]
+        print("你的年支是：", zhi)
+        print("="*80) 
+        print("合生肖是合八字的一小部分，有一定参考意义，但是不是全部。") 
+        print("合婚请以八字为准，技术支持：钉钉或微信pythontesting") 
+        print("以下为相合的生肖：") 
+        print("="*80) 
+        output(zhi, "与你三合的生肖：", '合')  
+        output(zhi, "与你六合的生肖：", '六')      
+        output(zhi, "与你三会的生肖：", '会')
+        print()
+        print("="*80) 
+        print("以下为不合的生肖：") 
+        print("="*80)     
+        output(zhi, "与你相冲的生肖：", '冲')  
+        output(zhi, "你刑的生肖：", '刑')
+        output(zhi, "被你刑的生肖：", '被刑') 
+        output(zhi, "与你相害的生肖：", '害')     
+        output(zhi, "与你相破的生肖：", '破') 
+        print()
+        print("="*80) 
+        print("如果生肖同时在你的合与不合中，则做加减即可。") 
+        print("比如猪对于虎，有一个相破，有一六合，抵消就为平性。")
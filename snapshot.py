@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基础表快照
+ganzhi.py、datas.py、yongshen.py导入时要执行上千行字典字面量、生成紧凑表、解析调候和格局文字；
+没有可用的.pyc时（如新启动的Vercel实例）还要先编译这些源文件。
+这里把三个模块导入后的全部表写入一个带版本和校验和的二进制快照，运行时映射快照、
+直接还原出这些表，不再执行其中的字典字面量。
+
+文件格式：文件头、模块骨架、表数据
+- 文件头（小端序）记录格式版本、源文件的CRC和后两部分的CRC
+- 模块骨架：各模块导入的模块、namedtuple的字段、各函数定义在源文件中的行号
+- 表数据：pickle，函数和类按名称引用，先按骨架建好模块再还原
+
+快照中只有数据，不含字节码：函数由源文件中对应的几行现场编译，运行的始终是源代码。
+每次还原都核对四个源文件的CRC（约0.03ms），源文件修改后快照即失效，改为导入源文件；
+重新生成快照后随代码提交。快照运行时只读取、不写入。
+sizi.py、yue.py的条文由text_store的文本库按需读取，不在快照中。
+
+$ python snapshot.py -o tables.bin
+$ python snapshot.py --check
+"""
+
+import builtins
+import collections
+import importlib
+import importlib.machinery
+import mmap
+import os
+import struct
+import sys
+import types
+import zlib
+
+# 还原时只需要C实现的loads，不必导入pickle模块本身（约1.5ms）
+from _pickle import loads
+
+HEADER = struct.Struct('<4sHIII')
+MAGIC = b'BZTB'
+VERSION = 2
+
+# 固定的pickle协议，各Python 3.8以上版本都能读取
+PROTOCOL = 5
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(BASE_DIR, 'tables.bin')
+
+# 快照中的模块，按导入顺序
+MODULES = ['ganzhi', 'datas', 'yongshen']
+
+# 参与校验的源文件：快照中的模块及其引用的类型所在的文件
+SOURCES = ['compact.py', 'ganzhi.py', 'datas.py', 'yongshen.py']
+
+
+def read_sources(base_dir=BASE_DIR):
+    """各源文件的内容 {文件名: bytes}"""
+    sources = {}
+    for name in SOURCES:
+        with open(os.path.join(base_dir, name), 'rb') as f:
+            sources[name] = f.read()
+    return sources
+
+
+def source_crc(sources=None):
+    crc = 0
+    for data in (sources or read_sources()).values():
+        crc = zlib.crc32(data, crc)
+    return crc
+
+
+def _is_namedtuple(value):
+    return isinstance(value, type) and issubclass(value, tuple) and hasattr(value, '_fields')
+
+
+def _function_lines(module):
+    """模块顶层函数定义所在的行 {函数名: (起始行, 结束行)}，起始行含装饰器"""
+    import ast
+
+    with open(module.__file__, 'rb') as f:
+        tree = ast.parse(f.read())
+    lines = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            start = min([node.lineno] + [item.lineno for item in node.decorator_list])
+            lines[node.name] = (start, node.end_lineno)
+    return lines
+
+
+def _skeleton(module):
+    """模块骨架 (imports, classes, functions) 和其余的表数据"""
+    imports = {}
+    classes = {}
+    functions = {}
+    data = {}
+    lines = _function_lines(module)
+    for key, value in vars(module).items():
+        if key in ('__name__', '__file__', '__cached__', '__loader__', '__spec__', '__package__', '__builtins__'):
+            continue
+        if isinstance(value, types.ModuleType):
+            imports[key] = value.__name__
+        elif getattr(value, '__module__', None) != module.__name__ or key.startswith('__'):
+            # 数据，以及从其他模块导入的函数、类（pickle按名称引用）
+            data[key] = value
+        elif isinstance(value, types.FunctionType) and value.__name__ == key and key in lines \
+                and lines[key][0] == value.__code__.co_firstlineno:
+            functions[key] = lines[key]
+        elif _is_namedtuple(value):
+            classes[key] = (value.__name__, value._fields)
+        elif isinstance(value, (type, types.FunctionType, types.BuiltinFunctionType)) or callable(value):
+            raise ValueError("{}.{} 无法写入快照".format(module.__name__, key))
+        else:
+            data[key] = value
+    return (imports, classes, functions), data
+
+
+def build():
+    """从源文件导入各模块，生成快照文件的字节串"""
+    import pickle
+
+    sources = read_sources()
+    skeletons = []
+    tables = []
+    for name in MODULES:
+        skeleton, data = _skeleton(importlib.import_module(name))
+        skeletons.append((name, skeleton))
+        tables.append(data)
+    head = pickle.dumps(skeletons, protocol=PROTOCOL)
+    body = pickle.dumps(tables, protocol=PROTOCOL)
+    header = HEADER.pack(MAGIC, VERSION, source_crc(sources),
+                         zlib.crc32(body, zlib.crc32(head)), len(head))
+    return header + head + body
+
+
+def write(path=DEFAULT_PATH):
+    data = build()
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def read(path=DEFAULT_PATH):
+    """读取并校验快照，返回 (模块骨架, 表数据, 源文件CRC)；无效时抛出ValueError"""
+    with open(path, 'rb') as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with buf:
+        if len(buf) < HEADER.size:
+            raise ValueError("快照文件不完整")
+        magic, version, crc, payload_crc, head_size = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("快照格式不匹配，请重新生成")
+        payload = buf[HEADER.size:]
+        if zlib.crc32(payload) != payload_crc:
+            raise ValueError("快照校验和不符，请重新生成")
+        return payload[:head_size], payload[head_size:], crc
+
+
+def check(path=DEFAULT_PATH):
+    """快照不可用或与源文件不一致时抛出ValueError、OSError，返回快照的字节数"""
+    head, body, crc = read(path)
+    if crc != source_crc():
+        raise ValueError("快照与源文件不一致，请重新生成")
+    return HEADER.size + len(head) + len(body)
+
+
+def restore(head, body, sources):
+    """按快照建立各模块并放入sys.modules，函数由sources中的源代码编译；失败时撤下已放入的模块"""
+    modules = []
+    try:
+        for name, (imports, classes, functions) in loads(head):
+            path = os.path.join(BASE_DIR, name + '.py')
+            module = types.ModuleType(name)
+            module.__file__ = path
+            module.__spec__ = importlib.machinery.ModuleSpec(name, None, origin=path)
+            module.__spec__.has_location = True
+            namespace = vars(module)
+            namespace['__builtins__'] = builtins
+            for key, target in imports.items():
+                namespace[key] = importlib.import_module(target)
+            for key, (typename, fields) in classes.items():
+                namespace[key] = collections.namedtuple(typename, fields, module=name)
+            lines = sources[name + '.py'].decode('utf-8').split('\n')
+            for key, (start, end) in functions.items():
+                # 前面补空行，行号与源文件一致
+                text = '\n' * (start - 1) + '\n'.join(lines[start - 1:end]) + '\n'
+                exec(compile(text, path, 'exec'), namespace)
+            modules.append(module)
+            sys.modules[name] = module
+        # 表数据中的函数、类按名称引用，须在各模块放入sys.modules之后还原
+        for module, data in zip(modules, loads(body)):
+            vars(module).update(data)
+    except Exception:
+        for module in modules:
+            sys.modules.pop(module.__name__, None)
+        raise
+    return modules
+
+
+def install(path=DEFAULT_PATH):
+    """由快照还原ganzhi、datas、yongshen，须在导入这些模块之前调用
+
+    只读取快照，不写文件；快照不存在、无效或与源文件不一致时从源文件导入。
+
+    Returns:
+        bool: 是否由快照还原
+    """
+    if any(name in sys.modules for name in MODULES):
+        return False
+    try:
+        head, body, crc = read(path)
+        sources = read_sources()
+        if crc != source_crc(sources):
+            raise ValueError("快照与源文件不一致")
+        restore(head, body, sources)
+        return True
+    except Exception:
+        # 快照只是加速手段，任何问题（文件缺失、源文件已修改、反序列化失败）都改为导入源文件
+        for name in MODULES:
+            importlib.import_module(name)
+        return False
+
+
+if __name__ == '__main__':
+    import argparse
+
+    description = '''
+# 生成快照文件
+$ python snapshot.py -o tables.bin
+
+# 检查快照是否可用
+$ python snapshot.py --check
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('-o', action="store", help='输出快照文件')
+    parser.add_argument('--check', action='store_true', default=False, help='检查快照是否可用')
+    options = parser.parse_args()
+
+    if options.o:
+        try:
+            print("{} 字节".format(write(options.o)))
+        except ValueError as e:
+            print("无法生成快照：{}".format(e))
+            sys.exit(1)
+    elif options.check:
+        try:
+            size = check()
+        except (OSError, ValueError) as e:
+            print("快照不可用：{}".format(e))
+            sys.exit(1)
+        print("快照可用：{} 字节".format(size))
+    else:
+        parser.error(u'请使用-o或--check')
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+真太阳时校正
+钟表时间按出生地经度和时区换算为平太阳时，再加上当天的均时差得到真太阳时，
+时辰按真太阳时划分。均时差按年内日序预先算成整张表，校正时只做查表和加法，
+批量数据用numpy一次算完。
+"""
+
+import datetime
+import math
+from array import array
+
+import numpy as np
+
+# 北京时间
+DEFAULT_TIMEZONE = 8
+
+
+def _equation_of_time(n):
+    """第n天（1月1日为1）的均时差，单位秒"""
+    b = 2 * math.pi * (n - 81) / 364
+    return 60 * (9.87 * math.sin(2 * b) - 7.53 * math.cos(b) - 1.5 * math.sin(b))
+
+
+# 均时差表：下标为年内日序-1，共366天，单位秒
+EOT = array('h', (int(round(_equation_of_time(n))) for n in range(1, 367)))
+_EOT = np.frombuffer(EOT, dtype=np.int16).astype(np.int64)
+
+
+def check_location(longitude, timezone=DEFAULT_TIMEZONE):
+    """校验经度和时区，返回 (经度, 时区) 浮点数，不合法时抛出ValueError"""
+    longitude = float(longitude)
+    timezone = float(timezone)
+    if not -180 <= longitude <= 180:
+        raise ValueError("经度超出范围[-180, 180]: {}".format(longitude))
+    if not -12 <= timezone <= 14:
+        raise ValueError("时区超出范围[-12, 14]: {}".format(timezone))
+    return longitude, timezone
+
+
+def offset_seconds(day_of_year, longitude, timezone=DEFAULT_TIMEZONE):
+    """真太阳时与钟表时间之差，单位秒；经度每度4分钟"""
+    return int(round((longitude - timezone * 15) * 240)) + EOT[day_of_year - 1]
+
+
+def correct(dt, longitude, timezone=DEFAULT_TIMEZONE):
+    """把钟表时间dt校正为真太阳时"""
+    day_of_year = dt.timetuple().tm_yday
+    return dt + datetime.timedelta(seconds=offset_seconds(day_of_year, longitude, timezone))
+
+
+def correct_many(datetimes, longitudes, timezones=DEFAULT_TIMEZONE):
+    """批量校正
+
+    Args:
+        datetimes: 钟表时间序列
+        longitudes: 经度，序列或单个数值
+        timezones: 时区（小时），序列或单个数值
+
+    Returns:
+        list: 真太阳时datetime列表
+    """
+    times = np.array(datetimes, dtype='datetime64[s]')
+    if times.size == 0:
+        return []
+    longitudes = np.asarray(longitudes, dtype=np.float64)
+    timezones = np.asarray(timezones, dtype=np.float64)
+    days = (times.astype('datetime64[D]') - times.astype('datetime64[Y]')).astype(np.int64)
+    offsets = np.rint((longitudes - timezones * 15) * 240).astype(np.int64) + _EOT[days]
+    return (times + offsets.astype('timedelta64[s]')).tolist()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时与内存预算
+每个模块在新的解释器中单独导入：用 -X importtime 取累计导入耗时和模块自身耗时，
+另起一次用tracemalloc取导入后仍占用的内存和峰值；bazi.py则在新解释器中排一张盘，
+计入它导入的全部模块。多次运行取最快的一次，超出预算时退出码为1。
+
+$ python -m startup_profile
+$ python -m startup_profile --budget datas=30:2048 --budget bazi.py=300
+$ python -m startup_profile --no-cache sizi yue
+"""
+
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 排盘用的参数
+CHART = 'bazi.py'
+CHART_ARGS = ['-g', '1990', '5', '15', '14']
+
+MODULES = ['datas', 'ganzhi', 'sizi', 'yue', 'lunar_python', 'colorama', CHART]
+
+# 默认预算：(毫秒, KB)，None为不限
+BUDGETS = {
+    'datas': (60, 4096),
+    'ganzhi': (60, 4096),
+    'sizi': (20, 1024),
+    'yue': (20, 1024),
+    'lunar_python': (60, 4096),
+    'colorama': (40, 1024),
+    CHART: (600, 16384),
+}
+
+# 一项结果：累计耗时、自身耗时（毫秒），导入后占用内存、峰值（KB）
+Result = collections.namedtuple("Result", "name time self_time memory peak")
+
+_MEMORY = '''
+import json, tracemalloc
+tracemalloc.start()
+{body}
+print(json.dumps(tracemalloc.get_traced_memory()))
+'''
+
+_CHART = '''
+import contextlib, io, runpy, sys, time
+sys.argv = {argv!r}
+sys.stderr.write("chart start\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    runpy.run_path({path!r}, run_name='__main__')
+sys.stderr.write("chart time: %d\\n" % ((time.perf_counter() - start) * 1e6))
+'''
+
+
+def _run(code, importtime=False, no_cache=False):
+    """在新的解释器中执行code，返回 (stdout, stderr)"""
+    env = dict(os.environ)
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', code]
+    with tempfile.TemporaryDirectory() as cache:
+        if no_cache:
+            # 字节码写到空目录，所有模块都要重新编译
+            env['PYTHONPYCACHEPREFIX'] = cache
+        proc = subprocess.run(cmd, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError("运行失败：{}\n{}".format(' '.join(cmd[:-1]), proc.stderr[-2000:]))
+    return proc.stdout, proc.stderr
+
+
+def parse_importtime(text):
+    """解析 -X importtime 的输出：{模块: (自身微秒, 累计微秒)}，同名取第一次出现"""
+    result = {}
+    for line in text.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        if name not in result:
+            result[name] = (int(parts[0]), int(parts[1]))
+    return result
+
+
+def _body(name):
+    if name == CHART:
+        return _CHART.format(argv=[CHART] + CHART_ARGS, path=os.path.join(BASE_DIR, CHART))
+    return 'import {}'.format(name)
+
+
+def profile(name, repeat=3, no_cache=False):
+    """测量一个模块（或bazi.py排盘）的导入耗时和内存"""
+    best = None
+    for _ in range(repeat):
+        _, err = _run(_body(name), importtime=True, no_cache=no_cache)
+        if name == CHART:
+            # 排盘耗时减去其间顶层导入的耗时，即为排盘本身的耗时
+            before, _, after = err.partition('chart start\n')
+            total = int(after.rsplit('chart time:', 1)[1].split()[0])
+            imports = sum(cumulative for _, cumulative in _top_level(after))
+            times = (total - imports, total)
+        else:
+            times = parse_importtime(err)[name]
+        if best is None or times[1] < best[1]:
+            best = times
+    out, _ = _run(_MEMORY.format(body=_body(name)), no_cache=no_cache)
+    memory, peak = json.loads(out.strip().splitlines()[-1])
+    return Result(name, best[1] / 1000, best[0] / 1000, memory / 1024, peak / 1024)
+
+
+def _top_level(text):
+    """-X importtime输出中顶层导入（没有缩进）的 (自身微秒, 累计微秒)"""
+    for line in text.splitlines():
+        parts = line[len('import time:'):].split('|')
+        if line.startswith('import time:') and len(parts) == 3 and parts[0].strip().isdigit() \
+                and parts[2][1:2] != ' ':
+            yield int(parts[0]), int(parts[1])
+
+
+def over_budget(result, budgets):
+    """超出的预算项说明，未超出时为空列表"""
+    time_budget, memory_budget = budgets.get(result.name, (None, None))
+    problems = []
+    if time_budget is not None and result.time > time_budget:
+        problems.append("耗时{:.1f}ms超出{:g}ms".format(result.time, time_budget))
+    if memory_budget is not None and result.memory > memory_budget:
+        problems.append("内存{:.0f}KB超出{:g}KB".format(result.memory, memory_budget))
+    return problems
+
+
+def parse_budget(text):
+    """'datas=30:2048' -> ('datas', (30, 2048))，省略的部分沿用默认预算"""
+    name, _, value = text.partition('=')
+    if not name or not value:
+        raise argparse.ArgumentTypeError("预算格式应为 模块=毫秒[:KB]：{}".format(text))
+    time_budget, memory_budget = BUDGETS.get(name, (None, None))
+    ms, _, kb = value.partition(':')
+    try:
+        if ms:
+            time_budget = float(ms)
+        if kb:
+            memory_budget = float(kb)
+    except ValueError:
+        raise argparse.ArgumentTypeError("预算格式应为 模块=毫秒[:KB]：{}".format(text))
+    return name, (time_budget, memory_budget)
+
+
+def main(argv=None):
+    description = '''
+# 测量各模块的冷启动导入耗时、内存和首张命盘耗时，超出预算时退出码为1
+$ python -m startup_profile
+
+# 调整预算：模块=毫秒[:KB]，或从JSON文件读取 {"datas": [30, 2048]}
+$ python -m startup_profile --budget datas=30:2048 --budget bazi.py=300
+$ python -m startup_profile --budget-file budgets.json
+
+# 不使用已编译的字节码，测量首次部署时的耗时
+$ python -m startup_profile --no-cache
+'''
+    parser = argparse.ArgumentParser(prog='python -m startup_profile', description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('modules', nargs='*', help='模块名，bazi.py为排一张盘，默认全部')
+    parser.add_argument('--budget', action='append', type=parse_budget, default=[], help='模块=毫秒[:KB]')
+    parser.add_argument('--budget-file', help='JSON预算文件')
+    parser.add_argument('--repeat', type=int, default=3, help='每个模块运行次数，取最快的一次')
+    parser.add_argument('--no-cache', action='store_true', default=False, help='不使用已编译的字节码')
+    parser.add_argument('--json', action='store_true', default=False, help='以JSON输出结果')
+    options = parser.parse_args(argv)
+
+    budgets = dict(BUDGETS)
+    if options.budget_file:
+        with open(options.budget_file, encoding='utf-8') as f:
+            budgets.update({name: tuple(value) for name, value in json.load(f).items()})
+    budgets.update(options.budget)
+
+    results = [profile(name, options.repeat, options.no_cache) for name in options.modules or MODULES]
+    failures = [(result, over_budget(result, budgets)) for result in results]
+    failures = [(result, problems) for result, problems in failures if problems]
+
+    if options.json:
+        print(json.dumps({"results": [result._asdict() for result in results],
+                          "failures": {result.name: problems for result, problems in failures}},
+                         ensure_ascii=False, indent=2))
+    else:
+        print("{:<14}{:>10}{:>10}{:>10}{:>10}  {}".format("模块", "耗时ms", "自身ms", "内存KB", "峰值KB", "预算"))
+        for result in results:
+            time_budget, memory_budget = budgets.get(result.name, (None, None))
+            print("{:<14}{:>10.1f}{:>10.1f}{:>10.0f}{:>10.0f}  {}ms {}KB".format(
+                result.name, result.time, result.self_time, result.memory, result.peak,
+                '-' if time_budget is None else '{:g}'.format(time_budget),
+                '-' if memory_budget is None else '{:g}'.format(memory_budget)))
+        for result, problems in failures:
+            print("超出预算：{} {}".format(result.name, '，'.join(problems)))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
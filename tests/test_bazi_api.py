@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""API参数检查与批量排盘"""
+
+import pytest
+
+import bazi_api
+
+
+@pytest.fixture(scope='module')
+def client():
+    return bazi_api.app.test_client()
+
+
+@pytest.mark.parametrize('minute', [True, False, -1, 60, 1.5, '30'])
+def test_calculate_rejects_minute(client, minute):
+    response = client.post('/api/calculate', json={'year': 1990, 'month': 5, 'day': 15, 'hour': 14,
+                                                   'minute': minute})
+    assert response.status_code == 400
+
+
+def test_batch_rejects_bool_minute(client):
+    items = [{'year': 1990, 'month': 5, 'day': 15, 'hour': 14, 'minute': True}]
+    assert client.post('/api/batch', json={'items': items}).status_code == 400
+
+
+def test_batch_item_errors(client):
+    items = [
+        {'year': 1990, 'month': 13, 'day': 15, 'hour': 14, 'longitude': 121.5},
+        {'year': 1990, 'month': 5, 'day': 15, 'hour': 14, 'longitude': 121.5},
+        {'year': 2020, 'month': 4, 'day': 31, 'hour': 14, 'calendar_type': 'lunar', 'longitude': 121.5},
+        {'year': 1990, 'month': 5, 'day': 15, 'hour': 14, 'longitude': 500},
+    ]
+    response = client.post('/api/batch', json={'items': items})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert 'error' in data[0] and 'error' in data[2] and 'error' in data[3]
+    assert data[1]['four_pillars'] and data[1]['basic_info']['true_solar_time'] == '1990-05-15 14:09'
+
+
+def boundary_names(result):
+    return [item['name'] for item in result['basic_info']['boundary']['candidates']]
+
+
+def test_batch_zi_boundary_needs_minute(client):
+    # 经度121.5校正为23:09，只给到小时时不判断子时交接，与/api/calculate一致
+    item = {'year': 1990, 'month': 5, 'day': 15, 'hour': 23, 'longitude': 121.5}
+    items = [item, dict(item, minute=0)]
+    without_minute, with_minute = client.post('/api/batch', json={'items': items}).get_json()['data']
+    assert '子初' not in boundary_names(without_minute)
+    assert '子初' in boundary_names(with_minute)
+    single = client.post('/api/calculate', json=item).get_json()['data']
+    assert single['basic_info']['boundary'] == without_minute['basic_info']['boundary']
+    assert single['basic_info']['true_solar_time'] == without_minute['basic_info']['true_solar_time']
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""日历导出：流年、流月的时刻带时区"""
+
+import datetime
+import io
+
+from calendar_export import chart_events, day_events, merge, write_ics
+
+
+def export(streams):
+    out = io.StringIO(newline='')
+    write_ics(merge(*streams), out)
+    return out.getvalue().split('\r\n')
+
+
+def test_chart_events_in_utc():
+    start, end = datetime.date(2025, 1, 1), datetime.date(2025, 3, 1)
+    events = list(chart_events(1990, 5, 15, 14, 30, start, end))
+    lines = [line for line in export([iter(events)]) if line.startswith(('DTSTART', 'DTEND'))]
+    assert len(lines) == 2 * len(events) > 0
+    # 2025年立春为北京时间2月3日22:11，即UTC 14:11
+    assert 'DTSTART:20250203T141100Z' in lines
+    for line in lines:
+        assert line.endswith('Z') and ';' not in line
+
+
+def test_day_events_are_dates():
+    lines = export([day_events(datetime.date(2025, 1, 1), datetime.date(2025, 1, 3))])
+    assert [line for line in lines if line.startswith('DTSTART')] == \
+        ['DTSTART;VALUE=DATE:20250101', 'DTSTART;VALUE=DATE:20250102']
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""历表索引与lunar_python逐项对照"""
+
+import datetime
+import random
+
+import pytest
+from lunar_python import Solar
+
+from calendar_index import gz_name, load
+
+index = load()
+
+
+def eight_char(moment):
+    lunar = Solar.fromYmdHms(moment.year, moment.month, moment.day, moment.hour, moment.minute, 0).getLunar()
+    ba = lunar.getEightChar()
+    return ba.getYear(), ba.getMonth(), ba.getDay(), ba.getTime()
+
+
+def sample_moments(count=400, seed=20240101):
+    rng = random.Random(seed)
+    start = datetime.datetime(1801, 1, 1)
+    span = (datetime.datetime(2199, 12, 31) - start).days * 1440
+    return [start + datetime.timedelta(minutes=rng.randrange(span)) for _ in range(count)]
+
+
+@pytest.mark.parametrize('moment', sample_moments(), ids=str)
+def test_pillars_match_lunar_python(moment):
+    codes = index.pillars(moment.year, moment.month, moment.day, moment.hour, moment.minute)
+    assert tuple(gz_name(code) for code in codes) == eight_char(moment)
+
+
+def jie_moments(count=60, seed=7):
+    """交节时刻前后各一分钟，历表的交节时刻向上取整到分钟"""
+    rng = random.Random(seed)
+    moments = []
+    for seq in rng.sample(range(24, index.jieqi_count - 24), count):
+        _, moment = index.jieqi_datetime(seq)
+        moments += [moment - datetime.timedelta(minutes=1), moment]
+    return moments
+
+
+@pytest.mark.parametrize('moment', jie_moments(), ids=str)
+def test_pillars_at_jieqi(moment):
+    codes = index.pillars(moment.year, moment.month, moment.day, moment.hour, moment.minute)
+    assert tuple(gz_name(code) for code in codes) == eight_char(moment)
+
+
+@pytest.mark.parametrize('moment', sample_moments(100, seed=3), ids=lambda m: str(m.date()))
+def test_lunar_date(moment):
+    lunar = Solar.fromYmd(moment.year, moment.month, moment.day).getLunar()
+    day = index.day(moment.year, moment.month, moment.day)
+    assert (day.lunar_year, day.lunar_month, day.lunar_day, day.leap) == \
+        (lunar.getYear(), abs(lunar.getMonth()), lunar.getDay(), int(lunar.getMonth() < 0))
+
+
+def test_out_of_range():
+    with pytest.raises(ValueError):
+        index.pillars(1799, 12, 31, 12)
+    with pytest.raises(ValueError):
+        index.pillars(2201, 1, 1, 12)
+
+
+def test_boundaries_without_minute_skip_zi():
+    # 只给到小时时，23点出生不因子初、子正视为临界
+    names = [item.name for item in index.boundaries(1990, 5, 15, 23)]
+    assert '子初' not in names and '子正' not in names
+    names = [item.name for item in index.boundaries(1990, 5, 15, 23, 10)]
+    assert '子初' in names and '子正' in names
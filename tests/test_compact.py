@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""紧凑查表的反查"""
+
+import pickle
+
+from compact import TwoWay
+
+
+def test_inverse_cached():
+    table = TwoWay('甲乙丙', ('比', '劫', '食'))
+    assert table.inverse is table.inverse
+    assert table.inverse.inverse is table
+    assert dict(table.inverse) == {'比': '甲', '劫': '乙', '食': '丙'}
+
+
+def test_inverse_duplicates_take_first():
+    table = TwoWay('甲寅乙', ('比', '比', '劫'))
+    assert table.inverse['比'] == '甲'
+    assert '劫' in table.inverse and '财' not in table.inverse
+
+
+def test_pickle_drops_inverse():
+    table = TwoWay('甲乙', ('比', '劫'))
+    table.inverse
+    copy = pickle.loads(pickle.dumps(table))
+    assert dict(copy) == dict(table) and copy.inverse['劫'] == '乙'
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""罗猴年历文件：编码、解码往返一致，提交的年历与逐日计算一致"""
+
+import calendar
+import os
+
+import pytest
+
+import luohou
+from luohou import ALMANAC_DIR, PREBUILT_END, PREBUILT_START, _decode_year, _encode_year
+
+
+def read_year(year):
+    with open(os.path.join(ALMANAC_DIR, "{}.bin".format(year)), 'rb') as f:
+        return f.read()
+
+
+# 2023年有闰二月，1952年五月只有29天
+@pytest.fixture(scope='module', params=[1952, 2023])
+def year_days(request):
+    return request.param, luohou.build_year(request.param)
+
+
+def test_round_trip(year_days):
+    year, days = year_days
+    assert _decode_year(year, _encode_year(year, days)) == days
+
+
+def test_committed_matches_build(year_days):
+    year, days = year_days
+    assert read_year(year) == _encode_year(year, days)
+
+
+def test_committed_years():
+    for year in range(PREBUILT_START, PREBUILT_END + 1):
+        days = _decode_year(year, read_year(year))
+        assert len(days) == (366 if calendar.isleap(year) else 365)
+
+
+def test_decode_errors():
+    data = read_year(2025)
+    with pytest.raises(ValueError):
+        _decode_year(2024, data)
+    with pytest.raises(ValueError):
+        _decode_year(2025, data[:-luohou.ALMANAC_RECORD.size])
+
+
+def test_get_year_jizhu_is_fresh():
+    # 压祭主每次调用另行生成，调用方修改它不影响缓存
+    first = luohou.get_year(2025)
+    first.jizhu.clear()
+    assert luohou.get_year(2025).days is first.days
+    assert luohou.get_year(2025).jizhu == luohou.get_jizhu('乙', '巳')
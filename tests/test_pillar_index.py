@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""四柱反查索引：与逐时穷举、lunar_python对照"""
+
+import datetime
+import random
+import sys
+
+import pytest
+from lunar_python import Solar
+
+from calendar_index import MINUTES_PER_DAY, gz_name
+import pillar_index
+from pillar_index import load, parse_gz
+
+index = load()
+calendar = index.calendar
+
+
+def sample_moments(count=40, seed=11):
+    rng = random.Random(seed)
+    start = datetime.datetime(1850, 1, 1)
+    span = (datetime.datetime(2029, 12, 31) - start).days * MINUTES_PER_DAY
+    return [start + datetime.timedelta(minutes=rng.randrange(span)) for _ in range(count)]
+
+
+def eight_char(moment):
+    ba = Solar.fromYmdHms(moment.year, moment.month, moment.day, moment.hour, moment.minute, 0).getLunar().getEightChar()
+    return [ba.getYear(), ba.getMonth(), ba.getDay(), ba.getTime()]
+
+
+@pytest.mark.parametrize('moment', sample_moments(), ids=str)
+def test_lookup_finds_birth_time(moment):
+    pillars = eight_char(moment)
+    total, matches = index.lookup(*pillars, start_year=1850, end_year=2030, size=None)
+    assert total == len(matches) > 0
+    assert any(match.start <= moment < match.end for match in matches)
+    assert matches == sorted(matches)
+    for match in matches:
+        assert eight_char(match.start) == pillars
+        assert eight_char(match.end - datetime.timedelta(minutes=1)) == pillars
+
+
+def brute_force(target, start_year, end_year):
+    """逐时穷举（另加交节时刻）有target四柱的日期"""
+    first = datetime.date(start_year, 1, 1).toordinal() - calendar.origin
+    last = datetime.date(end_year, 12, 31).toordinal() - calendar.origin
+    days = set()
+    for i in range(first, last + 1):
+        minutes = list(range(0, MINUTES_PER_DAY, 60))
+        jie = calendar.record(i).next_jie
+        if jie < MINUTES_PER_DAY:
+            minutes.append(jie)
+        if any(calendar.pillars_at(i, minute) == target for minute in minutes):
+            days.add(calendar.date(i))
+    return days
+
+
+@pytest.mark.parametrize('moment', sample_moments(4, seed=5), ids=str)
+def test_search_matches_brute_force(moment):
+    # 穷举十年，覆盖同一年柱的多个轮回以外的全部日子
+    year = min(max(moment.year, 1855), 2025)
+    target = calendar.pillars(moment.year, moment.month, moment.day, moment.hour, moment.minute)
+    matches = index.search(*target, start_year=year - 5, end_year=year + 4)
+    assert {match.start.date() for match in matches} == brute_force(target, year - 5, year + 4)
+
+
+def test_lookup_pages():
+    pillars = ['庚午', '辛巳', '庚辰', '癸未']
+    total, matches = index.lookup(*pillars, size=None)
+    _, page = index.lookup(*pillars, page=2, size=1)
+    assert total == len(matches) >= 2
+    assert page == matches[1:2]
+
+
+def test_impossible_month_gan():
+    # 庚年寅月为戊寅，没有甲寅月
+    assert index.lookup('庚午', '甲寅', '庚辰', '癸未') == (0, [])
+
+
+def test_parse_gz():
+    assert gz_name(parse_gz('癸亥')) == '癸亥'
+    with pytest.raises(ValueError):
+        parse_gz('甲丑')
+
+
+
+def test_byteswap_round_trip(monkeypatch):
+    # 在小端机器上模拟大端：写出时转换字节序，读取时再转换回来，结果不变
+    monkeypatch.setattr(sys, 'byteorder', 'big')
+    data = pillar_index.build(calendar)
+    swapped = pillar_index.PillarIndex(data, calendar)
+    pillars = ('庚午', '辛巳', '庚辰', '癸未')
+    assert swapped.lookup(*pillars, size=None) == index.lookup(*pillars, size=None)
+    with open(pillar_index.DEFAULT_PATH, 'rb') as f:
+        assert f.read() != data
+
+
+@pytest.mark.parametrize('page, size', [(0, 50), (-1, 50), (1, 0)])
+def test_lookup_rejects_bad_page(page, size):
+    with pytest.raises(ValueError):
+        index.lookup('庚午', '辛巳', '庚辰', '癸未', page=page, size=size)
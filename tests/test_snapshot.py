@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""基础表快照：还原结果与导入源文件一致；快照无效时只导入、不写文件
+
+快照替换的是sys.modules中的模块，每个用例在单独的进程中运行。
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import snapshot
+from snapshot import HEADER
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 由指定快照安装模块后排盘，第一行输出install()的返回值
+SCRIPT = '''
+import sys
+import snapshot
+print(snapshot.install(sys.argv[1]))
+import bazi
+bazi.main(['1990', '5', '15', '14', '-g'])
+'''
+
+
+def run(path):
+    env = dict(os.environ, PYTHONHASHSEED='0')
+    result = subprocess.run([sys.executable, '-c', SCRIPT, str(path)], cwd=BASE_DIR, env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    installed, output = result.stdout.split(b'\n', 1)
+    return installed == b'True', output
+
+
+def test_committed_snapshot_is_fresh():
+    snapshot.check()
+
+
+def test_restore_matches_sources(tmp_path):
+    installed, output = run(snapshot.DEFAULT_PATH)
+    assert installed
+    installed, expected = run(tmp_path / 'missing.bin')
+    assert not installed
+    assert output == expected
+
+
+def test_missing_snapshot_is_not_written(tmp_path):
+    path = tmp_path / 'tables.bin'
+    assert run(path)[0] is False
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_corrupt_snapshot(tmp_path):
+    with open(snapshot.DEFAULT_PATH, 'rb') as f:
+        data = bytearray(f.read())
+    data[-1] ^= 0xff
+    path = tmp_path / 'tables.bin'
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        snapshot.read(str(path))
+    assert run(path)[0] is False
+
+
+def test_edited_source(tmp_path):
+    # 修改源文件后不再使用快照，改为导入源文件
+    for name in snapshot.SOURCES + ['snapshot.py', 'tables.bin']:
+        with open(os.path.join(BASE_DIR, name), 'rb') as f:
+            data = f.read()
+        if name == 'datas.py':
+            data = data.replace(b"minggongs = {", b"minggongs = {'test': 'edited', ", 1)
+            assert b"'test': 'edited'" in data
+        (tmp_path / name).write_bytes(data)
+    script = "import snapshot; print(snapshot.install()); import datas; print(datas.minggongs['test'])"
+    result = subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path), check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert result.stdout.split() == [b'False', b'edited']
+
+
+def test_functions_compiled_from_source():
+    script = "import snapshot; print(snapshot.install()); import yongshen; print(yongshen.tiaohou.__code__.co_filename)"
+    result = subprocess.run([sys.executable, '-c', script], cwd=BASE_DIR, check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    installed, filename = result.stdout.decode().split()
+    assert installed == 'True'
+    assert filename == os.path.join(BASE_DIR, 'yongshen.py')
+
+
+def test_check_stale(tmp_path):
+    with open(snapshot.DEFAULT_PATH, 'rb') as f:
+        data = bytearray(f.read())
+    magic, version, crc, payload_crc, head_size = HEADER.unpack_from(data, 0)
+    HEADER.pack_into(data, 0, magic, version, crc ^ 1, payload_crc, head_size)
+    path = tmp_path / 'tables.bin'
+    path.write_bytes(data)
+    snapshot.read(str(path))
+    with pytest.raises(ValueError):
+        snapshot.check(str(path))
+    assert run(path)[0] is False
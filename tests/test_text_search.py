@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""古籍检索索引"""
+
+import sys
+
+import text_search
+from text_search import TextSearch
+
+
+def test_committed_index():
+    total, hits = text_search.search('从才')
+    assert total > 0
+    assert all('从才' in hit.snippet for hit in hits)
+
+
+def test_byteswap_round_trip(monkeypatch):
+    # 在小端机器上模拟大端：写出时转换字节序，读取时再转换回来，结果不变
+    expected = text_search.search('魁罡', size=100)
+    monkeypatch.setattr(sys, 'byteorder', 'big')
+    swapped = TextSearch(text_search.build())
+    assert swapped.search('魁罡', size=100) == expected
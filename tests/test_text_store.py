@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""断语文本库：与源字典逐条对照"""
+
+import importlib
+import os
+import subprocess
+import sys
+
+import pytest
+
+import text_store
+from text_store import HEADER, SOURCES, TextStore
+
+
+@pytest.fixture(scope='module')
+def store():
+    return TextStore(text_store.build())
+
+
+def test_round_trip(store):
+    count = 0
+    for table, path, value in text_store.entries():
+        assert store.get(table, *path) == value
+        count += 1
+    assert count == len(store.kinds)
+
+
+@pytest.mark.parametrize('table, module, name', SOURCES, ids=[item[0] for item in SOURCES])
+def test_tables_match_sources(store, table, module, name):
+    data = getattr(importlib.import_module(module), name)
+    assert list(store.table(table)) == list(data)
+    assert store.table(table) == data
+
+
+def test_missing_key(store):
+    with pytest.raises(KeyError):
+        store.table('summarys')['甲日']
+    with pytest.raises(KeyError):
+        store.table('no_such_table')
+
+
+def test_committed_store_is_fresh():
+    text_store.check()
+
+
+def test_check_stale(tmp_path):
+    data = bytearray(text_store.build())
+    magic, version, count, key_size, crc = HEADER.unpack_from(data, 0)
+    HEADER.pack_into(data, 0, magic, version, count, key_size, crc ^ 1)
+    path = tmp_path / 'texts.bin'
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        text_store.check(str(path))
+
+
+def test_load_edited_source(tmp_path):
+    # 修改断语而未重新生成文本库时，load()在内存中重新生成，不改写文件
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for name in ['text_store.py', 'texts.bin', 'compact.py', 'ganzhi.py', 'datas.py', 'sizi.py', 'yue.py']:
+        with open(os.path.join(base, name), 'rb') as f:
+            data = f.read()
+        if name == 'datas.py':
+            data = data.replace('"子": "天贵星'.encode(), '"子": "已修改，天贵星'.encode(), 1)
+        (tmp_path / name).write_bytes(data)
+    before = (tmp_path / 'texts.bin').read_bytes()
+    script = "import text_store; print(text_store.load().get('minggongs', '子'))"
+    env = dict(os.environ, PYTHONIOENCODING='utf-8')
+    result = subprocess.run([sys.executable, '-c', script], cwd=str(tmp_path), env=env, check=True,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert result.stdout.decode('utf-8').startswith('已修改，天贵星')
+    assert (tmp_path / 'texts.bin').read_bytes() == before
+
+
+def test_byteswap_round_trip(monkeypatch):
+    # 在小端机器上模拟大端：写出时转换字节序，读取时再转换回来，结果不变
+    monkeypatch.setattr(sys, 'byteorder', 'big')
+    swapped = TextStore(text_store.build())
+    for table, path, value in text_store.entries():
+        assert swapped.get(table, *path) == value
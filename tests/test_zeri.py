@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""择日的查询范围：end不含，按实际查询的最后一天判断"""
+
+import datetime
+
+import pytest
+
+from zeri import columns
+
+
+def test_exclusive_end_covers_last_year():
+    cols = columns(datetime.date(2100, 1, 1), datetime.date(2101, 1, 1))
+    assert len(cols.days) == 365
+    assert cols.days[-1].date == datetime.date(2100, 12, 31)
+
+
+def test_ten_years():
+    assert len(columns(datetime.date(2025, 1, 1), datetime.date(2035, 1, 1)).days) == 3652
+    with pytest.raises(ValueError):
+        columns(datetime.date(2025, 1, 1), datetime.date(2035, 1, 2))
+
+
+@pytest.mark.parametrize('start, end', [((1949, 12, 31), (1950, 1, 2)), ((2100, 6, 1), (2101, 1, 2))])
+def test_outside_almanac(start, end):
+    with pytest.raises(ValueError):
+        columns(datetime.date(*start), datetime.date(*end))
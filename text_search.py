@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+古籍全文检索
+对文本库中的《三命通会》(summarys)、《穷通宝鉴》(months)、六十日用法(days60)、格局(ges)
+建立倒排索引：去掉空白后按单字和相邻两字切分，记录每个词在各条中的出现次数。
+
+查询时取查询词各个二字词（单字查询取单字）的倒排表求交集，按BM25打分，
+再在候选条文中核对整个短语，返回命中的条文及其键。
+
+索引文件与文本库放在一起，随代码提交。文件不存在时load()生成文件；与文本库不一致
+（如修改断语后文本库在内存中重新生成）时在内存中生成（约0.15秒），不改写提交的文件。
+
+$ python text_search.py 从才
+$ python text_search.py 魁罡 --tables days60 summarys
+"""
+
+import argparse
+import bisect
+import collections
+import math
+import mmap
+import os
+import re
+import struct
+from array import array
+
+import text_store
+
+# 小端序，索引文件随代码提交，在大端机器上读取时转换字节序
+HEADER = struct.Struct('<4sHIIII')
+MAGIC = b'BZSI'
+VERSION = 1
+
+DEFAULT_PATH = os.path.join(text_store.BASE_DIR, 'texts.idx')
+
+# 参与检索的表及其名称
+TABLES = collections.OrderedDict([
+    ('summarys', '三命通会'),
+    ('months', '穷通宝鉴'),
+    ('days60', '六十日用法'),
+    ('ges', '格局'),
+])
+
+PAGE_SIZE = 20
+
+# 摘要中命中位置前后各取的字数
+SNIPPET = 30
+
+# BM25参数
+K1 = 1.2
+B = 0.75
+
+SPACES = re.compile(r'\s+')
+
+# 一条命中：表名、书名、键（嵌套表为各级键）、分数、摘要
+Hit = collections.namedtuple("Hit", "table book key score snippet")
+
+
+def normalize(text):
+    """去掉空白，检索时不跨越换行、缩进"""
+    return SPACES.sub('', text)
+
+
+def term(a, b=''):
+    """单字或二字词的编码：首字在高位，单字的低位为0"""
+    return ord(a) << 21 | (ord(b) if b else 0)
+
+
+def terms(text):
+    """文本切分为单字和二字词的编码"""
+    for i, char in enumerate(text):
+        yield term(char)
+        if i + 1 < len(text):
+            yield term(char, text[i + 1])
+
+
+def _text(value):
+    return value[0] if isinstance(value, tuple) else value
+
+
+def documents(store):
+    """参与检索的条目 (条目序号, 去掉空白的文本)"""
+    for table in TABLES:
+        for i in store.index[table].values():
+            yield i, normalize(_text(store.text(i)))
+
+
+def build(store=None):
+    """生成索引文件的字节串"""
+    store = store or text_store.load()
+    postings = collections.defaultdict(list)
+    docs = array('I')
+    lengths = array('I')
+    for n, (i, text) in enumerate(documents(store)):
+        docs.append(i)
+        lengths.append(len(text))
+        for code, count in sorted(collections.Counter(terms(text)).items()):
+            postings[code].append((n, count))
+
+    if len(docs) > 0xFFFF:
+        raise ValueError("条目过多，文档序号超出16位")
+    codes = array('Q', sorted(postings))
+    offsets = array('I', [0])
+    doc_ids = array('H')
+    counts = array('H')
+    for code in codes:
+        for n, count in postings[code]:
+            doc_ids.append(n)
+            counts.append(min(count, 0xFFFF))
+        offsets.append(len(doc_ids))
+    header = HEADER.pack(MAGIC, VERSION, store.crc, len(docs), len(codes), len(doc_ids))
+    return b''.join([header] + [text_store.array_bytes(items)
+                                for items in (docs, lengths, codes, offsets, doc_ids, counts)])
+
+
+def write(path=DEFAULT_PATH, store=None):
+    data = build(store)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+class TextSearch:
+    def __init__(self, buf, store=None):
+        self.store = store or text_store.load()
+        self.buf = memoryview(buf)
+        magic, version, crc, n_docs, n_terms, n_postings = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("检索索引格式不匹配，请重新生成")
+        if crc != self.store.crc:
+            raise ValueError("检索索引与文本库不一致，请重新生成")
+        start = HEADER.size
+        self.docs = text_store.array_view(self.buf[start:start + 4 * n_docs], 'I')
+        start += 4 * n_docs
+        self.lengths = text_store.array_view(self.buf[start:start + 4 * n_docs], 'I')
+        start += 4 * n_docs
+        self.codes = text_store.array_view(self.buf[start:start + 8 * n_terms], 'Q')
+        start += 8 * n_terms
+        self.offsets = text_store.array_view(self.buf[start:start + 4 * (n_terms + 1)], 'I')
+        start += 4 * (n_terms + 1)
+        self.doc_ids = text_store.array_view(self.buf[start:start + 2 * n_postings], 'H')
+        start += 2 * n_postings
+        self.counts = text_store.array_view(self.buf[start:start + 2 * n_postings], 'H')
+        self.average = sum(self.lengths) / max(n_docs, 1)
+
+        # 条目序号 -> (表名, 键路径)
+        self.keys = {}
+        for table in TABLES:
+            for path, i in self.store.index[table].items():
+                self.keys[i] = (table, path)
+
+    @classmethod
+    def open(cls, path=DEFAULT_PATH, store=None):
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm, store)
+
+    def postings(self, code):
+        """词编码的倒排表：{文档序号: 出现次数}"""
+        k = bisect.bisect_left(self.codes, code)
+        if k == len(self.codes) or self.codes[k] != code:
+            return {}
+        begin, end = self.offsets[k], self.offsets[k + 1]
+        return dict(zip(self.doc_ids[begin:end], self.counts[begin:end]))
+
+    def _score(self, query_terms, lists, n):
+        total = len(self.docs)
+        length = self.lengths[n]
+        score = 0.0
+        for code, items in zip(query_terms, lists):
+            df = len(items)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            tf = items[n]
+            score += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / self.average))
+        return score
+
+    def search(self, query, tables=None, page=1, size=PAGE_SIZE):
+        """检索短语query
+
+        Args:
+            query: 检索词，空白会被去掉
+            tables: 限定的表名列表，默认TABLES中的全部
+            page, size: 分页，page从1开始
+
+        Returns:
+            (total, hits): 命中条数和第page页的Hit，按分数从高到低
+        """
+        query = normalize(query)
+        if not query:
+            raise ValueError("检索词不能为空")
+        tables = list(TABLES) if tables is None else list(tables)
+        for table in tables:
+            if table not in TABLES:
+                raise ValueError("不支持的表：{}".format(table))
+
+        if len(query) == 1:
+            query_terms = [term(query)]
+        else:
+            query_terms = list(dict.fromkeys(term(a, b) for a, b in zip(query, query[1:])))
+        lists = [self.postings(code) for code in query_terms]
+        candidates = set(min(lists, key=len))
+        for items in lists:
+            candidates &= items.keys()
+
+        hits = []
+        for n in candidates:
+            i = self.docs[n]
+            table, path = self.keys[i]
+            if table not in tables:
+                continue
+            text = normalize(_text(self.store.text(i)))
+            if query not in text:
+                continue
+            hits.append((self._score(query_terms, lists, n), i, table, path, text))
+        hits.sort(key=lambda item: (-item[0], item[1]))
+
+        begin = (page - 1) * size
+        result = []
+        for score, i, table, path, text in hits[begin:begin + size]:
+            pos = text.index(query)
+            snippet = text[max(0, pos - SNIPPET):pos + len(query) + SNIPPET]
+            result.append(Hit(table, TABLES[table], list(path), round(score, 3), snippet))
+        return len(hits), result
+
+
+_search = None
+
+
+def load(path=DEFAULT_PATH):
+    """打开检索索引，文件不存在时生成，目录不可写时在内存中生成；
+    格式不符或与文本库不一致时在内存中生成，不改写随代码提交的文件
+    """
+    global _search
+    if path != DEFAULT_PATH:
+        return TextSearch.open(path)
+    if _search is None:
+        try:
+            _search = TextSearch.open(path)
+        except ValueError:
+            _search = TextSearch(build())
+        except OSError:
+            try:
+                write(path)
+                _search = TextSearch.open(path)
+            except OSError:
+                _search = TextSearch(build())
+    return _search
+
+
+def search(query, tables=None, page=1, size=PAGE_SIZE):
+    return load().search(query, tables, page, size)
+
+
+if __name__ == '__main__':
+    description = '''
+# 检索《三命通会》《穷通宝鉴》六十日用法、格局中提到"从才"的条文
+$ python text_search.py 从才
+
+# 只在六十日用法和三命通会中检索
+$ python text_search.py 魁罡 --tables days60 summarys
+
+# 生成索引文件
+$ python text_search.py -o texts.idx
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('query', nargs='?', help='检索词')
+    parser.add_argument('--tables', nargs='+', choices=list(TABLES), help='限定的表')
+    parser.add_argument('--page', type=int, default=1)
+    parser.add_argument('--size', type=int, default=PAGE_SIZE)
+    parser.add_argument('-o', action="store", help='输出索引文件')
+    options = parser.parse_args()
+
+    if options.o:
+        print("{} 字节".format(write(options.o)))
+    elif options.query:
+        total, hits = search(options.query, options.tables, options.page, options.size)
+        for hit in hits:
+            print(hit.book, ''.join(hit.key), hit.score, hit.snippet)
+        print("共{}条".format(total))
+    else:
+        parser.error(u'请输入检索词，或使用-o')
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+断语文本库
+把散落在sizi.py、yue.py、datas.py、ganzhi.py中的断语字典打包成一个文件：
+文件头、偏移表、每条的类型标记、键表，后接逐条的UTF-8文本，较长的条目单独zlib压缩。
+读取时mmap整个文件，多个进程共享同一份页面，取某一条时才切片解码。
+
+文件头记录源文件的CRC，load()每次都核对（读取约370KB源文件，约0.07ms）。
+源文件修改后文本库即过期，load()在内存中重新生成，断语的修改立即生效；
+用 --check 检查文本库是否过期，重新生成后随代码提交。
+
+生成文本库：
+$ python text_store.py -o texts.bin
+
+检查文本库与源文件是否一致：
+$ python text_store.py --check
+
+查看一条：
+$ python text_store.py summarys 甲日甲子
+$ python text_store.py ges 木 寅
+"""
+
+import argparse
+import collections.abc
+import importlib
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+# 小端序，文本库随代码提交，在大端机器上读取时转换字节序
+HEADER = struct.Struct('<4sHIII')
+MAGIC = b'BZTX'
+VERSION = 1
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(BASE_DIR, 'texts.bin')
+
+# (表名, 模块, 变量名)
+SOURCES = [
+    ('summarys', 'sizi', 'summarys'),
+    ('months', 'yue', 'months'),
+    ('days60', 'datas', 'days60'),
+    ('rizhus', 'datas', 'rizhus'),
+    ('minggongs', 'datas', 'minggongs'),
+    ('ges', 'datas', 'ges'),
+    ('jinbuhuan', 'datas', 'jinbuhuan'),
+    ('shens_infos', 'datas', 'shens_infos'),
+    ('gan_desc', 'ganzhi', 'gan_desc'),
+    ('zhi_desc', 'ganzhi', 'zhi_desc'),
+    ('gan3', 'ganzhi', 'gan3'),
+    ('gan4', 'ganzhi', 'gan4'),
+    ('zhi3', 'ganzhi', 'zhi3'),
+    ('gan_health', 'ganzhi', 'gan_health'),
+]
+
+# 条目类型标记
+ZLIB = 1     # zlib压缩
+TUPLE = 2    # 原字典中的值是只有一个字符串的元组
+
+# 不小于此字节数的条目尝试压缩，压缩后更短才采用
+COMPRESS_MIN = 128
+
+# 键表中分隔表名与各级键、分隔条目的字符
+SEP = '\x1f'
+END = '\n'
+
+
+def source_crc():
+    """各源文件内容的CRC，用于判断文本库是否过期"""
+    crc = 0
+    for module in sorted({item[1] for item in SOURCES}):
+        with open(os.path.join(BASE_DIR, module + '.py'), 'rb') as f:
+            crc = zlib.crc32(f.read(), crc)
+    return crc
+
+
+def array_bytes(items):
+    """数组按小端序转换为字节串"""
+    if sys.byteorder == 'big':
+        items = array(items.typecode, items)
+        items.byteswap()
+    return items.tobytes()
+
+
+def array_view(buf, typecode):
+    """文件中的小端序数组；小端机器上直接映射，大端机器上复制一份并转换字节序"""
+    if sys.byteorder == 'little':
+        return buf.cast(typecode)
+    items = array(typecode, bytes(buf))
+    items.byteswap()
+    return items
+
+
+def _flatten(path, value):
+    """嵌套字典展开为 (键路径, 值)"""
+    if isinstance(value, collections.abc.Mapping):
+        for key in value:
+            yield from _flatten(path + (key,), value[key])
+    else:
+        yield path, value
+
+
+def entries():
+    """全部条目 (表名, 键路径, 值)，按SOURCES和字典原有顺序"""
+    for table, module, name in SOURCES:
+        data = getattr(importlib.import_module(module), name)
+        for path, value in _flatten((), data):
+            yield table, path, value
+
+
+def build():
+    """生成文本库的字节串"""
+    offsets = array('I', [0])
+    kinds = bytearray()
+    keys = []
+    chunks = []
+    size = 0
+    for table, path, value in entries():
+        kind = 0
+        if isinstance(value, tuple) and len(value) == 1:
+            kind |= TUPLE
+            value = value[0]
+        if not isinstance(value, str):
+            raise ValueError("{}{}不是文本".format(table, list(path)))
+        data = value.encode('utf-8')
+        if len(data) >= COMPRESS_MIN:
+            packed = zlib.compress(data, 9)
+            if len(packed) < len(data):
+                kind |= ZLIB
+                data = packed
+        keys.append(SEP.join((table,) + path))
+        kinds.append(kind)
+        chunks.append(data)
+        size += len(data)
+        offsets.append(size)
+    key_data = (END.join(keys) + END).encode('utf-8')
+    header = HEADER.pack(MAGIC, VERSION, len(kinds), len(key_data), source_crc())
+    return b''.join([header, array_bytes(offsets), bytes(kinds), key_data] + chunks)
+
+
+def write(path=DEFAULT_PATH):
+    data = build()
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+class TextTable(collections.abc.Mapping):
+    """文本库中的一张表，或嵌套表（如ges）的一层，取值时才解码"""
+
+    def __init__(self, store, table, prefix=()):
+        self.store = store
+        self.table = table
+        self.prefix = prefix
+
+    def __getitem__(self, key):
+        path = self.prefix + (key,)
+        index = self.store.index[self.table]
+        if path in index:
+            return self.store.text(index[path])
+        if path in self.store.children[self.table]:
+            return TextTable(self.store, self.table, path)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.store.children[self.table][self.prefix])
+
+    def __len__(self):
+        return len(self.store.children[self.table][self.prefix])
+
+
+class TextStore:
+    def __init__(self, buf):
+        self.buf = memoryview(buf)
+        magic, version, count, key_size, crc = HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("文本库格式不匹配，请重新生成")
+        self.crc = crc
+        start = HEADER.size
+        self.offsets = array_view(self.buf[start:start + 4 * (count + 1)], 'I')
+        start += 4 * (count + 1)
+        self.kinds = self.buf[start:start + count]
+        start += count
+        keys = str(self.buf[start:start + key_size], 'utf-8').split(END)[:count]
+        self.data = self.buf[start + key_size:]
+
+        # 表名 -> {键路径: 条目序号}；表名 -> {上级路径: 按原顺序排列的下一级键}
+        self.index = {}
+        self.children = {}
+        for i, item in enumerate(keys):
+            table, *path = item.split(SEP)
+            path = tuple(path)
+            self.index.setdefault(table, {})[path] = i
+            children = self.children.setdefault(table, {})
+            for n in range(len(path)):
+                children.setdefault(path[:n], {})[path[n]] = None
+
+    @classmethod
+    def open(cls, path=DEFAULT_PATH):
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mm)
+
+    def text(self, i):
+        """第i条的文本"""
+        data = self.data[self.offsets[i]:self.offsets[i + 1]]
+        kind = self.kinds[i]
+        text = zlib.decompress(data).decode('utf-8') if kind & ZLIB else str(data, 'utf-8')
+        return (text,) if kind & TUPLE else text
+
+    def table(self, name):
+        if name not in self.index:
+            raise KeyError(name)
+        return TextTable(self, name)
+
+    def get(self, table, *path):
+        return self.text(self.index[table][path])
+
+    def tables(self):
+        return list(self.index)
+
+
+_store = None
+
+
+def check(path=DEFAULT_PATH):
+    """文本库与源文件不一致时抛出ValueError，文件不存在时抛出OSError"""
+    if TextStore.open(path).crc != source_crc():
+        raise ValueError("文本库已过期，请重新生成")
+
+
+def load(path=DEFAULT_PATH):
+    """打开文本库，文件不存在或格式不符时重新生成，目录不可写时在内存中生成；
+    与源文件不一致（过期）时在内存中生成，不改写随代码提交的文件
+    """
+    global _store
+    if path != DEFAULT_PATH:
+        return TextStore.open(path)
+    if _store is None:
+        try:
+            store = TextStore.open(path)
+        except (OSError, ValueError):
+            try:
+                write(path)
+                store = TextStore.open(path)
+            except OSError:
+                store = TextStore(build())
+        if store.crc != source_crc():
+            store = TextStore(build())
+        _store = store
+    return _store
+
+
+if __name__ == '__main__':
+    description = '''
+# 生成文本库
+$ python text_store.py -o texts.bin
+
+# 查看一条，嵌套表依次给出各级键
+$ python text_store.py summarys 甲日甲子
+$ python text_store.py ges 木 寅
+
+# 各表条数和大小
+$ python text_store.py --stats
+
+# 检查文本库与源文件是否一致
+$ python text_store.py --check
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('keys', nargs='*', help='表名和键')
+    parser.add_argument('-o', action="store", help='输出文件')
+    parser.add_argument('--stats', action="store_true", default=False, help='各表条数和大小')
+    parser.add_argument('--check', action="store_true", default=False, help='检查文本库与源文件是否一致')
+    options = parser.parse_args()
+
+    if options.o:
+        print("{} 字节".format(write(options.o)))
+    elif options.check:
+        try:
+            check()
+        except (OSError, ValueError) as e:
+            print("文本库不可用：{}".format(e))
+            sys.exit(1)
+        print("文本库与源文件一致")
+    elif options.stats:
+        store = load()
+        for name in store.tables():
+            index = store.index[name]
+            texts = (store.text(i) for i in index.values())
+            raw = sum(len((item[0] if isinstance(item, tuple) else item).encode('utf-8')) for item in texts)
+            packed = sum(store.offsets[i + 1] - store.offsets[i] for i in index.values())
+            print("{}\t{}条\t{}字节\t压缩后{}字节".format(name, len(index), raw, packed))
+        print("文件共{}字节".format(len(store.buf)))
+    elif options.keys:
+        print(load().get(*options.keys))
+    else:
+        parser.error(u'请给出表名和键，或使用-o、--stats、--check')
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调候、金不换、格局选用的结构化表
+datas.py中的tiaohous、jinbuhuan、ges是给人看的字符串，如 '1庚2戊丙3己丁'、
+'调候：喜丁 忌壬癸  大运：...'、'食伤生财：最佳  财格：...'。
+导入时逐条解析一次，按 (日干, 月支) 存成120项的元组，查询时直接取记录，不再做正则匹配。
+
+$ python yongshen.py 甲 卯
+"""
+
+import argparse
+import collections
+import re
+
+from ganzhi import Gan, Zhi, gan5
+from datas import tiaohous, jinbuhuan, ges
+
+# 调候用神，字段与bazi_api返回的seasonal_adjustment一致
+Tiaohou = collections.namedtuple("Tiaohou", "adjustment_gods priority_order favorable_gods unfavorable_gods description")
+
+# 调候用神的一位：priority为序号，1最优先
+Priority = collections.namedtuple("Priority", "priority god")
+
+# 格局选用，前五个字段与bazi_api返回的patterns一致，grades为 (格局, 评语) 列表
+Pattern = collections.namedtuple("Pattern", "primary_pattern secondary_patterns favorable_elements "
+                                            "unfavorable_elements pattern_quality grades")
+
+
+def index(gan, zhi):
+    """(日干, 月支) 在各表中的下标"""
+    return Gan.index(gan) * 12 + Zhi.index(zhi)
+
+
+def parse_tiaohou(text):
+    """解析调候文字，如 '1庚2癸壬' 或 '喜庚壬辛 忌丁'"""
+    adjustment_gods = []
+    priority_order = []
+    favorable_gods = []
+    unfavorable_gods = []
+
+    # 优先级调候用神 - 格式如 "1庚2癸壬"
+    for priority, gods in re.findall(r'(\d+)([甲乙丙丁戊己庚辛壬癸]+)', text):
+        for god in gods:
+            priority_order.append(Priority(int(priority), god))
+            if god not in adjustment_gods:
+                adjustment_gods.append(god)
+
+    # 喜忌用神 - 格式如 "喜庚壬辛 忌丁"
+    if "喜" in text:
+        favorable_match = re.search(r'喜([甲乙丙丁戊己庚辛壬癸\s]+?)(?:\s+忌|$)', text)
+        if favorable_match:
+            favorable_gods = re.findall(r'[甲乙丙丁戊己庚辛壬癸]', favorable_match.group(1).strip())
+
+    if "忌" in text:
+        unfavorable_match = re.search(r'忌([甲乙丙丁戊己庚辛壬癸\s]+?)(?:\s+|$)', text)
+        if unfavorable_match:
+            unfavorable_gods = re.findall(r'[甲乙丙丁戊己庚辛壬癸]', unfavorable_match.group(1).strip())
+
+    # 没有优先级信息但有喜用神时，以喜用神作为调候用神；都没有时直接提取天干
+    if not adjustment_gods and favorable_gods:
+        adjustment_gods = favorable_gods.copy()
+    if not adjustment_gods:
+        adjustment_gods = list(set(re.findall(r'[甲乙丙丁戊己庚辛壬癸]', text)))
+
+    return Tiaohou(tuple(adjustment_gods), tuple(priority_order), tuple(favorable_gods),
+                   tuple(unfavorable_gods), text)
+
+
+def parse_pattern(text):
+    """解析格局选用文字，如 '食伤生财：孤贫劳 财格：     印格；最佳       杀印相生：佳   官杀：体弱多病'"""
+    primary_pattern = ""
+    secondary_patterns = []
+    favorable_elements = []
+    unfavorable_elements = []
+    pattern_quality = ""
+
+    for i, part in enumerate(re.split(r'[：；]', text)):
+        part = part.strip()
+        if not part:
+            continue
+        if i == 0:  # 第一个通常是主格局
+            primary_pattern = part
+        elif "最佳" in part:
+            pattern_quality = "最佳"
+            secondary_patterns.append(part.replace("最佳", "").strip())
+        elif "佳" in part:
+            pattern_quality = pattern_quality or "佳"
+            secondary_patterns.append(part.replace("佳", "").strip())
+        else:
+            secondary_patterns.append(part)
+
+    # 喜忌信息（如果存在）
+    if "喜" in text:
+        favorable_match = re.search(r'喜([^忌]+)', text)
+        if favorable_match:
+            favorable_elements = [elem.strip() for elem in favorable_match.group(1).strip() if elem.strip()]
+    if "忌" in text:
+        unfavorable_match = re.search(r'忌(.+)', text)
+        if unfavorable_match:
+            unfavorable_elements = [elem.strip() for elem in unfavorable_match.group(1).strip() if elem.strip()]
+
+    # 各格局与评语，原文中个别冒号写作分号；没有冒号的片段接在上一条评语后
+    grades = []
+    for token in text.split():
+        match = re.match(r'([^：；]+)[：；](.*)', token)
+        if match:
+            grades.append(match.groups())
+        elif grades:
+            grades[-1] = (grades[-1][0], grades[-1][1] + token)
+    return Pattern(primary_pattern, tuple(secondary_patterns), tuple(favorable_elements),
+                   tuple(unfavorable_elements), pattern_quality, tuple(grades))
+
+
+def _jinbuhuan_text(text):
+    """金不换大运中调候部分的文字：'调候：'之后到'金'字之前"""
+    match = re.search(r'调候：([^金]*)', text)
+    return match.group(1).strip() if match else ""
+
+
+def _build(parse, texts):
+    result = [None] * 120
+    for gan in Gan:
+        for zhi in Zhi:
+            result[index(gan, zhi)] = parse(texts(gan, zhi))
+    return tuple(result)
+
+
+TIAOHOUS = _build(parse_tiaohou, lambda gan, zhi: tiaohous[gan + zhi].strip())
+JINBUHUANS = _build(parse_tiaohou, lambda gan, zhi: _jinbuhuan_text(jinbuhuan[gan + zhi]))
+GES = _build(parse_pattern, lambda gan, zhi: ges[gan5[gan]][zhi].strip())
+
+
+def tiaohou(gan, zhi):
+    """日干gan生于zhi月的调候用神"""
+    return TIAOHOUS[index(gan, zhi)]
+
+
+def jinbuhuan_tiaohou(gan, zhi):
+    """日干gan生于zhi月的金不换大运调候"""
+    return JINBUHUANS[index(gan, zhi)]
+
+
+def pattern(gan, zhi):
+    """日干gan生于zhi月的格局选用"""
+    return GES[index(gan, zhi)]
+
+
+def as_dict(record):
+    """转换为可序列化为JSON的字典，调候的优先级转换为 {"priority", "god"}"""
+    result = {}
+    for name, value in record._asdict().items():
+        if name == 'priority_order':
+            value = [item._asdict() for item in value]
+        elif name == 'grades':
+            value = [list(item) for item in value]
+        elif isinstance(value, tuple):
+            value = list(value)
+        result[name] = value
+    return result
+
+
+if __name__ == '__main__':
+    description = '''
+# 甲日生于卯月的调候、金不换调候和格局选用
+$ python yongshen.py 甲 卯
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('gan', help='日干')
+    parser.add_argument('zhi', help='月支')
+    options = parser.parse_args()
+
+    if options.gan not in Gan or options.zhi not in Zhi:
+        parser.error(u'日干或月支不合法')
+    for name, record in (('调候', tiaohou(options.gan, options.zhi)),
+                         ('金不换', jinbuhuan_tiaohou(options.gan, options.zhi)),
+                         ('格局', pattern(options.gan, options.zhi))):
+        print(name, as_dict(record))
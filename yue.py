@@ -3,6 +3,8 @@
 # Author:  钉钉或微信pythontesting 技术支持钉钉群：21734177
 # CreateDate: 2023-10-28
 
+import collections.abc
+
 jia_1 = '''
     春月之木，渐有生长之象。初春犹有余寒，当以火温暖，则有舒畅之美，水多变克，有损精神。重见生旺，必用庚金斲凿，可成楝梁。
     春末阳壮水渴，藉水资扶，则花繁叶茂。初春无火，增之以水，则阴浓气弱，根损枝枯，不能华秀
@@ -133,23 +135,23 @@ ji10_12 = '''
     
     或一片辛庚，须用丙火，还须丁火为助，丙藏，富贵奇特之命。''',   
 
-months = {
+_templates = {
 
-    '甲寅': f'''
+    '甲寅': '''
     正月甲木，初春尚有余寒，得丙癸逢，富贵双全。癸藏丙透，名寒木向阳，主大富贵。倘风水不及，亦不失儒林俊秀。如无丙癸，平常人也。
     -- 丙为重，癸有丑水都可。不能从；
     {jia12}
     {jia_1}
     ''',
 
-    '甲卯': f'''
+    '甲卯': '''
     二月甲木，庚金得所，名阳刃驾杀，可云小贵，异途显达，或主武职，但要财资之。柱中逢才，英雄独压万人。
     若见癸水，困了才杀，主为光棍，重刃必定遭凶。性情凶暴。
     {jia12}
     {jia_1}
     ''',
 
-    '甲辰': f'''
+    '甲辰': '''
     三月甲木，木气相竭。先取庚金，次用壬水。庚壬两透，一榜堪图。但要运用相生，风水阴德，方许富贵。
     或见一二庚金，独取壬水。壬透清秀之人，才学必富。
     或天干透出二丙，庚藏支下，此钝斧无钢，富贵难求。若有壬癸破火，堪作秀才。
@@ -169,7 +171,7 @@ months = {
 
     '甲午':jia56,
     '甲未':jia56,    
-    '甲申':f'''
+    '甲申':'''
     三月甲木，木气相竭。先取庚金，次用壬水。庚壬两透，一榜堪图。但要运用相生，风水阴德，方许富贵。
     或见一二庚金，独取壬水。壬透清秀之人，才学必富。
     或天干透出二丙，庚藏支下，此钝斧无钢，富贵难求。若有壬癸破火，堪作秀才。
@@ -179,7 +181,7 @@ months = {
     书曰：甲乙生寅卯，庚辛干上逢，离南推富贵，坎地却为凶。
     {jia_3}    
     ''',
-    '甲酉':f'''
+    '甲酉':'''
     八月甲木，木囚金旺。丁火为先，次用丙火，庚金再次。一丁一庚，科甲定显。癸水一透，科甲不全。
     丙庚两透，富大贵小。丙丁全无，僧道之命。丙透无癸，富贵双全。有癸制丙，寻常之人。
     支成火局，可许假贵，戊己一透，可作富翁。
@@ -188,7 +190,7 @@ months = {
     {jia_3}    
     ''',   
 
-    '甲申':f'''
+    '甲申':'''
     九月甲木，木星凋零，独爱丁火，壬癸滋扶，丁壬癸透，戊己亦透，此命配得中和，可许一榜。庚金得所，科甲定然。
 
     或见一二比肩，无庚金制之，平常人也。倘运不得用，贫无立锥。一命，甲辰、甲戌、甲辰、甲戌、身伴明君，富贵寿考，此为天元一气，又名一才一用。遇比用才，专取季土。或见庚丙，可许入泮，白手成家。用火者，木妻火子，子肖妻贤。
@@ -211,7 +213,7 @@ months = {
     {jia_3}    
     ''',
     
-    '甲亥':f'''
+    '甲亥':'''
     十月甲木，庚丁为要，丙火次之。忌壬水泛身，须戊土制之。
 
     若庚丁两透，又加戊出干，名曰去浊留清，富贵之极，即乏丁火，亦稍有富贵。或甲多制戊，庚金无根，平常人也。庚戊若透，虽出比劫，必定富而寿。
@@ -221,7 +223,7 @@ months = {
     用庚，土妻金子。用丁，木妻火子。
     ''',          
     
-    '甲子':f'''
+    '甲子':'''
     十一月甲木，木性生寒，丁先庚後，丙火佐之。癸水司权，为火金之病。庚丁两透，支见巳寅，科甲有准，风水不及，选拔有之。若癸透伤丁。无戊己辅救，残疾之人。或壬水重出，丁火全无者，庸人也，得丙方妙。
 
     或支成水局，加以壬透，名为水泛木浮，死无棺木。
@@ -231,7 +233,7 @@ months = {
     用庚，土妻金子。用火，木妻火子。 
     ''',      
     
-    '甲丑':f'''
+    '甲丑':'''
     十二月甲木，天寒气冻，木性极寒，无生发之象，先用庚劈甲，方引丁火始得木火有通明之象，故丁次之。
     庚丁两透，科甲恩封。庚透丁藏，小贵。丁透庚藏，小富贵。无庚者，贫贱。无丁者，寒儒。或有丁透重重，亦是富贵中人，但须比肩，能发丁之焰，自有德业才能。如无比肩，寻常之士，稍有衣食而已。或支多见水，即有比肩，亦属平常。
     总之腊月甲木，虽有庚金，丁不可少。乏庚略可，乏丁无用。经云：甲木无根，男女夭寿  
@@ -269,7 +271,7 @@ months = {
 
     ''',    
     
-    '乙巳':f'''    
+    '乙巳':'''    
 	四月乙木，自有丙火，端取癸水为尊。四月乙木专用癸水，丙火酌用，虽以庚辛佐癸，须辛透为清。癸透、庚辛又透，科甲定然，独一点癸水、无金，是水无根，虽出天干，不过秀才小富，须要大运相扶。或土多困癸，贫贱之人。丙戊太多，支成火局，瞽目之流。
 
 	用癸者，金妻水子。
@@ -277,7 +279,7 @@ months = {
 	乙逢双女木伤残，若见辛金寿必难，不得丙丁来制伏，岂知安乐不久长。
     ''',   
     
-    '乙午':f'''    
+    '乙午':'''    
 	五月乙木，丁火司权，禾稼俱旱。上半月属阳，仍用癸水。下半月属阴，三伏生寒，丙癸齐用。柱多金水，丙火为先，余皆用癸水为先。
 	乙木重逢火位，名为气散之文，支成火局，泄乙精神，须用癸滋。癸透有根，富贵双全。或庚辛年上，癸透时干，定许科甲，无癸者常人。
 
@@ -285,7 +287,7 @@ months = {
 	
 	{yi56}''',    
     
-    '乙未':f'''  
+    '乙未':'''  
     六月乙木，木性且寒，柱多金水，丙火为尊。支成水局，乙得无伤。癸水透干，大富大贵。无癸定作常人，运不行北，困苦一生。
 	{yi56}''',    
     
@@ -397,7 +399,7 @@ months = {
 
     ''',    
     
-    '丙巳':f'''    
+    '丙巳':'''    
 	四月丙火，建禄於巳，火势炎炎，宜专用壬水，解炎威之力，成既济之功。如无壬水，孤阳失辅，难透清光，得庚发水源，方为有根之水。壬庚两透，不见戊土，号曰湖水汪洋，广映太阳，光辉显著，文明之象，人合此格，不但科甲峥嵘，必有恩谥封荣。若不验，必暗损阴德。
 
 	或无壬水，癸亦姑用，见庚透癸，不富必贵。但心性乖僻，巧谋善辩。
@@ -530,7 +532,7 @@ months = {
 
     ''',    
     
-    '丁巳':f'''    
+    '丁巳':'''    
 	四月丁火乘旺，虽取甲引丁，必用庚劈甲，伐甲、方云木火通明，甲多、又取庚为先。
 
 	但四柱忌见癸水，癸水一见，泄庚、湿甲、伤丁，故以癸为病。
@@ -586,15 +588,15 @@ months = {
 	或九月一派戊土，泄丁火之气，不见甲木，为伤官伤尽，非寻常可比，或甲木透出，为文书清贵，秋闱可夺，用甲者，庚不可少，水妻木子。
     ''',         
 
-    '丁亥':f'''	
+    '丁亥':'''	
 	{ding10_12}
     ''',     
 
-    '丁子':f'''	
+    '丁子':'''	
 	{ding10_12}
     ''',      
 
-    '丁丑':f'''	
+    '丁丑':'''	
 	十二月丙火，气进二阳，每雪欺霜，喜壬为用，己土司令，土多又不可少甲，壬甲两透，科甲堪宜，甲藏则秀才而已，或无甲得一壬透，富中取贵。
 
 	如见一派己土，不见甲乙，名假伤官，聪明性傲，名利虚浮。
@@ -639,7 +641,7 @@ months = {
 
     ''',    
     
-    '戊巳':f'''    
+    '戊巳':'''    
 	四月戊土，阳气发升，寒气内藏，外实内虚，不畏火炎，无阳气相催，万物不长，故先用甲疏劈，次取丙癸为佐。
 
 	丙透甲出，廊庙之材，丙癸俱透，科甲之士，即透一位，支藏得所，终非白丁。
@@ -1294,3 +1296,30 @@ months = {
 }
 
 
+class Months(collections.abc.Mapping):
+    """《穷通宝鉴》按日干+月支取条文，模板中的公共段落在首次取用该条时才填入"""
+
+    def __init__(self, templates, parts):
+        self._templates = templates
+        self._parts = parts
+        self._cache = {}
+
+    def __getitem__(self, key):
+        if key not in self._cache:
+            value = self._templates[key]
+            if isinstance(value, str):
+                value = value.format_map(self._parts)
+            self._cache[key] = value
+        return self._cache[key]
+
+    def __iter__(self):
+        return iter(self._templates)
+
+    def __len__(self):
+        return len(self._templates)
+
+    def __contains__(self, key):
+        return key in self._templates
+
+
+months = Months(_templates, {name: value for name, value in globals().items() if isinstance(value, str)})
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+择日查询
+罗猴年历按年转换为逐日特征列（numpy数组）：日支、岁破月破、偷休、罗猴、日飞星。
+查询条件在整段日期上一次算出布尔掩码，再按页取出对应的Day记录。
+
+$ python zeri.py --start 2025-01-01 --end 2030-01-01 --zhi 午 --star 7
+"""
+
+import argparse
+import collections
+import datetime
+import functools
+
+import numpy as np
+
+from ganzhi import Zhi
+from luohou import get_year, JiuFeiXing, nine_stars, PREBUILT_START, PREBUILT_END
+
+PAGE_SIZE = 50
+
+# 单次查询最多跨越的年数；只查随代码提交的年历，不在请求中现算（每年约2秒）
+YEAR_LIMIT = 10
+
+# 破日、偷休编码，0为无
+POS = ["", "岁破", "月破"]
+TOUXIUS = ["", "大偷休", "小偷休"]
+
+# 九宫按飞星顺序排列：中宫起，顺飞依次到西北、西、东北……
+PALACES = JiuFeiXing._fields
+
+Columns = collections.namedtuple("Columns", "days day_zhi po touxiu hou nine_star")
+
+
+@functools.lru_cache(maxsize=YEAR_LIMIT)
+def year_columns(year):
+    """year年的逐日特征列"""
+    days = get_year(year).days
+    return Columns(
+        days=days,
+        day_zhi=np.fromiter((Zhi.index(item.zhis.day) for item in days), dtype=np.int8, count=len(days)),
+        po=np.fromiter((POS.index(item.po) for item in days), dtype=np.int8, count=len(days)),
+        touxiu=np.fromiter((TOUXIUS.index(item.touxiu) for item in days), dtype=np.int8, count=len(days)),
+        hou=np.fromiter((item.year_hou or item.month_luo or bool(item.ji_hou) for item in days),
+                        dtype=np.bool_, count=len(days)),
+        nine_star=np.fromiter((nine_stars.index(item.nine_star) for item in days), dtype=np.int8,
+                              count=len(days)),
+    )
+
+
+def columns(start, end):
+    """[start, end)的逐日特征列，由各年的列拼接而成；end不含，年份按实际查询的最后一天计"""
+    last = max(start, end - datetime.timedelta(days=1))
+    if last.year - start.year >= YEAR_LIMIT:
+        raise ValueError("查询范围不能超过{}年".format(YEAR_LIMIT))
+    if start.year < PREBUILT_START or last.year > PREBUILT_END:
+        raise ValueError("只能查询{}-{}年".format(PREBUILT_START, PREBUILT_END))
+    parts = []
+    for year in range(start.year, last.year + 1):
+        cols = year_columns(year)
+        first = max(start, datetime.date(year, 1, 1)).toordinal() - datetime.date(year, 1, 1).toordinal()
+        last = min(end, datetime.date(year + 1, 1, 1)).toordinal() - datetime.date(year, 1, 1).toordinal()
+        if first < last:
+            parts.append(Columns(cols.days[first:last], *(col[first:last] for col in cols[1:])))
+    if not parts:
+        return Columns((), *(np.zeros(0, dtype=np.int8) for _ in Columns._fields[1:]))
+    return Columns(sum((part.days for part in parts), ()),
+                   *(np.concatenate([getattr(part, name) for part in parts]) for name in Columns._fields[1:]))
+
+
+def palace_star(center, palace):
+    """日飞星（中宫星序号，0为一白）顺飞时落在palace宫的星序号"""
+    return (center + PALACES.index(palace)) % 9
+
+
+def search(start, end, avoid_po=True, avoid_touxiu=True, avoid_hou=True, zhi=None, star=None, palace=None,
+           page=1, size=PAGE_SIZE):
+    """择日
+
+    Args:
+        start, end: 日期范围[start, end)
+        avoid_po: 排除岁破、月破日
+        avoid_touxiu: 排除大、小偷休日
+        avoid_hou: 排除年猴、月罗、季猴日
+        zhi: 当事人年支，排除与之相冲的日子
+        star: 九星序号（0为一白），与palace一起使用时表示该星飞到palace宫，否则表示日飞星入中宫
+        palace: 宫位，如"东南"
+        page, size: 分页，page从1开始
+
+    Returns:
+        (total, days): 符合条件的总天数和第page页的Day记录
+    """
+    if palace is not None and palace not in PALACES:
+        raise ValueError("宫位不合法：{}".format(palace))
+    if zhi is not None and zhi not in Zhi:
+        raise ValueError("年支不合法：{}".format(zhi))
+    if star is not None and not 0 <= star < 9:
+        raise ValueError("九星序号应为0-8：{}".format(star))
+    cols = columns(start, end)
+    mask = np.ones(len(cols.days), dtype=np.bool_)
+    if avoid_po:
+        mask &= cols.po == 0
+    if avoid_touxiu:
+        mask &= cols.touxiu == 0
+    if avoid_hou:
+        mask &= ~cols.hou
+    if zhi is not None:
+        mask &= cols.day_zhi != (Zhi.index(zhi) + 6) % 12
+    if star is not None:
+        stars = cols.nine_star.astype(np.int16)
+        if palace is not None:
+            stars = palace_star(stars, palace)
+        mask &= stars == star
+
+    hits = np.flatnonzero(mask)
+    begin = (page - 1) * size
+    return len(hits), [cols.days[i] for i in hits[begin:begin + size]]
+
+
+if __name__ == '__main__':
+    description = '''
+# 未来5年不破、不偷休、不逢罗猴，不冲午年生人，八白入中宫的日子
+$ python zeri.py --start 2025-01-01 --end 2030-01-01 --zhi 午 --star 7
+'''
+    parser = argparse.ArgumentParser(description=description,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--start', help='起始日期 YYYY-MM-DD', required=True)
+    parser.add_argument('--end', help='结束日期 YYYY-MM-DD（不含）', required=True)
+    parser.add_argument('--zhi', help='当事人年支')
+    parser.add_argument('--star', help='九星序号，0为一白', type=int)
+    parser.add_argument('--palace', help='宫位，如东南')
+    parser.add_argument('--page', type=int, default=1)
+    parser.add_argument('--size', type=int, default=PAGE_SIZE)
+    options = parser.parse_args()
+
+    start = datetime.datetime.strptime(options.start, "%Y-%m-%d").date()
+    end = datetime.datetime.strptime(options.end, "%Y-%m-%d").date()
+    total, days = search(start, end, zhi=options.zhi, star=options.star, palace=options.palace,
+                         page=options.page, size=options.size)
+    for item in days:
+        print(item.date, ''.join(''.join(pair) for pair in zip(item.gans, item.zhis)), item.nine_star)
+    print("共{}天".format(total))